@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+INR100 Content Pipeline Benchmark
+Times every pipeline stage on synthetic corpora and records results to a JSON history
+
+Stages run in pipeline order over one temporary corpus, each in a fresh
+spawned process, so peak RSS and I/O syscall counts belong to that stage alone.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import queue
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from course_content import BUILD_DIR
+from course_config import OUTPUT_ENV
+
+HISTORY_FILE = BUILD_DIR / 'benchmark-history.json'
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+
+# Stage name -> (module, function) calls, in pipeline order
+STAGES = [
+    ('reorganize', [('reorganize_modules', 'reorganize_modules')]),
+    ('dedup', [('deduplicate_lessons', 'deduplicate_lessons')]),
+    ('recovery', [
+        ('recover_missing_content', 'create_mutual_funds_content'),
+        ('recover_missing_content', 'create_derivatives_content'),
+        ('recover_missing_content', 'create_alternative_investments_content'),
+        ('recover_missing_content', 'create_professional_trading_content')
+    ]),
+    ('metadata', [('enhance_metadata_structure', 'create_enhanced_metadata')]),
+    ('multimedia', [
+        ('enhance_metadata_structure', 'create_multimedia_structure'),
+        ('implement_advanced_features', 'create_sample_multimedia_content')
+    ])
+]
+
+# Pre-reorganization module folders; README wording drives reorganize_modules' categorisation
+SYNTHETIC_MODULES = [
+    ('money-basics', 'Money basics for everyone'),
+    ('banking', 'Banking products and services'),
+    ('wealth', 'Wealth building with SIP'),
+    ('mutual-funds', 'Mutual fund selection'),
+    ('stocks', 'Stock market analysis'),
+    ('portfolio', 'Portfolio management'),
+    ('derivatives', 'Derivatives and options'),
+    ('alternatives', 'Alternative investments and ESG'),
+    ('trading', 'Professional trading desk')
+]
+
+VOCABULARY = (
+    'money market fund equity debt risk return portfolio asset allocation tax rupee '
+    'inflation compound interest sip nav dividend yield volatility hedge option future '
+    'swap bond credit rating liquidity diversification benchmark index expense ratio'
+).split()
+
+DUPLICATE_RATE = 0.1
+MEDIA_RATE = 0.2
+
+def synthetic_lesson(rng, number, paragraphs):
+    """Generate a lesson body with headings, lists and a data table"""
+    lines = [f"# Lesson {number}: {' '.join(rng.choices(VOCABULARY, k=4)).title()}", ""]
+    for p in range(paragraphs):
+        lines.append(f"## Section {p + 1}")
+        lines.append(' '.join(rng.choices(VOCABULARY, k=rng.randint(40, 120))))
+        lines.append("")
+        lines.extend(f"- {' '.join(rng.choices(VOCABULARY, k=6))}" for _ in range(3))
+        lines.append("")
+    lines.append("| Year | Value |")
+    lines.append("|------|-------|")
+    lines.extend(f"| {year} | {rng.randint(1000, 99999)} |" for year in range(2000, 2000 + rng.randint(5, 25)))
+    return '\n'.join(lines) + '\n'
+
+def generate_corpus(root, lesson_count, seed=100):
+    """Write a synthetic, pre-reorganization corpus of lesson_count lessons"""
+    rng = random.Random(seed)
+    per_module, extra = divmod(lesson_count, len(SYNTHETIC_MODULES))
+    written = 0
+
+    for position, (slug, readme) in enumerate(SYNTHETIC_MODULES):
+        module_dir = root / f"legacy-{slug}"
+        module_dir.mkdir(parents=True, exist_ok=True)
+        (module_dir / 'README.md').write_text(f"# {readme}\n\n{readme} course material.\n", encoding='utf-8')
+
+        # The first lesson_count % modules modules take one extra lesson each
+        for number in range(1, per_module + (position < extra) + 1):
+            title = '-'.join(rng.choices(VOCABULARY, k=3))
+            name = f"lesson-{number:02d}-{title}"
+            (module_dir / f"{name}.md").write_text(
+                synthetic_lesson(rng, number, rng.randint(2, 8)), encoding='utf-8')
+            written += 1
+
+            if rng.random() < DUPLICATE_RATE:
+                (module_dir / f"{name}-copy.md").write_text(
+                    synthetic_lesson(rng, number, rng.randint(1, 6)), encoding='utf-8')
+
+            if rng.random() < MEDIA_RATE:
+                media_dir = module_dir / rng.choice(['videos', 'images', 'audio'])
+                media_dir.mkdir(exist_ok=True)
+                (media_dir / f"{name}.bin").write_bytes(rng.randbytes(rng.randint(1024, 65536)))
+
+    assert written == lesson_count, (written, lesson_count)
+    return written
+
+def read_proc_counters():
+    """Linux-only peak RSS and read/write syscall counters for this process"""
+    counters = {}
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    counters['peak_rss_kb'] = int(line.split()[1])
+        with open('/proc/self/io', 'r') as f:
+            for line in f:
+                key, value = line.split(':')
+                if key in ('syscr', 'syscw'):
+                    counters[key] = int(value)
+    except OSError:
+        pass
+    return counters
+
+def run_stage(calls, courses_dir, results):
+    """Child process entry point: run one stage and report its resource usage"""
+    import importlib
+
+    functions = [getattr(importlib.import_module(module), name) for module, name in calls]
+    before = read_proc_counters()
+    usage_before = resource.getrusage(resource.RUSAGE_SELF)
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for function in functions:
+            function(courses_dir)
+    wall = time.perf_counter() - start
+
+    after = read_proc_counters()
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    results.put({
+        'wall_seconds': round(wall, 4),
+        'cpu_seconds': round((usage.ru_utime + usage.ru_stime)
+                             - (usage_before.ru_utime + usage_before.ru_stime), 4),
+        'peak_rss_kb': after.get('peak_rss_kb', usage.ru_maxrss),
+        'read_syscalls': after.get('syscr', 0) - before.get('syscr', 0),
+        'write_syscalls': after.get('syscw', 0) - before.get('syscw', 0),
+        'context_switches': (usage.ru_nvcsw + usage.ru_nivcsw)
+                            - (usage_before.ru_nvcsw + usage_before.ru_nivcsw)
+    })
+
+def benchmark_size(lesson_count, seed):
+    """Generate one corpus and time every stage on it in sequence"""
+    context = multiprocessing.get_context('spawn')
+    stage_results = {}
+
+    with tempfile.TemporaryDirectory(prefix='inr100-bench-') as tmp:
+        courses_dir = Path(tmp) / 'courses'
+        # Spawned stages inherit this, so their build side files stay in the scratch tree
+        previous_output = os.environ.get(OUTPUT_ENV)
+        os.environ[OUTPUT_ENV] = tmp
+        try:
+            start = time.perf_counter()
+            generated = generate_corpus(courses_dir, lesson_count, seed)
+            print(f"Generated {generated} lessons in {time.perf_counter() - start:.1f}s")
+
+            for name, calls in STAGES:
+                results = context.Queue()
+                process = context.Process(target=run_stage, args=(calls, courses_dir, results))
+                process.start()
+                # Read before join so the child never blocks on a full result pipe
+                r = None
+                while r is None and (process.is_alive() or not results.empty()):
+                    try:
+                        r = results.get(timeout=1)
+                    except queue.Empty:
+                        pass
+                process.join()
+                if process.exitcode != 0 or r is None:
+                    print(f"  {name:<12} FAILED (exit code {process.exitcode})")
+                    continue
+                stage_results[name] = r
+                print(f"  {name:<12} {r['wall_seconds']:8.2f}s  {r['peak_rss_kb'] / 1024:7.1f} MB  "
+                      f"{r['read_syscalls'] + r['write_syscalls']:>9} r/w syscalls")
+        finally:
+            if previous_output is None:
+                os.environ.pop(OUTPUT_ENV, None)
+            else:
+                os.environ[OUTPUT_ENV] = previous_output
+
+    return stage_results
+
+def git_revision():
+    """Current commit, if the benchmark runs inside a git checkout"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, cwd=Path(__file__).parent, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def find_regressions(history, run, threshold, min_delta):
+    """Compare each stage against the median of the last five runs of the same size"""
+    regressions = []
+    for size, stages in run['sizes'].items():
+        for stage, result in stages.items():
+            previous = [r['sizes'][size][stage]['wall_seconds'] for r in history[-5:]
+                        if stage in r['sizes'].get(size, {})]
+            if not previous:
+                continue
+            baseline = statistics.median(previous)
+            slowdown = result['wall_seconds'] - baseline
+            # Sub-100ms stages are dominated by process start-up noise
+            if slowdown > min_delta and result['wall_seconds'] > baseline * (1 + threshold):
+                regressions.append(f"{stage} @ {size} lessons: {result['wall_seconds']:.2f}s "
+                                   f"vs median {baseline:.2f}s")
+    return regressions
+
+def main():
+    """Main function to benchmark the content pipeline"""
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help='corpus sizes in lessons (default: 1000 10000 100000)')
+    parser.add_argument('--seed', type=int, default=100)
+    parser.add_argument('--history', type=Path, default=HISTORY_FILE)
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='relative slowdown reported as a regression (default: 0.2)')
+    parser.add_argument('--min-delta', type=float, default=0.1,
+                        help='ignore slowdowns smaller than this many seconds (default: 0.1)')
+    parser.add_argument('--fail-on-regression', action='store_true')
+    args = parser.parse_args()
+
+    print("=== INR100 Content Pipeline Benchmark ===")
+    print()
+
+    run = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'revision': git_revision(),
+        'python': sys.version.split()[0],
+        'cpu_count': os.cpu_count(),
+        'sizes': {}
+    }
+    for size in args.sizes:
+        print(f"Corpus size: {size} lessons")
+        run['sizes'][str(size)] = benchmark_size(size, args.seed)
+        print()
+
+    history = []
+    if args.history.exists():
+        with open(args.history, 'r', encoding='utf-8') as f:
+            history = json.load(f)
+    regressions = find_regressions(history, run, args.threshold, args.min_delta)
+
+    args.history.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.history, 'w', encoding='utf-8') as f:
+        json.dump(history + [run], f, indent=2)
+
+    print("=== BENCHMARK COMPLETE ===")
+    print(f"History: {args.history} ({len(history) + 1} runs)")
+    if regressions:
+        print("⚠️  Regressions detected:")
+        for regression in regressions:
+            print(f"   • {regression}")
+        if args.fail_on_regression:
+            sys.exit(1)
+    else:
+        print("✅ No regressions against recent runs")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+INR100 Autocomplete Index Builder
+Emits a compact sorted-prefix index over lesson titles, tags and module names
+
+The output is a single JSON document small enough to ship to the mobile app:
+    labels/kinds/refs/weights  one row per suggestion
+    keys/key_labels            sorted normalised keys (every word start of a label)
+    top                        precomputed top-k for 1 and 2 character prefixes
+Lookups are a binary search over `keys` followed by a top-k over the matching range.
+"""
+
+import argparse
+import heapq
+import json
+import re
+from bisect import bisect_left
+from collections import Counter
+
+from course_content import (
+    COURSES_DIR, PUBLISH_DIR, iter_modules, iter_lessons, split_frontmatter, lesson_title
+)
+from pipeline_profiling import profiler, profile_stage, add_profiling_arguments, profiling_session
+from course_config import add_config_arguments, load_config
+from pipeline_io import map_concurrently
+from publish_compressed_bundles import compress_file, needs_compression
+
+AUTOCOMPLETE_FILE = PUBLISH_DIR / 'autocomplete.json'
+
+KIND_LESSON, KIND_TAG, KIND_MODULE = 0, 1, 2
+
+# Suggestions returned per precomputed short prefix
+TOP_K = 8
+# Only the first few words of a label are indexed as key starts
+MAX_KEY_WORDS = 6
+
+NORMALIZE_RE = re.compile(r'[^a-z0-9]+')
+
+def normalize(text):
+    """Lowercase and collapse everything that is not a letter or digit"""
+    return NORMALIZE_RE.sub(' ', text.lower()).strip()
+
+def label_keys(label):
+    """Every word start of a label, so 'swa' finds 'Currency Swaps'"""
+    words = normalize(label).split()
+    return {' '.join(words[i:]) for i in range(min(len(words), MAX_KEY_WORDS))}
+
+def load_popularity(path):
+    """Optional {lesson id or file stem: view count} export from analytics"""
+    if not path:
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def read_lesson_labels(lesson_file):
+    """Return (metadata, title) for one lesson; runs in an I/O worker thread"""
+    content = profiler.read_text(lesson_file)
+    with profiler.span('parse', file=lesson_file):
+        metadata, body = split_frontmatter(content)
+        return metadata, lesson_title(metadata, body, lesson_file)
+
+def collect_suggestions(courses_dir, popularity, io_limit=None):
+    """Return [(label, kind, ref, weight)] for lessons, tags and modules"""
+    suggestions = []
+    tag_counts = Counter()
+
+    for level, module_dir in iter_modules(courses_dir):
+        lessons = iter_lessons(module_dir)
+        module_label = module_dir.name.split('-', 2)[-1].replace('-', ' ').title()
+        suggestions.append((module_label, KIND_MODULE, f"{level}/{module_dir.name}", len(lessons)))
+
+        # A module's lessons are read concurrently
+        labels = map_concurrently(read_lesson_labels, lessons, io_limit, return_exceptions=True)
+        for lesson_file, result in zip(lessons, labels):
+            if isinstance(result, Exception):
+                print(f"Error reading {lesson_file}: {result}")
+                continue
+            metadata, title = result
+
+            views = popularity.get(str(metadata.get('lesson_id')), 0) + popularity.get(lesson_file.stem, 0)
+            ref = f"{level}/{module_dir.name}/{lesson_file.stem}"
+            suggestions.append((title, KIND_LESSON, ref, 1 + views))
+
+            tags = metadata.get('tags') or []
+            tag_counts.update(str(tag) for tag in (tags if isinstance(tags, list) else [tags]))
+
+    for tag, count in tag_counts.items():
+        suggestions.append((tag, KIND_TAG, tag, count))
+
+    return suggestions
+
+def build_index(suggestions, top_k=TOP_K):
+    """Build the sorted key array and short-prefix top-k tables"""
+    # Identical labels of the same kind collapse into one row with summed weight
+    merged = {}
+    for label, kind, ref, weight in suggestions:
+        key = (normalize(label), kind)
+        if key in merged:
+            merged[key][3] += weight
+        else:
+            merged[key] = [label, kind, ref, weight]
+    rows = sorted(merged.values(), key=lambda row: (-row[3], row[0]))
+
+    pairs = sorted({(key, i) for i, row in enumerate(rows) for key in label_keys(row[0])})
+
+    top = {}
+    for key, i in pairs:
+        for n in (1, 2):
+            if len(key) >= n:
+                top.setdefault(key[:n], set()).add(i)
+    # Rows are already sorted by descending weight, so the smallest indices win
+    top = {prefix: sorted(ids)[:top_k] for prefix, ids in sorted(top.items())}
+
+    return {
+        'version': 1,
+        'labels': [row[0] for row in rows],
+        'kinds': [row[1] for row in rows],
+        'refs': [row[2] for row in rows],
+        'weights': [row[3] for row in rows],
+        'keys': [key for key, _ in pairs],
+        'key_labels': [i for _, i in pairs],
+        'top': top
+    }
+
+class Autocomplete:
+    """In-memory completer over a loaded autocomplete index"""
+
+    def __init__(self, index):
+        self.labels = index['labels']
+        self.kinds = index['kinds']
+        self.refs = index['refs']
+        self.keys = index['keys']
+        self.key_labels = index['key_labels']
+        self.top = index['top']
+
+    @classmethod
+    def load(cls, path=AUTOCOMPLETE_FILE):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def complete(self, prefix, k=TOP_K):
+        """Return up to k (label, kind, ref) suggestions, most popular first"""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        if len(prefix) <= 2 and k <= TOP_K:
+            ids = self.top.get(prefix, [])[:k]
+        else:
+            lo = bisect_left(self.keys, prefix)
+            hi = bisect_left(self.keys, prefix + '\x7f', lo)
+            # Label indices are popularity ranks, so the k smallest are the k best
+            ids = heapq.nsmallest(k, set(self.key_labels[lo:hi]))
+        return [(self.labels[i], self.kinds[i], self.refs[i]) for i in ids]
+
+@profile_stage('autocomplete-index')
+def build_autocomplete_index(courses_dir=COURSES_DIR, output_file=AUTOCOMPLETE_FILE, popularity_file=None):
+    """Build and publish the autocomplete index with a precompressed sibling"""
+    suggestions = collect_suggestions(courses_dir, load_popularity(popularity_file))
+    with profiler.span('transform', file=output_file):
+        index = build_index(suggestions)
+
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    changed = profiler.write_text(output_file, json.dumps(index, ensure_ascii=False, separators=(',', ':')))
+    if needs_compression(output_file, changed):
+        compress_file(output_file)
+
+    print(f"Autocomplete index: {len(index['labels'])} suggestions, {len(index['keys'])} keys")
+    return len(index['labels'])
+
+def main():
+    """Main function to build the autocomplete index"""
+
+    parser = argparse.ArgumentParser(description="Build the autocomplete index")
+    parser.add_argument('popularity', nargs='?', default=None,
+                        help='optional JSON export of {lesson id or file stem: view count}')
+    add_config_arguments(parser)
+    add_profiling_arguments(parser)
+    args = parser.parse_args()
+    config = load_config(args)
+    output_file = config.publish_dir / AUTOCOMPLETE_FILE.name
+
+    print("=== INR100 Autocomplete Index Builder ===")
+    print()
+
+    with profiling_session(args, 'build_autocomplete_index'):
+        suggestions = build_autocomplete_index(config.corpus_dir, output_file, args.popularity)
+
+    print()
+    print("=== AUTOCOMPLETE INDEX COMPLETE ===")
+    print(f"Suggestions indexed: {suggestions}")
+    print(f"Output file: {output_file}")
+
+if __name__ == "__main__":
+    main()
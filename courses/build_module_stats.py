@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+INR100 Module Statistics Builder
+Rolls lesson metadata up into per-module, per-level and course-wide summaries
+
+    stats/<level>/<module>.json   one module
+    stats/<level>/summary.json    every module of a level, plus the level totals
+    stats/summary.json            every level, plus the course totals
+
+Each summary holds lesson counts, total XP, duration sums, difficulty counts,
+a tag histogram and media counts, so dashboards and course listings read one
+file instead of opening every lesson per request. Only frontmatter blocks are
+read, and files are rewritten only when their totals change.
+"""
+
+import argparse
+import json
+import re
+from collections import Counter
+
+import yaml
+
+from course_content import (
+    COURSES_DIR, PUBLISH_DIR, MEDIA_TYPES, YAML_LOADER, iter_modules, iter_lessons,
+    read_frontmatter_block, write_if_changed
+)
+from pipeline_profiling import profiler, profile_stage, add_profiling_arguments, profiling_session
+from pipeline_io import map_concurrently
+from course_config import add_config_arguments, load_config
+
+STATS_DIR = PUBLISH_DIR / 'stats'
+
+# Tags listed in level and course summaries; module summaries keep them all
+TOP_TAGS = 25
+
+MINUTES_RE = re.compile(r'(\d+(?:\.\d+)?)\s*(h|hour|hours|m|min|mins|minute|minutes)?\b', re.IGNORECASE)
+
+# Media directories also hold generated bookkeeping files
+MEDIA_SKIP = {'README.md', 'content-index.json'}
+
+def duration_minutes(value):
+    """'15 minutes' -> 15, '1.5 hours' -> 90; unparseable durations count as 0"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    match = MINUTES_RE.search(str(value or ''))
+    if not match:
+        return 0
+    minutes = float(match.group(1))
+    if (match.group(2) or '').lower().startswith('h'):
+        minutes *= 60
+    return minutes
+
+def read_lesson_metadata(lesson_file):
+    """Parse only the frontmatter of a lesson; runs in an I/O worker thread"""
+    with profiler.span('read', file=lesson_file):
+        with open(lesson_file, 'rb') as f:
+            header, _ = read_frontmatter_block(f)
+    if not header:
+        return {}
+    with profiler.span('parse', file=lesson_file):
+        metadata = yaml.load(header[4:-4].decode('utf-8'), Loader=YAML_LOADER)
+    return metadata if isinstance(metadata, dict) else {}
+
+def count_media(module_dir):
+    """{media type: {'files': files on disk, 'indexed': entries in content-index.json}}"""
+    media = {}
+    for media_type in MEDIA_TYPES:
+        media_dir = module_dir / media_type
+        if not media_dir.is_dir():
+            continue
+        files = sum(1 for path in media_dir.iterdir()
+                    if path.is_file() and path.name not in MEDIA_SKIP and not path.name.startswith('.'))
+        indexed = 0
+        index_file = media_dir / 'content-index.json'
+        if index_file.exists():
+            with open(index_file, 'r', encoding='utf-8') as f:
+                indexed = len(json.load(f).get('content_items', []))
+        media[media_type] = {'files': files, 'indexed': indexed}
+    return media
+
+def empty_totals():
+    return {'lessons': 0, 'total_xp': 0, 'duration_minutes': 0, 'difficulty': Counter(),
+            'tags': Counter(), 'media': {}}
+
+def add_lesson(totals, metadata):
+    totals['lessons'] += 1
+    xp = metadata.get('xp_reward')
+    if isinstance(xp, (int, float)) and not isinstance(xp, bool):
+        totals['total_xp'] += xp
+    totals['duration_minutes'] += duration_minutes(metadata.get('duration'))
+    if metadata.get('difficulty'):
+        totals['difficulty'][str(metadata['difficulty'])] += 1
+    tags = metadata.get('tags')
+    if isinstance(tags, list):
+        totals['tags'].update(str(tag) for tag in tags)
+
+def merge_totals(totals, other):
+    """Add one summary's totals into another (module -> level -> course)"""
+    for key in ('lessons', 'total_xp', 'duration_minutes'):
+        totals[key] += other[key]
+    totals['difficulty'].update(other['difficulty'])
+    totals['tags'].update(other['tags'])
+    for media_type, counts in other['media'].items():
+        merged = totals['media'].setdefault(media_type, {'files': 0, 'indexed': 0})
+        merged['files'] += counts['files']
+        merged['indexed'] += counts['indexed']
+
+def summarize(totals, top_tags=None):
+    """JSON-ready view of running totals, with derived averages"""
+    lessons = totals['lessons']
+    return {
+        'lessons': lessons,
+        'total_xp': totals['total_xp'],
+        'duration_minutes': round(totals['duration_minutes']),
+        'average_xp': round(totals['total_xp'] / lessons, 1) if lessons else 0,
+        'average_duration_minutes': round(totals['duration_minutes'] / lessons, 1) if lessons else 0,
+        'difficulty': dict(sorted(totals['difficulty'].items())),
+        # Most common first; ties broken alphabetically so output is stable
+        'tags': dict(sorted(totals['tags'].items(), key=lambda item: (-item[1], item[0]))[:top_tags]),
+        'media': dict(sorted(totals['media'].items()))
+    }
+
+def write_json(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with profiler.span('write', file=path):
+        return write_if_changed(path, json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8'))
+
+@profile_stage('module-stats')
+def build_module_stats(courses_dir=COURSES_DIR, stats_dir=STATS_DIR, io_limit=None):
+    """Write module, level and course summaries; returns the number of modules summarised"""
+    course = empty_totals()
+    levels = {}
+    modules_total = 0
+    written = 0
+
+    for level, module_dir in iter_modules(courses_dir):
+        lessons = iter_lessons(module_dir)
+        totals = empty_totals()
+        results = map_concurrently(read_lesson_metadata, lessons, io_limit, return_exceptions=True)
+        for lesson_file, result in zip(lessons, results):
+            if isinstance(result, Exception):
+                print(f"Error reading {lesson_file}: {result}")
+                continue
+            add_lesson(totals, result)
+        with profiler.span('stat', file=module_dir):
+            totals['media'] = count_media(module_dir)
+
+        summary = {'level': level, 'module': module_dir.name, **summarize(totals)}
+        written += write_json(stats_dir / level / f"{module_dir.name}.json", summary)
+
+        level_totals, level_modules = levels.setdefault(level, (empty_totals(), {}))
+        merge_totals(level_totals, totals)
+        level_modules[module_dir.name] = {key: summary[key] for key in
+                                          ('lessons', 'total_xp', 'duration_minutes')}
+        modules_total += 1
+
+    level_summaries = {}
+    for level, (level_totals, level_modules) in levels.items():
+        summary = {'level': level, 'modules': level_modules, **summarize(level_totals, TOP_TAGS)}
+        written += write_json(stats_dir / level / 'summary.json', summary)
+        level_summaries[level] = {key: summary[key] for key in ('lessons', 'total_xp', 'duration_minutes')}
+        level_summaries[level]['modules'] = len(level_modules)
+        merge_totals(course, level_totals)
+
+    written += write_json(stats_dir / 'summary.json',
+                          {'levels': level_summaries, 'modules': modules_total, **summarize(course, TOP_TAGS)})
+
+    print(f"Module stats: {modules_total} modules, {course['lessons']} lessons, "
+          f"{written} summary files updated")
+    return modules_total
+
+def main():
+    """Main function to build module and level statistics"""
+
+    parser = argparse.ArgumentParser(description="Roll lesson metadata up into module and level summaries")
+    add_config_arguments(parser)
+    add_profiling_arguments(parser)
+    args = parser.parse_args()
+    config = load_config(args)
+    stats_dir = config.publish_dir / STATS_DIR.name
+
+    print("=== INR100 Module Statistics ===")
+    print()
+
+    with profiling_session(args, 'build_module_stats'):
+        modules = build_module_stats(config.corpus_dir, stats_dir)
+
+    print()
+    print("=== MODULE STATISTICS COMPLETE ===")
+    print(f"Modules summarised: {modules}")
+    print(f"Output directory: {stats_dir}")
+
+if __name__ == "__main__":
+    main()
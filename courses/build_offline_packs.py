@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+INR100 Offline Module Pack Builder
+Bundles each module into a versioned, reproducible pack with binary deltas between versions
+
+Pack layout:
+    b'INRPACK\\x01' | index length (4 bytes, big endian) | index JSON | entry blobs
+
+Blob offsets in the index are relative to the end of the index, so the mobile
+app can read the header, then seek straight to any lesson or media file.
+
+Each module directory keeps the packs of its last DELTA_HISTORY versions
+(the bases for the next build's deltas) and only the deltas the manifest
+lists; older packs and deltas are deleted after every build.
+"""
+
+import argparse
+import hashlib
+import json
+import struct
+import zlib
+
+from course_content import (
+    COURSES_DIR, PUBLISH_DIR, MEDIA_TYPES, iter_modules, iter_lessons, split_frontmatter
+)
+from pipeline_profiling import profiler, profile_stage, add_profiling_arguments, profiling_session
+from course_config import add_config_arguments, load_config
+
+PACKS_DIR = PUBLISH_DIR / 'packs'
+
+PACK_MAGIC = b'INRPACK\x01'
+DELTA_MAGIC = b'INRDELT\x01'
+HEADER = struct.Struct('>8sI')
+
+# How many previous versions get a delta to the newest pack; also how many packs are kept
+DELTA_HISTORY = 5
+
+def encode_json(data):
+    """Compact, key-sorted JSON so identical input always yields identical bytes"""
+    return json.dumps(data, ensure_ascii=False, sort_keys=True,
+                      separators=(',', ':'), default=str).encode('utf-8')
+
+def collect_module_files(module_dir):
+    """Return {pack path: bytes} for a module's lessons, metadata and media"""
+    files = {}
+    metadata = {}
+
+    for lesson_file in iter_lessons(module_dir):
+        content = profiler.read_text(lesson_file)
+        with profiler.span('parse', file=lesson_file):
+            lesson_meta, body = split_frontmatter(content)
+        metadata[lesson_file.stem] = lesson_meta
+        files[f"lessons/{lesson_file.stem}.md"] = body.encode('utf-8')
+
+    files['metadata.json'] = encode_json(metadata)
+
+    for media_type in MEDIA_TYPES:
+        media_dir = module_dir / media_type
+        if not media_dir.is_dir():
+            continue
+        for media_file in sorted(media_dir.rglob('*')):
+            if media_file.is_file() and media_file.name != 'README.md':
+                with profiler.span('read', file=media_file) as span:
+                    data = media_file.read_bytes()
+                    span.bytes_in = len(data)
+                files[media_file.relative_to(module_dir).as_posix()] = data
+
+    return files
+
+def build_pack(level, module_name, files):
+    """Assemble pack bytes; entries are sorted and carry no timestamps"""
+    entries = []
+    blobs = []
+    offset = 0
+
+    for path in sorted(files):
+        raw = files[path]
+        stored = zlib.compress(raw, 9)
+        entries.append({
+            'path': path,
+            'offset': offset,
+            'size': len(raw),
+            'stored_size': len(stored),
+            'sha256': hashlib.sha256(raw).hexdigest(),
+            'codec': 'zlib'
+        })
+        blobs.append(stored)
+        offset += len(stored)
+
+    # The version is derived from content only, so rebuilding unchanged input is a no-op
+    digest = hashlib.sha256()
+    for entry in entries:
+        digest.update(f"{entry['path']}\0{entry['sha256']}\n".encode('utf-8'))
+    version = digest.hexdigest()[:12]
+
+    index = encode_json({
+        'format': 1,
+        'level': level,
+        'module': module_name,
+        'version': version,
+        'entries': entries
+    })
+    return version, HEADER.pack(PACK_MAGIC, len(index)) + index + b''.join(blobs)
+
+def read_pack_index(pack_data):
+    """Parse the index at the front of a pack; returns (index, data section offset)"""
+    magic, index_len = HEADER.unpack_from(pack_data)
+    if magic != PACK_MAGIC:
+        raise ValueError("Not an INR100 offline pack")
+    start = HEADER.size
+    index = json.loads(pack_data[start:start + index_len].decode('utf-8'))
+    return index, start + index_len
+
+def read_pack_entry(pack_path, entry_path):
+    """Random access read of a single file from a pack on disk"""
+    with open(pack_path, 'rb') as f:
+        magic, index_len = HEADER.unpack(f.read(HEADER.size))
+        if magic != PACK_MAGIC:
+            raise ValueError(f"Not an INR100 offline pack: {pack_path}")
+        index = json.loads(f.read(index_len).decode('utf-8'))
+        for entry in index['entries']:
+            if entry['path'] == entry_path:
+                f.seek(HEADER.size + index_len + entry['offset'])
+                return zlib.decompress(f.read(entry['stored_size']))
+    raise KeyError(entry_path)
+
+def build_delta(old_pack, new_pack):
+    """Encode new_pack as copy ranges from old_pack plus literal bytes
+
+    Blobs whose content hash already exists in the old pack are copied, so
+    editing one lesson ships only that lesson's blob and the new index.
+    """
+    old_index, old_base = read_pack_index(old_pack)
+    new_index, new_base = read_pack_index(new_pack)
+
+    old_blobs = {}
+    for entry in old_index['entries']:
+        old_blobs.setdefault((entry['sha256'], entry['codec']),
+                             (old_base + entry['offset'], entry['stored_size']))
+
+    ops = []
+    literals = bytearray()
+
+    def add_literal(data):
+        if ops and ops[-1][0] == 'data':
+            ops[-1][2] += len(data)
+        else:
+            ops.append(['data', len(literals), len(data)])
+        literals.extend(data)
+
+    def add_copy(offset, length):
+        if ops and ops[-1][0] == 'copy' and ops[-1][1] + ops[-1][2] == offset:
+            ops[-1][2] += length
+        else:
+            ops.append(['copy', offset, length])
+
+    add_literal(new_pack[:new_base])
+    for entry in new_index['entries']:
+        match = old_blobs.get((entry['sha256'], entry['codec']))
+        if match:
+            add_copy(*match)
+        else:
+            start = new_base + entry['offset']
+            add_literal(new_pack[start:start + entry['stored_size']])
+
+    header = encode_json({
+        'base_version': old_index['version'],
+        'target_version': new_index['version'],
+        'target_sha256': hashlib.sha256(new_pack).hexdigest(),
+        'ops': ops
+    })
+    return HEADER.pack(DELTA_MAGIC, len(header)) + header + zlib.compress(bytes(literals), 9)
+
+def apply_delta(old_pack, delta):
+    """Rebuild the target pack from an old pack and a delta, verifying the result"""
+    magic, header_len = HEADER.unpack_from(delta)
+    if magic != DELTA_MAGIC:
+        raise ValueError("Not an INR100 pack delta")
+    header = json.loads(delta[HEADER.size:HEADER.size + header_len].decode('utf-8'))
+    literals = zlib.decompress(delta[HEADER.size + header_len:])
+
+    out = bytearray()
+    for op, offset, length in header['ops']:
+        source = old_pack if op == 'copy' else literals
+        out.extend(source[offset:offset + length])
+
+    if hashlib.sha256(out).hexdigest() != header['target_sha256']:
+        raise ValueError("Delta produced a pack with the wrong checksum")
+    return bytes(out)
+
+def collect_garbage(out_dir, module_name, manifest):
+    """Delete packs outside the kept history and deltas the manifest no longer lists
+
+    Returns the number of files removed.
+    """
+    keep = {f"{module_name}-{version}.pack" for version in manifest['history'][-DELTA_HISTORY:]}
+    keep.update(manifest.get('deltas', {}).values())
+    removed = 0
+    for path in list(out_dir.glob('*.pack')) + list(out_dir.glob('*.delta')):
+        if path.name not in keep:
+            path.unlink()
+            removed += 1
+    return removed
+
+def build_module_pack(level, module_dir, packs_dir):
+    """Build one module's pack, deltas from recent versions, and its manifest"""
+    module_name = module_dir.name
+    out_dir = packs_dir / level / module_name
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    manifest_file = out_dir / 'manifest.json'
+    manifest = {'module': module_name, 'level': level, 'history': []}
+    if manifest_file.exists():
+        with open(manifest_file, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+
+    files = collect_module_files(module_dir)
+    with profiler.span('transform', file=module_dir) as span:
+        version, pack = build_pack(level, module_name, files)
+        span.bytes_out = len(pack)
+    pack_name = f"{module_name}-{version}.pack"
+
+    if manifest.get('current') == version and (out_dir / pack_name).exists():
+        collect_garbage(out_dir, module_name, manifest)
+        return False
+
+    with profiler.span('write', file=out_dir / pack_name) as span:
+        with open(out_dir / pack_name, 'wb') as f:
+            f.write(pack)
+        span.bytes_out = len(pack)
+
+    deltas = {}
+    for old_version in manifest['history'][-DELTA_HISTORY:]:
+        old_file = out_dir / f"{module_name}-{old_version}.pack"
+        if old_version == version or not old_file.exists():
+            continue
+        delta_name = f"{module_name}-{old_version}-{version}.delta"
+        with profiler.span('delta', file=out_dir / delta_name) as span:
+            delta = build_delta(old_file.read_bytes(), pack)
+            with open(out_dir / delta_name, 'wb') as f:
+                f.write(delta)
+            span.bytes_out = len(delta)
+        deltas[old_version] = delta_name
+
+    history = ([v for v in manifest['history'] if v != version] + [version])[-DELTA_HISTORY:]
+    manifest.update({
+        'current': version,
+        'pack': pack_name,
+        'size': len(pack),
+        'sha256': hashlib.sha256(pack).hexdigest(),
+        'deltas': deltas,
+        'history': history
+    })
+    with open(manifest_file, 'wb') as f:
+        f.write(encode_json(manifest))
+    with profiler.span('gc', file=out_dir):
+        removed = collect_garbage(out_dir, module_name, manifest)
+
+    print(f"Packed {module_name} v{version}: {len(pack)} bytes, {len(deltas)} deltas, "
+          f"{removed} old files removed")
+    return True
+
+@profile_stage('offline-packs')
+def build_offline_packs(courses_dir=COURSES_DIR, packs_dir=PACKS_DIR):
+    """Build offline packs for every module"""
+    built = 0
+    for level, module_dir in iter_modules(courses_dir):
+        try:
+            if build_module_pack(level, module_dir, packs_dir):
+                built += 1
+        except Exception as e:
+            print(f"Error packing {module_dir.name}: {e}")
+    return built
+
+def main():
+    """Main function to build offline module packs"""
+
+    parser = argparse.ArgumentParser(description="Build offline module packs and deltas")
+    add_config_arguments(parser)
+    add_profiling_arguments(parser)
+    args = parser.parse_args()
+    config = load_config(args)
+    packs_dir = config.publish_dir / 'packs'
+
+    print("=== INR100 Offline Module Pack Builder ===")
+    print()
+
+    with profiling_session(args, 'build_offline_packs'):
+        built = build_offline_packs(config.corpus_dir, packs_dir)
+
+    print()
+    print("=== PACK BUILD COMPLETE ===")
+    print(f"Module packs updated: {built}")
+    print(f"Output directory: {packs_dir}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+INR100 Lesson Render Cache
+Pre-renders lessons to sanitized HTML once per content hash
+
+Cache layout (content-addressed, so a lesson edit never overwrites an entry):
+    <cache>/v3/<sha256[:2]>/<sha256>.html    sha256 of the lesson file's bytes
+
+The Next.js lesson route serves lessons from the corpus this build rendered
+(INR100_BUILD_ROOT/courses with an output root), hashes the file it is
+about to serve and returns the cached HTML when the entry exists, so
+Markdown is rendered only when a lesson actually changes. Entries are
+touched on every build and every cache hit; garbage collection evicts the
+least recently used entries until the cache fits its size budget.
+
+The renderer escapes all raw HTML in lessons and only emits the tags it
+generates itself; link and image URLs are limited to http(s), mailto and
+site-relative targets.
+"""
+
+import argparse
+import html
+import os
+import re
+import threading
+
+from course_content import BUILD_DIR, COURSES_DIR, iter_modules, iter_lessons, split_frontmatter, hash_file
+from pipeline_profiling import profiler, profile_stage, add_profiling_arguments, profiling_session
+from pipeline_io import map_concurrently
+from build_section_index import section_slug
+from course_config import add_config_arguments, load_config
+
+RENDER_CACHE_DIR = BUILD_DIR / 'render-cache'
+
+# Bump when the renderer's output changes; old entries then age out through GC
+RENDERER_VERSION = 'v3'
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+FENCE_RE = re.compile(r'^[ \t]{0,3}(```|~~~)\s*([\w+-]*)')
+HEADING_RE = re.compile(r'^(#{1,6})[ \t]+(.+?)[ \t#]*$')
+RULE_RE = re.compile(r'^[ \t]{0,3}([-*_])([ \t]*\1){2,}[ \t]*$')
+LIST_RE = re.compile(r'^[ \t]*([-*+]|\d+[.)])[ \t]+(.*)$')
+TABLE_SEPARATOR_RE = re.compile(r'^\|?[ \t]*:?-+:?[ \t]*(\|[ \t]*:?-+:?[ \t]*)*\|?[ \t]*$')
+
+CODE_SPAN_RE = re.compile(r'(`+)(.+?)\1')
+IMAGE_RE = re.compile(r'!\[([^\]]*)\]\(([^)\s]+)\)')
+LINK_RE = re.compile(r'\[([^\]]+)\]\(([^)\s]+)\)')
+BOLD_RE = re.compile(r'(\*\*|__)(?=\S)(.+?)(?<=\S)\1')
+ITALIC_RE = re.compile(r'(?<![\w*])([*_])(?=\S)(.+?)(?<=\S)\1(?![\w*])')
+PLACEHOLDER_RE = re.compile(r'\0(\d+)\0')
+SAFE_URL_RE = re.compile(r'^(https?:|mailto:|/|#)|^[\w./-]+$', re.IGNORECASE)
+
+def safe_url(url):
+    """Allow http(s), mailto and relative URLs; everything else (javascript:, data:) is dropped"""
+    url = html.unescape(url)
+    return html.escape(url, quote=True) if SAFE_URL_RE.match(url) else None
+
+def render_inline(text):
+    """Escape text, then apply code spans, images, links, bold and italic"""
+    parts = []
+    last = 0
+    # Code spans are split out first so their contents are never formatted
+    for match in CODE_SPAN_RE.finditer(text):
+        parts.append(render_formatting(text[last:match.start()]))
+        parts.append(f"<code>{html.escape(match.group(2).strip())}</code>")
+        last = match.end()
+    parts.append(render_formatting(text[last:]))
+    return ''.join(parts)
+
+def render_formatting(text):
+    # NUL delimits placeholders below, so it must not occur in the text itself
+    text = html.escape(text.replace('\0', ''), quote=False)
+    tags = []
+
+    def protect(tag):
+        """Swap a generated tag for a placeholder so emphasis never rewrites its attributes"""
+        tags.append(tag)
+        return f"\0{len(tags) - 1}\0"
+
+    def image(match):
+        url = safe_url(match.group(2))
+        # text is already escaped; only quotes still need escaping inside the attribute
+        alt = match.group(1).replace('"', '&quot;')
+        return protect(f'<img src="{url}" alt="{alt}" loading="lazy">') if url else alt
+
+    def link(match):
+        url = safe_url(match.group(2))
+        if not url:
+            return match.group(1)
+        external = ' rel="noopener noreferrer" target="_blank"' if url.startswith('http') else ''
+        # The link text stays in the stream and can still be emphasised
+        return protect(f'<a href="{url}"{external}>') + match.group(1) + protect('</a>')
+
+    text = IMAGE_RE.sub(image, text)
+    text = LINK_RE.sub(link, text)
+    text = BOLD_RE.sub(r'<strong>\2</strong>', text)
+    text = ITALIC_RE.sub(r'<em>\2</em>', text)
+    return PLACEHOLDER_RE.sub(lambda match: tags[int(match.group(1))], text)
+
+def split_row(line):
+    return [cell.strip() for cell in line.strip().strip('|').split('|')]
+
+def render_markdown(text):
+    """Render lesson Markdown to sanitized HTML"""
+    lines = text.splitlines()
+    out = []
+    used_ids = {'intro'}
+    paragraph = []
+    i = 0
+
+    def flush_paragraph():
+        if paragraph:
+            out.append(f"<p>{render_inline(' '.join(line.strip() for line in paragraph))}</p>")
+            paragraph.clear()
+
+    while i < len(lines):
+        line = lines[i]
+        stripped = line.strip()
+
+        fence = FENCE_RE.match(line)
+        if fence:
+            flush_paragraph()
+            language = fence.group(2)
+            body = []
+            i += 1
+            while i < len(lines) and not lines[i].lstrip().startswith(fence.group(1)):
+                body.append(lines[i])
+                i += 1
+            attribute = f' class="language-{html.escape(language)}"' if language else ''
+            out.append(f"<pre><code{attribute}>{html.escape(chr(10).join(body))}</code></pre>")
+            i += 1
+            continue
+
+        if not stripped:
+            flush_paragraph()
+            i += 1
+            continue
+
+        heading = HEADING_RE.match(stripped)
+        if heading:
+            flush_paragraph()
+            level = len(heading.group(1))
+            title = heading.group(2)
+            # h2/h3 ids match the section ids in the section index
+            anchor = f' id="{section_slug(title, used_ids)}"' if level in (2, 3) else ''
+            out.append(f"<h{level}{anchor}>{render_inline(title)}</h{level}>")
+            i += 1
+            continue
+
+        if RULE_RE.match(line):
+            flush_paragraph()
+            out.append("<hr>")
+            i += 1
+            continue
+
+        if stripped.startswith('|') and i + 1 < len(lines) and TABLE_SEPARATOR_RE.match(lines[i + 1].strip()):
+            flush_paragraph()
+            header = split_row(stripped)
+            rows = []
+            i += 2
+            while i < len(lines) and lines[i].strip().startswith('|'):
+                rows.append(split_row(lines[i]))
+                i += 1
+            out.append("<table><thead><tr>" + ''.join(f"<th>{render_inline(cell)}</th>" for cell in header)
+                       + "</tr></thead><tbody>"
+                       + ''.join("<tr>" + ''.join(f"<td>{render_inline(cell)}</td>" for cell in row) + "</tr>"
+                                 for row in rows)
+                       + "</tbody></table>")
+            continue
+
+        if stripped.startswith('>'):
+            flush_paragraph()
+            quoted = []
+            while i < len(lines) and lines[i].strip().startswith('>'):
+                quoted.append(lines[i].strip()[1:].lstrip())
+                i += 1
+            out.append(f"<blockquote>{render_markdown(chr(10).join(quoted))}</blockquote>")
+            continue
+
+        item = LIST_RE.match(line)
+        if item and not paragraph:
+            ordered = item.group(1)[0].isdigit()
+            items = []
+            while i < len(lines):
+                item = LIST_RE.match(lines[i])
+                if item and item.group(1)[0].isdigit() == ordered:
+                    items.append(item.group(2))
+                elif item or not lines[i].strip() or not lines[i].startswith((' ', '\t')) or not items:
+                    break
+                else:
+                    # Indented continuation line
+                    items[-1] += ' ' + lines[i].strip()
+                i += 1
+            tag = 'ol' if ordered else 'ul'
+            out.append(f"<{tag}>" + ''.join(f"<li>{render_inline(text)}</li>" for text in items) + f"</{tag}>")
+            continue
+
+        paragraph.append(line)
+        i += 1
+
+    flush_paragraph()
+    return '\n'.join(out)
+
+class RenderCache:
+    """Content-addressed HTML store with least-recently-used eviction"""
+
+    def __init__(self, cache_dir=RENDER_CACHE_DIR):
+        self.root = cache_dir / RENDERER_VERSION
+
+    def entry_path(self, content_hash):
+        return self.root / content_hash[:2] / f"{content_hash}.html"
+
+    def get(self, content_hash):
+        """Return cached HTML and mark the entry as recently used"""
+        path = self.entry_path(content_hash)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                content = f.read()
+        except FileNotFoundError:
+            return None
+        os.utime(path)
+        return content
+
+    def touch(self, content_hash):
+        """Mark an entry as recently used; False when it is not cached"""
+        try:
+            os.utime(self.entry_path(content_hash))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def put(self, content_hash, rendered):
+        path = self.entry_path(content_hash)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Entries are immutable; write to a temp name so readers never see a partial file
+        # Worker threads can put the same hash at once (duplicate lessons); each needs its own temp file
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(rendered)
+        os.replace(tmp, path)
+        return path
+
+    def collect_garbage(self, max_bytes=DEFAULT_MAX_BYTES):
+        """Evict least recently used entries until the cache fits max_bytes
+
+        Returns (entries evicted, bytes remaining).
+        """
+        entries = []
+        if self.root.exists():
+            for path in self.root.glob('*/*.html'):
+                st = path.stat()
+                entries.append((st.st_mtime_ns, st.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        evicted = 0
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if total <= max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            evicted += 1
+        return evicted, total
+
+@profile_stage('render-cache')
+def build_render_cache(courses_dir=COURSES_DIR, cache_dir=RENDER_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES,
+                       io_limit=None):
+    """Render every lesson whose content hash is not cached yet, then collect garbage"""
+    cache = RenderCache(cache_dir)
+    lessons = [lesson_file for _, module_dir in iter_modules(courses_dir) for lesson_file in iter_lessons(module_dir)]
+    rendered = 0
+
+    def process(lesson_file):
+        with profiler.span('hash', file=lesson_file):
+            content_hash = hash_file(lesson_file)
+        if cache.touch(content_hash):
+            return False
+        content = profiler.read_text(lesson_file)
+        with profiler.span('transform', file=lesson_file):
+            _, body = split_frontmatter(content)
+            output = render_markdown(body)
+        with profiler.span('write', file=lesson_file) as span:
+            cache.put(content_hash, output)
+            span.bytes_out = len(output)
+        return True
+
+    for lesson_file, result in zip(lessons, map_concurrently(process, lessons, io_limit, return_exceptions=True)):
+        if isinstance(result, Exception):
+            print(f"Error rendering {lesson_file}: {result}")
+        else:
+            rendered += result
+
+    with profiler.span('gc', category='stage'):
+        evicted, remaining = cache.collect_garbage(max_bytes)
+    print(f"Render cache: {rendered} lessons rendered, {len(lessons) - rendered} cached, "
+          f"{evicted} entries evicted, {remaining / 1024:.0f} KiB in use")
+    return rendered
+
+def main():
+    """Main function to refresh the lesson render cache"""
+
+    parser = argparse.ArgumentParser(description="Pre-render lessons to HTML keyed by content hash")
+    parser.add_argument('--max-mb', type=float, default=DEFAULT_MAX_BYTES / (1024 * 1024),
+                        help='cache size budget in MiB before LRU eviction (default: 256)')
+    add_config_arguments(parser)
+    add_profiling_arguments(parser)
+    args = parser.parse_args()
+    config = load_config(args)
+    cache_dir = config.build_dir / RENDER_CACHE_DIR.name
+
+    print("=== INR100 Lesson Render Cache ===")
+    print()
+
+    with profiling_session(args, 'build_render_cache'):
+        rendered = build_render_cache(config.corpus_dir, cache_dir, int(args.max_mb * 1024 * 1024))
+
+    print()
+    print("=== RENDER CACHE COMPLETE ===")
+    print(f"Lessons rendered: {rendered}")
+    print(f"Cache directory: {cache_dir}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+INR100 Full-Text Search Index Builder
+Indexes lesson bodies and frontmatter into a SQLite FTS5 database with BM25 ranking
+"""
+
+import argparse
+import re
+import sqlite3
+
+from course_content import (
+    COURSES_DIR, BUILD_DIR, iter_modules, iter_lessons, split_frontmatter, lesson_title, hash_file
+)
+from pipeline_profiling import profiler, profile_stage, add_profiling_arguments, profiling_session
+from pipeline_io import map_concurrently
+from course_config import add_config_arguments, load_config
+
+SEARCH_DB = BUILD_DIR / 'search-index.sqlite'
+
+# BM25 column weights: title, tags, module, body
+BM25_WEIGHTS = (10.0, 5.0, 2.0, 1.0)
+
+# Changed lessons loaded concurrently before each round of inserts
+LOAD_BATCH = 256
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS lessons (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    content_hash TEXT NOT NULL,
+    lesson_id TEXT,
+    title TEXT,
+    level TEXT,
+    module TEXT
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS lesson_fts USING fts5(
+    title, tags, module, body,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+"""
+
+def open_index(db_path=SEARCH_DB):
+    """Open (creating if needed) the search index database"""
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.executescript(SCHEMA)
+    return conn
+
+def index_lesson(conn, rel_path, content_hash, level, module_name, metadata, body, title):
+    """Insert or replace one lesson in both tables, keeping rowids aligned"""
+    row = conn.execute("SELECT id FROM lessons WHERE path = ?", (rel_path,)).fetchone()
+    if row:
+        conn.execute("DELETE FROM lesson_fts WHERE rowid = ?", (row[0],))
+        conn.execute("DELETE FROM lessons WHERE id = ?", (row[0],))
+
+    tags = metadata.get('tags') or []
+    if not isinstance(tags, list):
+        tags = [tags]
+    objectives = metadata.get('learning_objectives') or []
+    if not isinstance(objectives, list):
+        objectives = [objectives]
+
+    cursor = conn.execute(
+        "INSERT INTO lessons (path, content_hash, lesson_id, title, level, module) VALUES (?, ?, ?, ?, ?, ?)",
+        (rel_path, content_hash, str(metadata.get('lesson_id', '')), title, level, module_name)
+    )
+    conn.execute(
+        "INSERT INTO lesson_fts (rowid, title, tags, module, body) VALUES (?, ?, ?, ?, ?)",
+        (cursor.lastrowid, title, ' '.join(str(t) for t in tags),
+         module_name.replace('-', ' '), '\n'.join(str(o) for o in objectives) + '\n' + body)
+    )
+
+def load_lesson(lesson_file):
+    """Read and parse one changed lesson (runs in an I/O worker thread)"""
+    content = profiler.read_text(lesson_file)
+    with profiler.span('parse', file=lesson_file):
+        metadata, body = split_frontmatter(content)
+        return metadata, body, lesson_title(metadata, body, lesson_file)
+
+def hash_lesson(lesson_file):
+    with profiler.span('hash', file=lesson_file):
+        return hash_file(lesson_file)
+
+@profile_stage('search-index')
+def build_search_index(courses_dir=COURSES_DIR, db_path=SEARCH_DB, io_limit=None):
+    """Incrementally (re)index lessons whose content hash changed
+
+    Hashing and loading lessons run with up to io_limit files in flight;
+    SQLite writes stay on this thread.
+    """
+    conn = open_index(db_path)
+    known = dict(conn.execute("SELECT path, content_hash FROM lessons"))
+    lessons = [(level, module_dir, lesson_file, lesson_file.relative_to(courses_dir).as_posix())
+               for level, module_dir in iter_modules(courses_dir) for lesson_file in iter_lessons(module_dir)]
+    seen = {rel_path for _, _, _, rel_path in lessons}
+    updated = 0
+
+    # Hash in chunks first; only changed lessons are loaded for indexing
+    hashes = map_concurrently(hash_lesson, [lesson[2] for lesson in lessons], io_limit,
+                              return_exceptions=True)
+    changed = []
+    for lesson, content_hash in zip(lessons, hashes):
+        if isinstance(content_hash, Exception):
+            print(f"Error indexing {lesson[2]}: {content_hash}")
+        elif known.get(lesson[3]) != content_hash:
+            changed.append(lesson + (content_hash,))
+
+    with conn:
+        # Load changed lessons in batches so a full rebuild does not hold the corpus in memory
+        for start in range(0, len(changed), LOAD_BATCH):
+            batch = changed[start:start + LOAD_BATCH]
+            loaded = map_concurrently(load_lesson, [lesson[2] for lesson in batch], io_limit,
+                                      return_exceptions=True)
+            for (level, module_dir, lesson_file, rel_path, content_hash), result in zip(batch, loaded):
+                try:
+                    if isinstance(result, Exception):
+                        raise result
+                    metadata, body, title = result
+                    with profiler.span('write', file=lesson_file):
+                        index_lesson(conn, rel_path, content_hash, level, module_dir.name,
+                                     metadata, body, title)
+                    updated += 1
+                except Exception as e:
+                    print(f"Error indexing {lesson_file}: {e}")
+
+        removed = [path for path in known if path not in seen]
+        for rel_path in removed:
+            row = conn.execute("SELECT id FROM lessons WHERE path = ?", (rel_path,)).fetchone()
+            conn.execute("DELETE FROM lesson_fts WHERE rowid = ?", (row[0],))
+            conn.execute("DELETE FROM lessons WHERE id = ?", (row[0],))
+
+        if updated or removed:
+            conn.execute("INSERT INTO lesson_fts (lesson_fts) VALUES ('optimize')")
+
+    if updated or removed:
+        conn.execute("VACUUM")
+    conn.close()
+    print(f"Search index: {updated} lessons updated, {len(removed)} removed, {len(seen)} total")
+    return updated
+
+def build_match_query(query):
+    """Turn free text into an FTS5 query; the last term matches as a prefix"""
+    terms = TOKEN_RE.findall(query.lower())
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += '*'
+    return ' '.join(quoted)
+
+def search_lessons(conn, query, limit=20, snippets=False):
+    """Return the best matching lessons ranked by weighted BM25
+
+    Snippets re-read and re-tokenise the stored body, which costs several
+    milliseconds; leave them off on latency-sensitive paths.
+    """
+    match = build_match_query(query)
+    if match is None:
+        return []
+    snippet = "snippet(lesson_fts, 3, '<mark>', '</mark>', '...', 12)" if snippets else "NULL"
+    rows = conn.execute(
+        f"""SELECT l.path, l.lesson_id, l.title, l.level, l.module, {snippet},
+                   bm25(lesson_fts, {', '.join(str(w) for w in BM25_WEIGHTS)}) AS score
+            FROM lesson_fts JOIN lessons l ON l.id = lesson_fts.rowid
+            WHERE lesson_fts MATCH ?
+            ORDER BY score LIMIT ?""",
+        (match, limit)
+    ).fetchall()
+    keys = ('path', 'lesson_id', 'title', 'level', 'module', 'snippet', 'score')
+    return [dict(zip(keys, row)) for row in rows]
+
+def main():
+    """Main function to build the search index, or query it with arguments"""
+
+    parser = argparse.ArgumentParser(description="Build the lesson search index, or query it")
+    parser.add_argument('query', nargs='*', help='search the existing index instead of building it')
+    add_config_arguments(parser)
+    add_profiling_arguments(parser)
+    args = parser.parse_args()
+    config = load_config(args)
+    db_path = config.build_dir / SEARCH_DB.name
+
+    if args.query:
+        conn = open_index(db_path)
+        for result in search_lessons(conn, ' '.join(args.query)):
+            print(f"{result['score']:8.3f}  {result['path']}")
+        conn.close()
+        return
+
+    print("=== INR100 Search Index Builder ===")
+    print()
+
+    with profiling_session(args, 'build_search_index'):
+        updated = build_search_index(config.corpus_dir, db_path)
+
+    print()
+    print("=== SEARCH INDEX COMPLETE ===")
+    print(f"Lessons (re)indexed: {updated}")
+    print(f"Index database: {db_path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+INR100 Lesson Section Index Builder
+Splits lesson bodies at ##/### headings and publishes a per-module section index
+
+For every lesson the body (frontmatter stripped) is published as
+sections/<level>/<module>/<lesson>.md, and sections/<level>/<module>/sections.json
+records, per lesson, each section's id, title, heading level, byte range
+within that file and estimated reading time. Clients resume mid-lesson with
+a single Range request:
+
+    Range: bytes=<start>-<end - 1>
+
+Lessons are scanned line by line, so memory use does not grow with lesson size.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+
+from course_content import (
+    COURSES_DIR, PUBLISH_DIR, iter_modules, iter_lessons, write_if_changed,
+    read_frontmatter_block, copy_body
+)
+from pipeline_profiling import profiler, profile_stage, add_profiling_arguments, profiling_session
+from pipeline_io import map_concurrently
+from course_config import add_config_arguments, load_config
+
+SECTIONS_DIR = PUBLISH_DIR / 'sections'
+
+# Average adult reading speed for instructional text
+READING_WPM = 200
+
+HEADING_RE = re.compile(rb'^(#{2,3})[ \t]+(.+?)[ \t#]*$')
+FENCE_RE = re.compile(rb'^[ \t]{0,3}(```|~~~)')
+SLUG_RE = re.compile(r'[^a-z0-9]+')
+
+def reading_seconds(words):
+    return round(words * 60 / READING_WPM)
+
+def section_slug(title, used):
+    """URL-safe section id, unique within its lesson"""
+    base = SLUG_RE.sub('-', title.lower()).strip('-') or 'section'
+    slug, n = base, 2
+    while slug in used:
+        slug, n = f"{base}-{n}", n + 1
+    used.add(slug)
+    return slug
+
+def scan_sections(f, body_offset):
+    """Split an open lesson at ##/### headings outside code fences
+
+    Returns (sections, body sha256, body size). Section offsets are relative
+    to the start of the body.
+    """
+    f.seek(body_offset)
+    digest = hashlib.sha256()
+    sections = []
+    used = set()
+    current = {'id': 'intro', 'title': None, 'level': 1, 'start': 0, 'words': 0}
+    used.add('intro')
+    position = 0
+    fence = None
+
+    for line in f:
+        digest.update(line)
+        stripped = line.rstrip(b'\r\n')
+        marker = FENCE_RE.match(stripped)
+        if marker:
+            fence = None if fence == marker.group(1) else (fence or marker.group(1))
+        heading = HEADING_RE.match(stripped) if fence is None else None
+        if heading:
+            # Text before the first heading only becomes a section if it has content
+            if current['level'] != 1 or current['words']:
+                current['end'] = position
+                sections.append(current)
+            title = heading.group(2).decode('utf-8', 'replace').strip()
+            current = {'id': section_slug(title, used), 'title': title,
+                       'level': len(heading.group(1)), 'start': position, 'words': 0}
+        current['words'] += len(line.split())
+        position += len(line)
+
+    if current['level'] != 1 or current['words'] or not sections:
+        current['end'] = position
+        sections.append(current)
+    for section in sections:
+        section['reading_seconds'] = reading_seconds(section['words'])
+    return sections, digest.hexdigest(), position
+
+def index_lesson(task):
+    """Scan one lesson and publish its body when it changed; runs in an I/O worker thread"""
+    lesson_file, body_file, previous = task
+    with profiler.span('read', file=lesson_file) as span:
+        with open(lesson_file, 'rb') as f:
+            _, body_offset = read_frontmatter_block(f)
+            with profiler.span('parse', file=lesson_file):
+                sections, body_hash, body_size = scan_sections(f, body_offset)
+            span.bytes_in = body_offset + body_size
+
+            published = False
+            if not (previous and previous.get('sha256') == body_hash and body_file.exists()):
+                with profiler.span('write', file=body_file) as write_span:
+                    tmp = body_file.with_name(f".{body_file.name}.tmp")
+                    with open(tmp, 'wb') as out:
+                        copy_body(f, out, body_offset)
+                    os.replace(tmp, body_file)
+                    write_span.bytes_out = body_size
+                published = True
+
+    entry = {
+        'file': body_file.name,
+        'size': body_size,
+        'sha256': body_hash,
+        'words': sum(section['words'] for section in sections),
+        'reading_seconds': reading_seconds(sum(section['words'] for section in sections)),
+        'sections': sections
+    }
+    return entry, published
+
+def load_section_index(index_file):
+    if index_file.exists():
+        with open(index_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {}
+
+@profile_stage('section-index')
+def build_section_index(courses_dir=COURSES_DIR, sections_dir=SECTIONS_DIR, io_limit=None):
+    """Publish lesson bodies and per-module section indexes, rewriting only what changed"""
+    lessons_total = 0
+    bodies_published = 0
+
+    for level, module_dir in iter_modules(courses_dir):
+        out_dir = sections_dir / level / module_dir.name
+        out_dir.mkdir(parents=True, exist_ok=True)
+        index_file = out_dir / 'sections.json'
+        previous = load_section_index(index_file).get('lessons', {})
+
+        lessons = iter_lessons(module_dir)
+        tasks = [(lesson_file, out_dir / lesson_file.name, previous.get(lesson_file.stem))
+                 for lesson_file in lessons]
+        results = map_concurrently(index_lesson, tasks, io_limit, return_exceptions=True)
+
+        entries = {}
+        for lesson_file, result in zip(lessons, results):
+            if isinstance(result, Exception):
+                print(f"Error sectioning {lesson_file}: {result}")
+                continue
+            entries[lesson_file.stem], published = result
+            bodies_published += published
+
+        # Bodies of lessons that no longer exist are withdrawn
+        for stale in set(previous) - set(entries):
+            (out_dir / f"{stale}.md").unlink(missing_ok=True)
+
+        index = {'version': 1, 'level': level, 'module': module_dir.name, 'lessons': entries}
+        with profiler.span('write', file=index_file):
+            write_if_changed(index_file, json.dumps(index, ensure_ascii=False, sort_keys=True,
+                                                    separators=(',', ':')).encode('utf-8'))
+        lessons_total += len(entries)
+
+    print(f"Section index: {lessons_total} lessons, {bodies_published} bodies republished")
+    return lessons_total
+
+def main():
+    """Main function to build the lesson section indexes"""
+
+    parser = argparse.ArgumentParser(description="Split lessons into sections and publish section indexes")
+    add_config_arguments(parser)
+    add_profiling_arguments(parser)
+    args = parser.parse_args()
+    config = load_config(args)
+    sections_dir = config.publish_dir / 'sections'
+
+    print("=== INR100 Section Index Builder ===")
+    print()
+
+    with profiling_session(args, 'build_section_index'):
+        lessons = build_section_index(config.corpus_dir, sections_dir)
+
+    print()
+    print("=== SECTION INDEX COMPLETE ===")
+    print(f"Lessons sectioned: {lessons}")
+    print(f"Output directory: {sections_dir}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+INR100 Course Build Configuration
+Resolves the corpus source root and the output root for every build script
+
+    --source-root / INR100_COURSES_DIR   lesson corpus to read (default: this directory)
+    --output-root / INR100_BUILD_ROOT    where generated files go (default: in place)
+
+In place (no output root) the scripts behave as they always have: corpus
+stages edit the source tree and artefacts land in the repository's public/
+and build/ directories. With an output root, the source is treated as
+read-only: it is mirrored into <output>/courses, corpus stages edit that
+copy, and artefacts go to <output>/public/courses and <output>/build/courses.
+Separate output roots let several builds share one host and one source.
+"""
+
+import json
+import os
+import shutil
+from pathlib import Path
+
+SOURCE_ENV = 'INR100_COURSES_DIR'
+OUTPUT_ENV = 'INR100_BUILD_ROOT'
+
+DEFAULT_SOURCE_ROOT = Path(__file__).resolve().parent
+
+MIRROR_MANIFEST = '.source-manifest.json'
+
+class CourseConfig:
+    """Source and output locations for one build"""
+
+    def __init__(self, source_root=None, output_root=None):
+        self.source_root = Path(source_root or DEFAULT_SOURCE_ROOT).resolve()
+        self.output_root = Path(output_root).resolve() if output_root else None
+
+    @classmethod
+    def from_env(cls):
+        return cls(os.environ.get(SOURCE_ENV), os.environ.get(OUTPUT_ENV))
+
+    @property
+    def in_place(self):
+        return self.output_root is None
+
+    @property
+    def root(self):
+        """Base for generated files: the repository, or the output root"""
+        return self.source_root.parent if self.in_place else self.output_root
+
+    @property
+    def corpus_dir(self):
+        """The lesson tree that corpus stages read and edit"""
+        return self.source_root if self.in_place else self.output_root / 'courses'
+
+    @property
+    def app_dir(self):
+        """Where generated application source (API routes, components) is written"""
+        return self.root
+
+    @property
+    def publish_dir(self):
+        return self.root / 'public' / 'courses'
+
+    @property
+    def build_dir(self):
+        return self.root / 'build' / 'courses'
+
+def add_config_arguments(parser):
+    """Register --source-root and --output-root on a script's argument parser"""
+    group = parser.add_argument_group('locations')
+    group.add_argument('--source-root', default=None,
+                       help=f'course corpus to read (env {SOURCE_ENV}, default: {DEFAULT_SOURCE_ROOT})')
+    group.add_argument('--output-root', default=None,
+                       help=f'write generated files here instead of in place (env {OUTPUT_ENV})')
+    return parser
+
+def load_config(args=None):
+    """Command line flags override environment variables, which override defaults"""
+    config = CourseConfig.from_env()
+    if args is not None:
+        if getattr(args, 'source_root', None):
+            config.source_root = Path(args.source_root).resolve()
+        if getattr(args, 'output_root', None):
+            config.output_root = Path(args.output_root).resolve()
+    return config
+
+def mirror_source(config):
+    """Copy new or changed source files into the out-of-tree corpus
+
+    Files are compared by size and mtime against the previous mirror, so an
+    unchanged source costs one stat per file. Files that later stages
+    deliberately removed from the copy (e.g. duplicates) are not restored
+    unless they change in the source. Returns the number of files copied.
+    """
+    if config.in_place:
+        return 0
+
+    corpus_dir = config.corpus_dir
+    corpus_dir.mkdir(parents=True, exist_ok=True)
+    manifest_file = corpus_dir / MIRROR_MANIFEST
+    previous = {}
+    if manifest_file.exists():
+        with open(manifest_file, 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+
+    current = {}
+    copied = 0
+    for dirpath, dirnames, filenames in os.walk(config.source_root):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith('.') and d != '__pycache__')
+        for name in filenames:
+            if name.endswith('.py') or name.endswith('.pyc'):
+                continue
+            source = Path(dirpath) / name
+            rel = source.relative_to(config.source_root).as_posix()
+            st = source.stat()
+            current[rel] = [st.st_size, st.st_mtime_ns]
+            if previous.get(rel) == current[rel]:
+                continue
+            target = corpus_dir / rel
+            target.parent.mkdir(parents=True, exist_ok=True)
+            # Copy to a temp name and rename so a reader never sees a partial file
+            tmp = target.with_name(f".{target.name}.tmp")
+            shutil.copy2(source, tmp)
+            os.replace(tmp, target)
+            copied += 1
+
+    for rel in previous.keys() - current.keys():
+        (corpus_dir / rel).unlink(missing_ok=True)
+
+    with open(manifest_file, 'w', encoding='utf-8') as f:
+        json.dump(current, f, sort_keys=True)
+    return copied
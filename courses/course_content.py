@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+INR100 Course Content Helpers
+Shared lesson discovery and frontmatter parsing for the course build scripts
+"""
+
+import hashlib
+import os
+import re
+import shutil
+import yaml
+
+from course_config import CourseConfig
+
+# Defaults for the build scripts; INR100_COURSES_DIR / INR100_BUILD_ROOT move them,
+# and each script's --source-root / --output-root override them per run
+DEFAULT_CONFIG = CourseConfig.from_env()
+COURSES_DIR = DEFAULT_CONFIG.corpus_dir
+PUBLISH_DIR = DEFAULT_CONFIG.publish_dir
+BUILD_DIR = DEFAULT_CONFIG.build_dir
+
+LEVELS = ['foundation-level', 'intermediate-level', 'advanced-level']
+MEDIA_TYPES = ['videos', 'images', 'audio', 'interactive', 'downloads']
+
+FRONTMATTER_RE = re.compile(r'^---\n(.*?)\n---\n\n?', re.DOTALL)
+LEADING_NUMBER_RE = re.compile(r'^(lesson\s+)?\d+(\.\d+)?\s+', re.IGNORECASE)
+
+# Streaming helpers read and copy in chunks of this size, so memory use does
+# not grow with lesson size; frontmatter blocks larger than the cap are not
+# treated as frontmatter
+CHUNK_SIZE = 1 << 20
+MAX_FRONTMATTER = 1 << 16
+
+# libyaml's loader parses frontmatter several times faster when it is available
+YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+def iter_modules(courses_dir):
+    """Yield (level, module_dir) for every module, in a stable order"""
+    for level in LEVELS:
+        level_dir = courses_dir / level
+        if not level_dir.exists():
+            continue
+        for module_dir in sorted(level_dir.iterdir()):
+            if module_dir.is_dir() and module_dir.name.startswith('module-'):
+                yield level, module_dir
+
+def iter_lessons(module_dir):
+    """Return the lesson files of a module sorted by filename"""
+    return sorted(module_dir.glob('lesson-*.md'))
+
+def split_frontmatter(content):
+    """Split lesson text into (metadata dict, body without frontmatter)"""
+    match = FRONTMATTER_RE.match(content)
+    if not match:
+        return {}, content
+    try:
+        metadata = yaml.load(match.group(1), Loader=YAML_LOADER) or {}
+    except yaml.YAMLError:
+        metadata = {}
+    if not isinstance(metadata, dict):
+        metadata = {}
+    return metadata, content[match.end():]
+
+def read_lesson(lesson_path):
+    """Read a lesson file and return (metadata dict, body)"""
+    with open(lesson_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    return split_frontmatter(content)
+
+def hash_file(path, offset=0):
+    """sha256 hex digest of a file from offset onwards, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def read_frontmatter_block(f):
+    """Read just the frontmatter of an open binary lesson file
+
+    Returns (frontmatter bytes including delimiters, body offset). The body
+    offset skips the blank lines after the frontmatter. Files without
+    frontmatter return (b'', offset of the first non-newline byte).
+    """
+    f.seek(0)
+    header = b''
+    if f.readline(8) == b'---\n':
+        block = [b'---\n']
+        size = 4
+        while size <= MAX_FRONTMATTER:
+            line = f.readline(MAX_FRONTMATTER)
+            if not line:
+                break
+            block.append(line)
+            size += len(line)
+            if line == b'---\n':
+                header = b''.join(block)
+                break
+    offset = len(header)
+    f.seek(offset)
+    while True:
+        chunk = f.read(4096)
+        stripped = chunk.lstrip(b'\n')
+        offset += len(chunk) - len(stripped)
+        if stripped or not chunk:
+            break
+    return header, offset
+
+def copy_body(src, dst, offset):
+    """Copy src from offset to EOF onto the end of dst, in kernel space where possible"""
+    dst.flush()
+    remaining = os.fstat(src.fileno()).st_size - offset
+    try:
+        while remaining > 0:
+            sent = os.sendfile(dst.fileno(), src.fileno(), offset, min(remaining, 1 << 30))
+            if sent == 0:
+                break
+            offset += sent
+            remaining -= sent
+        dst.seek(0, os.SEEK_END)
+    except (AttributeError, OSError):
+        # No sendfile, or not between these file types: fall back to buffered copies
+        src.seek(offset)
+        dst.seek(0, os.SEEK_END)
+        shutil.copyfileobj(src, dst, CHUNK_SIZE)
+
+def replace_header(path, header, body_offset):
+    """Rewrite a file as header + its bytes from body_offset, without loading the body
+
+    The new file is assembled next to the original and renamed over it.
+    """
+    tmp = path.with_name(f".{path.name}.tmp")
+    with open(path, 'rb') as src, open(tmp, 'wb') as dst:
+        dst.write(header)
+        copy_body(src, dst, body_offset)
+    os.replace(tmp, path)
+
+def same_bytes(path, data):
+    """Compare a file with in-memory bytes chunk by chunk"""
+    view = memoryview(data)
+    with open(path, 'rb') as f:
+        position = 0
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            if view[position:position + len(chunk)] != chunk:
+                return False
+            position += len(chunk)
+    return position == len(data)
+
+def write_if_changed(path, data):
+    """Write bytes only when they differ from the file on disk
+
+    Unchanged files keep their mtime, so rsync, CDN uploads, git and the
+    pipeline's own fingerprints all see them as untouched. Returns True
+    when the file was written.
+    """
+    try:
+        if path.stat().st_size == len(data) and same_bytes(path, data):
+            return False
+    except FileNotFoundError:
+        pass
+    with open(path, 'wb') as f:
+        f.write(data)
+    return True
+
+def lesson_title(metadata, body, lesson_file):
+    """Prefer the frontmatter title, then the first heading, then the filename
+
+    Leading lesson numbers left behind by filename slugs ("13 Currency Swaps")
+    are stripped so titles read cleanly in search and autocomplete.
+    """
+    title = metadata.get('title')
+    if not isinstance(title, str) or not title.strip():
+        title = next((line[2:] for line in body.splitlines() if line.startswith('# ')), None)
+    if not title or not title.strip():
+        title = lesson_file.stem.replace('lesson-', '').replace('-', ' ').title()
+    return LEADING_NUMBER_RE.sub('', title.strip()) or title.strip()
@@ -4,11 +4,17 @@ INR100 Course Content Deduplication Script
 Fixes duplicate lessons created during reorganization
 """
 
+import argparse
 import os
 import shutil
 from pathlib import Path
 from collections import defaultdict
 
+from course_content import COURSES_DIR
+from pipeline_profiling import profiler, profile_stage, add_profiling_arguments, profiling_session
+from pipeline_io import map_concurrently
+from course_config import add_config_arguments, load_config, mirror_source
+
 def get_unique_lesson_content(content1, content2):
     """Determine which content is more comprehensive"""
     # Prefer content with more details, longer content, or more sections
@@ -17,9 +23,12 @@ def get_unique_lesson_content(content1, content2):
     else:
         return content2, content1  # Keep content2
 
-def deduplicate_lessons():
-    """Remove duplicate lessons and keep the best version"""
-    courses_dir = Path('/workspace/INR100-APP/courses')
+@profile_stage('dedup')
+def deduplicate_lessons(courses_dir=COURSES_DIR, io_limit=None):
+    """Remove duplicate lessons and keep the best version
+
+    Duplicates are sized and removed with up to io_limit operations in flight.
+    """
     
     # Group lessons by module and lesson number
     lessons_by_module = defaultdict(list)
@@ -30,10 +39,9 @@ def deduplicate_lessons():
         lessons_by_module[str(module_path)].append(lesson_file)
     
     duplicates_removed = 0
+    duplicate_groups = []
     
     for module_path, lesson_files in lessons_by_module.items():
-        print(f"Processing module: {module_path}")
-        
         # Group lessons by lesson number (e.g., lesson-01, lesson-001)
         lesson_groups = defaultdict(list)
         
@@ -49,38 +57,55 @@ def deduplicate_lessons():
                     lesson_num = filename.split('-')[1]  # e.g., "01"
                 lesson_groups[lesson_num].append(lesson_file)
         
-        # Handle duplicates within each lesson number group
-        for lesson_num, files in lesson_groups.items():
-            if len(files) > 1:
-                print(f"  Found {len(files)} duplicates for lesson {lesson_num}")
-                
-                # Read all duplicate files
-                file_contents = []
-                for file_path in files:
-                    try:
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            content = f.read()
-                            file_contents.append((file_path, content))
-                    except Exception as e:
-                        print(f"    Error reading {file_path}: {e}")
-                
-                # Find the best version (longest content)
-                if file_contents:
-                    best_file = max(file_contents, key=lambda x: len(x[1]))
-                    best_path = best_file[0]
-                    best_content = best_file[1]
-                    
-                    print(f"    Keeping: {best_path.name}")
-                    
-                    # Remove all other files
-                    for file_path, content in file_contents:
-                        if file_path != best_path:
-                            try:
-                                file_path.unlink()
-                                duplicates_removed += 1
-                                print(f"    Removed: {file_path.name}")
-                            except Exception as e:
-                                print(f"    Error removing {file_path}: {e}")
+        duplicate_groups.append((module_path, [(lesson_num, files) for lesson_num, files in lesson_groups.items()
+                                               if len(files) > 1]))
+    
+    # Size every duplicate concurrently; the contents never need to be loaded
+    def stat_size(file_path):
+        with profiler.span('stat', file=file_path):
+            return file_path.stat().st_size
+    
+    candidates = [file_path for _, groups in duplicate_groups for _, files in groups for file_path in files]
+    sizes = dict(zip(candidates, map_concurrently(stat_size, candidates, io_limit, return_exceptions=True)))
+    
+    # Decide what to keep, then remove the rest concurrently
+    plan = {}
+    removals = []
+    for module_path, groups in duplicate_groups:
+        for lesson_num, files in groups:
+            file_sizes = []
+            for file_path in files:
+                if isinstance(sizes[file_path], Exception):
+                    print(f"    Error reading {file_path}: {sizes[file_path]}")
+                else:
+                    file_sizes.append((file_path, sizes[file_path]))
+            
+            # Find the best version (longest content)
+            best_path = max(file_sizes, key=lambda x: x[1])[0] if file_sizes else None
+            doomed = [file_path for file_path, size in file_sizes if file_path != best_path]
+            plan[(module_path, lesson_num)] = (best_path, doomed)
+            removals.extend(doomed)
+    
+    def remove(file_path):
+        with profiler.span('remove', file=file_path):
+            file_path.unlink()
+    
+    removed = dict(zip(removals, map_concurrently(remove, removals, io_limit, return_exceptions=True)))
+    
+    for module_path, groups in duplicate_groups:
+        print(f"Processing module: {module_path}")
+        for lesson_num, files in groups:
+            print(f"  Found {len(files)} duplicates for lesson {lesson_num}")
+            best_path, doomed = plan[(module_path, lesson_num)]
+            if best_path is None:
+                continue
+            print(f"    Keeping: {best_path.name}")
+            for file_path in doomed:
+                if isinstance(removed[file_path], Exception):
+                    print(f"    Error removing {file_path}: {removed[file_path]}")
+                else:
+                    duplicates_removed += 1
+                    print(f"    Removed: {file_path.name}")
     
     print(f"\nDeduplication completed!")
     print(f"Duplicates removed: {duplicates_removed}")
@@ -89,5 +114,17 @@ def deduplicate_lessons():
     final_count = len(list(courses_dir.rglob('lesson-*.md')))
     print(f"Final lesson count: {final_count}")
 
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Remove duplicate lessons, keeping the longest version")
+    add_config_arguments(parser)
+    add_profiling_arguments(parser)
+    args = parser.parse_args()
+    config = load_config(args)
+
+    with profiling_session(args, 'deduplicate_lessons'):
+        mirror_source(config)
+        deduplicate_lessons(config.corpus_dir)
+
 if __name__ == "__main__":
-    deduplicate_lessons()
+    main()
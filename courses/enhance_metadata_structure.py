@@ -4,18 +4,60 @@ INR100 Enhanced File Naming and Metadata Enhancement Script
 Implements frontmatter YAML headers and multi-media content structure
 """
 
+import argparse
+import json
 import os
 import re
 from pathlib import Path
 from datetime import datetime
 import yaml
 
-def get_lesson_metadata(lesson_path, level, module_name):
+from course_content import (
+    COURSES_DIR, BUILD_DIR, split_frontmatter, write_if_changed,
+    hash_file, read_frontmatter_block, replace_header
+)
+from pipeline_profiling import profiler, profile_stage, add_profiling_arguments, profiling_session
+from pipeline_io import map_concurrently
+from course_config import add_config_arguments, load_config, mirror_source
+
+# Per-lesson body hashes and the date each version first appeared
+HISTORY_FILE = BUILD_DIR / 'content-history.json'
+HISTORY_LENGTH = 10
+
+def load_content_history(history_file):
+    if history_file.exists():
+        with open(history_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {}
+
+def save_content_history(history_file, history):
+    history_file.parent.mkdir(parents=True, exist_ok=True)
+    write_if_changed(history_file, json.dumps(history, indent=1, sort_keys=True).encode('utf-8'))
+
+def content_last_updated(history, rel_path, digest, header):
+    """Date the lesson body last changed, according to its hash history
+
+    A lesson seen for the first time keeps the last_updated already in its
+    frontmatter, so adopting the history does not re-date the whole corpus.
+    """
+    versions = history.setdefault(rel_path, [])
+    if versions and versions[-1][0] == digest:
+        return versions[-1][1]
+    existing_metadata, _ = split_frontmatter(header) if not versions else ({}, '')
+    if existing_metadata.get('last_updated'):
+        updated = str(existing_metadata['last_updated'])
+    else:
+        updated = datetime.now().strftime('%Y-%m-%d')
+    versions.append([digest, updated])
+    del versions[:-HISTORY_LENGTH]
+    return updated
+
+def get_lesson_metadata(lesson_path, level, module_name, last_updated):
     """Generate comprehensive metadata for a lesson"""
     
     # Extract lesson number and title from filename
     filename = lesson_path.name
-    lesson_match = re.match(r'lesson-(\d+)(?:-(\d+))?-([^-]+)\.md', filename)
+    lesson_match = re.match(r'lesson-(\d+)(?:[-.](\d+))?-(.+)\.md', filename)
     
     if lesson_match:
         primary_num = lesson_match.group(1)
@@ -86,7 +128,7 @@ def get_lesson_metadata(lesson_path, level, module_name):
         'learning_objectives': objectives,
         'tags': tags,
         'related_lessons': related_lessons,
-        'last_updated': datetime.now().strftime('%Y-%m-%d'),
+        'last_updated': last_updated,
         'content_level': level,
         'module': module_name,
         'lesson_number': lesson_num
@@ -221,7 +263,7 @@ def generate_tags(title_slug, level, module_name):
     # Add general tags
     tags.extend(['financial education', 'inr100'])
     
-    return list(set(tags))  # Remove duplicates
+    return list(dict.fromkeys(tags))  # Remove duplicates, keeping a stable order
 
 def generate_related_lessons(lesson_num, module_name):
     """Generate related lessons (previous and next in sequence)"""
@@ -257,67 +299,92 @@ def generate_related_lessons(lesson_num, module_name):
     except:
         return []
 
-def create_enhanced_metadata():
-    """Create enhanced metadata for all lessons"""
+def lesson_location(lesson_file):
+    """Return (level, module name) for a lesson path, or (None, None) outside the levels"""
+    path_parts = lesson_file.parts
+    for i, part in enumerate(path_parts):
+        if part in ['foundation-level', 'intermediate-level', 'advanced-level']:
+            return part, path_parts[i + 1] if i + 1 < len(path_parts) else 'unknown'
+    return None, None
+
+def probe_lesson(lesson_file):
+    """Read the existing frontmatter only; the body is hashed in chunks
+
+    The body starts after any blank lines (earlier runs left one extra per run).
+    Returns (frontmatter bytes, body offset, body hash).
+    """
+    with profiler.span('read', file=lesson_file) as span:
+        with open(lesson_file, 'rb') as f:
+            header, body_offset = read_frontmatter_block(f)
+        span.bytes_in = body_offset
+        return header, body_offset, hash_file(lesson_file, body_offset)
+
+def rewrite_lesson(change):
+    """Replace the frontmatter in front of the existing body"""
+    lesson_file, new_header, body_offset = change
+    with profiler.span('write', file=lesson_file) as span:
+        replace_header(lesson_file, new_header, body_offset)
+        span.bytes_out = len(new_header)
+
+@profile_stage('metadata')
+def create_enhanced_metadata(courses_dir=COURSES_DIR, history_file=HISTORY_FILE, io_limit=None):
+    """Create enhanced metadata for all lessons, rewriting only lessons whose bytes change
+
+    Probing and rewriting lessons run with up to io_limit files in flight;
+    metadata generation and the content history stay in this thread.
+    """
     
-    courses_dir = Path('/workspace/INR100-APP/courses')
-    enhanced_count = 0
+    unchanged_count = 0
+    history = load_content_history(history_file)
     
     # Find all lesson files
-    lesson_files = list(courses_dir.rglob('lesson-*.md'))
+    lesson_files = [lesson_file for lesson_file in sorted(courses_dir.rglob('lesson-*.md'))
+                    if lesson_location(lesson_file)[0]]
+    probes = map_concurrently(probe_lesson, lesson_files, io_limit, return_exceptions=True)
     
-    for lesson_file in lesson_files:
+    changes = []
+    for lesson_file, probe in zip(lesson_files, probes):
         try:
-            # Determine level and module
-            path_parts = lesson_file.parts
-            level = None
-            module_name = None
-            
-            for i, part in enumerate(path_parts):
-                if part in ['foundation-level', 'intermediate-level', 'advanced-level']:
-                    level = part
-                    module_name = path_parts[i + 1] if i + 1 < len(path_parts) else 'unknown'
-                    break
-            
-            if not level:
-                continue
-            
-            # Read existing content
-            with open(lesson_file, 'r', encoding='utf-8') as f:
-                content = f.read()
+            if isinstance(probe, Exception):
+                raise probe
+            header, body_offset, body_hash = probe
+            level, module_name = lesson_location(lesson_file)
             
             # Generate metadata
-            metadata = get_lesson_metadata(lesson_file, level, module_name)
-            
-            # Remove existing frontmatter if present
-            if content.startswith('---'):
-                content = re.sub(r'^---\n.*?\n---\n', '', content, flags=re.DOTALL)
-            
-            # Create new frontmatter
-            frontmatter = "---\n" + yaml.dump(metadata, default_flow_style=False, allow_unicode=True) + "---\n\n"
-            
-            # Combine frontmatter with content
-            enhanced_content = frontmatter + content
+            with profiler.span('parse', file=lesson_file):
+                rel_path = lesson_file.relative_to(courses_dir).as_posix()
+                last_updated = content_last_updated(history, rel_path, body_hash, header.decode('utf-8'))
+                metadata = get_lesson_metadata(lesson_file, level, module_name, last_updated)
             
-            # Write enhanced content
-            with open(lesson_file, 'w', encoding='utf-8') as f:
-                f.write(enhanced_content)
+            with profiler.span('transform', file=lesson_file):
+                # Create new frontmatter
+                frontmatter = "---\n" + yaml.dump(metadata, default_flow_style=False, allow_unicode=True) + "---\n\n"
+                new_header = frontmatter.encode('utf-8')
             
-            enhanced_count += 1
-            
-            if enhanced_count % 50 == 0:
-                print(f"Enhanced {enhanced_count} lessons...")
+            if new_header == header + b'\n' and body_offset == len(new_header):
+                unchanged_count += 1
+            else:
+                changes.append((lesson_file, new_header, body_offset))
             
         except Exception as e:
             print(f"Error enhancing {lesson_file}: {e}")
     
-    print(f"Metadata enhancement completed: {enhanced_count} lessons enhanced")
+    enhanced_count = 0
+    for (lesson_file, _, _), result in zip(changes, map_concurrently(rewrite_lesson, changes, io_limit,
+                                                                     return_exceptions=True)):
+        if isinstance(result, Exception):
+            print(f"Error enhancing {lesson_file}: {result}")
+        else:
+            enhanced_count += 1
+    
+    save_content_history(history_file, history)
+    print(f"Metadata enhancement completed: {enhanced_count} lessons enhanced, {unchanged_count} unchanged")
     return enhanced_count
 
-def create_multimedia_structure():
+@profile_stage('multimedia')
+def create_multimedia_structure(courses_dir=COURSES_DIR):
     """Create multi-media content directories for all modules"""
     
-    courses_dir = Path('/workspace/INR100-APP/courses')
     multimedia_dirs = ['videos', 'images', 'audio', 'interactive', 'downloads']
     
     # Find all module directories
@@ -368,8 +435,7 @@ This directory contains {media_type} content for {module_dir.name.replace('-', '
 """
                 
                 readme_file = media_dir / 'README.md'
-                with open(readme_file, 'w', encoding='utf-8') as f:
-                    f.write(readme_content)
+                profiler.write_text(readme_file, readme_content)
     
     print(f"Multimedia structure creation completed: {created_dirs} directories created")
     return created_dirs
@@ -414,17 +480,30 @@ def get_media_structure_description(media_type, module_name):
 def main():
     """Main function to implement all enhancements"""
     
+    parser = argparse.ArgumentParser(description="Add lesson frontmatter and multimedia directories")
+    add_config_arguments(parser)
+    add_profiling_arguments(parser)
+    args = parser.parse_args()
+    config = load_config(args)
+
+    with profiling_session(args, 'enhance_metadata_structure'):
+        mirror_source(config)
+        run_enhancements(config.corpus_dir, config.build_dir / HISTORY_FILE.name)
+
+def run_enhancements(courses_dir=COURSES_DIR, history_file=HISTORY_FILE):
+    """Run the multimedia and metadata enhancement steps"""
+    
     print("=== INR100 Enhanced File Naming & Metadata Implementation ===")
     print()
     
     # Step 1: Create multimedia structure
     print("1. Creating Multi-Media Content Structure...")
-    dirs_created = create_multimedia_structure()
+    dirs_created = create_multimedia_structure(courses_dir)
     print()
     
     # Step 2: Enhance metadata
     print("2. Enhancing File Metadata...")
-    lessons_enhanced = create_enhanced_metadata()
+    lessons_enhanced = create_enhanced_metadata(courses_dir, history_file)
     print()
     
     # Summary
@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+INR100 Columnar Event Archive
+Compacts ingested learning events into day partitions of NumPy columns and queries them
+
+Historical analytics (learning patterns, time-based stats, cohort reports)
+scan months of events but touch only a few fields. The archive stores one
+.npy file per field per UTC day of the event timestamp:
+
+    archive/day=2026-10-19/user.npy         int32 codes into users.json
+                          /lesson.npy       int32 codes into lessons.json
+                          /event_type.npy   int8 codes into event_types.json
+                          /timestamp.npy    int64 epoch milliseconds, sorted
+                          /duration.npy     float32, NaN when absent
+                          /score.npy        float32, NaN when absent
+                          /sources.json     segments already merged into this day
+
+User, lesson and event type dictionaries are append-only, so codes are
+stable across partitions; the event type table starts from the sorted
+EVENT_TYPES and new types are appended, never renumbered. Compaction reads sealed ingestion segments (event_ingest.py),
+merges each one into every day it touches exactly once (a day's
+sources.json says which segments it holds, so a rerun after a crash
+neither loses nor doubles rows) and swaps partitions in whole.
+compacted.json lets later runs skip segments without reading them. Event
+metadata stays in the segments.
+
+Queries memory-map only the columns they need from only the days in range,
+then filter and group with vectorized masks, np.unique and np.bincount:
+
+    archive = EventArchive(events_dir / 'archive')
+    archive.query('2026-10-01', '2026-10-31', where={'event_type': 'complete'},
+                  group_by=['user'], aggregates={'completions': ('count', None), 'score': ('mean', 'score')})
+
+    python3 courses/event_archive.py
+    python3 courses/event_archive.py --start 2026-10-01 --group-by hour --aggregate events=count
+"""
+
+import argparse
+import datetime
+import json
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+
+from course_content import write_if_changed
+from pipeline_profiling import profiler, profile_stage, add_profiling_arguments, profiling_session
+from event_ingest import EVENT_TYPES
+from course_config import add_config_arguments, load_config
+
+COLUMNS = {
+    'user': np.int32,
+    'lesson': np.int32,
+    'event_type': np.int8,
+    'timestamp': np.int64,
+    'duration': np.float32,
+    'score': np.float32
+}
+DICTIONARIES = ('user', 'lesson', 'event_type')
+FLOAT_COLUMNS = ('duration', 'score')
+
+# Group-by keys computed from the timestamp column
+DAY_MS = 86_400_000
+DERIVED_KEYS = {
+    'day': lambda ts: ts // DAY_MS,
+    'hour': lambda ts: (ts // 3_600_000) % 24,
+    # 1970-01-01 was a Thursday; 0 = Monday
+    'weekday': lambda ts: (ts // DAY_MS + 3) % 7
+}
+AGGREGATES = ('count', 'sum', 'mean', 'min', 'max')
+
+def partition_name(day):
+    return f"day={day}"
+
+def epoch_ms(timestamp):
+    moment = datetime.datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=datetime.timezone.utc)
+    return int(moment.timestamp() * 1000)
+
+def day_of(ms):
+    return datetime.datetime.fromtimestamp(ms / 1000, datetime.timezone.utc).strftime('%Y-%m-%d')
+
+class Dictionary:
+    """Append-only value -> code mapping persisted as a JSON list"""
+
+    def __init__(self, path):
+        self.path = path
+        self.values = []
+        if path.exists():
+            with open(path, 'r', encoding='utf-8') as f:
+                self.values = json.load(f)
+        self.codes = {value: code for code, value in enumerate(self.values)}
+
+    def encode(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def save(self):
+        write_if_changed(self.path, json.dumps(self.values, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+
+def dictionary_file(archive_dir, column):
+    return archive_dir / f"{column}s.json"
+
+def open_dictionary(archive_dir, column):
+    dictionary = Dictionary(dictionary_file(archive_dir, column))
+    if column == 'event_type' and not dictionary.values:
+        # Archives written before the table was stored used sorted(EVENT_TYPES); new ones start from it too
+        for event_type in sorted(EVENT_TYPES):
+            dictionary.encode(event_type)
+    return dictionary
+
+def read_partition(partition_dir, columns=COLUMNS, mmap=True):
+    return {column: np.load(partition_dir / f"{column}.npy", mmap_mode='r' if mmap else None) for column in columns}
+
+def partition_sources(partition_dir):
+    sources_file = partition_dir / 'sources.json'
+    if not sources_file.exists():
+        return set()
+    with open(sources_file, 'r', encoding='utf-8') as f:
+        return set(json.load(f))
+
+def recover_partitions(archive_dir):
+    """Finish or roll back partition swaps interrupted by a crash"""
+    for staged in archive_dir.glob('day=*.new'):
+        shutil.rmtree(staged)
+    for old in archive_dir.glob('day=*.old'):
+        current = old.with_suffix('')
+        if current.exists():
+            shutil.rmtree(old)
+        else:
+            os.replace(old, current)
+
+def write_partition(partition_dir, columns, sources):
+    """Write a whole partition beside the old one, then swap directories"""
+    staged = partition_dir.with_name(partition_dir.name + '.new')
+    staged.mkdir(parents=True)
+    for column, values in columns.items():
+        np.save(staged / f"{column}.npy", values)
+    with open(staged / 'sources.json', 'w', encoding='utf-8') as f:
+        json.dump(sorted(sources), f)
+
+    old = partition_dir.with_name(partition_dir.name + '.old')
+    if partition_dir.exists():
+        os.replace(partition_dir, old)
+    os.replace(staged, partition_dir)
+    if old.exists():
+        shutil.rmtree(old)
+
+def encode_rows(rows, dictionaries):
+    """Segment records -> column arrays"""
+    users, lessons, event_types = (dictionaries[column] for column in DICTIONARIES)
+    return {
+        'user': np.array([users.encode(row['user_id']) for row in rows], dtype=COLUMNS['user']),
+        'lesson': np.array([lessons.encode(row['lesson_id']) for row in rows], dtype=COLUMNS['lesson']),
+        'event_type': np.array([event_types.encode(row['event_type']) for row in rows],
+                               dtype=COLUMNS['event_type']),
+        'timestamp': np.array([row['ms'] for row in rows], dtype=COLUMNS['timestamp']),
+        'duration': np.array([np.nan if row.get('duration') is None else row['duration'] for row in rows],
+                             dtype=COLUMNS['duration']),
+        'score': np.array([np.nan if row.get('score') is None else row['score'] for row in rows],
+                          dtype=COLUMNS['score'])
+    }
+
+@profile_stage('event-archive')
+def compact_events(events_dir, archive_dir=None):
+    """Merge sealed segments into day partitions; returns the number of rows added"""
+    segments_dir = events_dir / 'segments'
+    archive_dir = archive_dir or events_dir / 'archive'
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    recover_partitions(archive_dir)
+
+    partitions = {path.name[len('day='):]: partition_sources(path) for path in archive_dir.glob('day=*')}
+    compacted_file = archive_dir / 'compacted.json'
+    compacted = set()
+    if compacted_file.exists():
+        with open(compacted_file, 'r', encoding='utf-8') as f:
+            compacted = set(json.load(f))
+
+    # Rows by day from segments not yet merged into that day
+    pending, sources = {}, {}
+    segments = [segment.relative_to(segments_dir).as_posix() for segment in sorted(segments_dir.glob('*/*.jsonl'))]
+    for name in segments:
+        if name in compacted:
+            continue
+        segment = segments_dir / name
+        with profiler.span('read', file=segment):
+            with open(segment, 'r', encoding='utf-8') as f:
+                lines = f.readlines()
+        with profiler.span('parse', file=segment):
+            for line in lines:
+                if not line.strip():
+                    continue
+                row = json.loads(line)
+                row['ms'] = epoch_ms(row['timestamp'])
+                day = day_of(row['ms'])
+                if name in partitions.get(day, ()):
+                    continue
+                pending.setdefault(day, []).append(row)
+                sources.setdefault(day, set()).add(name)
+
+    dictionaries = {column: open_dictionary(archive_dir, column) for column in DICTIONARIES}
+    encoded = {day: encode_rows(rows, dictionaries) for day, rows in pending.items()}
+    if len(dictionaries['event_type'].values) > np.iinfo(COLUMNS['event_type']).max + 1:
+        raise ValueError(f"More event types than {COLUMNS['event_type'].__name__} codes can hold")
+    # Codes must be durable before any partition refers to them
+    for dictionary in dictionaries.values():
+        dictionary.save()
+
+    added = 0
+    for day in sorted(encoded):
+        partition_dir = archive_dir / partition_name(day)
+        columns = encoded[day]
+        if partition_dir.exists():
+            existing = read_partition(partition_dir, mmap=False)
+            columns = {column: np.concatenate([existing[column], columns[column]]) for column in COLUMNS}
+        order = np.argsort(columns['timestamp'], kind='stable')
+        with profiler.span('write', file=partition_dir):
+            write_partition(partition_dir, {column: values[order] for column, values in columns.items()},
+                            partitions.get(day, set()) | sources[day])
+        added += len(encoded[day]['timestamp'])
+
+    # Every day now holds every segment read, so later runs can skip them without reading
+    write_if_changed(compacted_file, json.dumps(segments).encode('utf-8'))
+
+    print(f"Event archive: {added} rows added to {len(encoded)} day partitions "
+          f"({len(list(archive_dir.glob('day=*')))} in archive)")
+    return added
+
+class EventArchive:
+    """Read side: column- and partition-pruned scans with vectorized filters and group-bys"""
+
+    def __init__(self, archive_dir):
+        self.archive_dir = archive_dir
+        self.days = sorted(path.name[len('day='):] for path in archive_dir.glob('day=*') if path.is_dir()
+                           and not path.name.endswith(('.new', '.old')))
+        self._dictionaries = {}
+
+    def dictionary(self, name):
+        if name not in self._dictionaries:
+            self._dictionaries[name] = open_dictionary(self.archive_dir, name)
+        return self._dictionaries[name]
+
+    def decode(self, column, codes):
+        if column in DICTIONARIES:
+            values = self.dictionary(column).values
+            return [values[code] for code in codes]
+        if column == 'day':
+            return [day_of(int(code) * DAY_MS) for code in codes]
+        if column in FLOAT_COLUMNS:
+            return [None if np.isnan(value) else float(value) for value in codes]
+        return [int(code) for code in codes]
+
+    def encode_filter(self, column, values):
+        """Filter values -> codes; values unknown to the archive match nothing"""
+        if isinstance(values, (str, int)):
+            values = [values]
+        if column in DICTIONARIES:
+            codes = self.dictionary(column).codes
+            return np.array([codes[value] for value in values if value in codes], dtype=np.int64)
+        return np.array(values, dtype=np.float64)
+
+    def scan(self, columns, start=None, end=None):
+        """Concatenate the named columns over days in [start, end] (inclusive, 'YYYY-MM-DD')"""
+        days = [day for day in self.days if (start is None or day >= str(start)) and (end is None or day <= str(end))]
+        parts = [read_partition(self.archive_dir / partition_name(day), columns) for day in days]
+        return {column: (np.concatenate([part[column] for part in parts]) if parts
+                         else np.empty(0, dtype=COLUMNS[column])) for column in columns}
+
+    def query(self, start=None, end=None, where=None, group_by=(), aggregates=None):
+        """Filter, group and aggregate events
+
+        where maps a column to one value or a list (users and lessons by id,
+        event types by name). group_by names columns or derived keys (day,
+        hour, weekday). aggregates maps output name -> (function, column),
+        with function one of AGGREGATES; NaN values are skipped. Returns a
+        dict of lists, one entry per group.
+        """
+        where = where or {}
+        aggregates = aggregates or {'events': ('count', None)}
+        needed = set(where) | {key if key in COLUMNS else 'timestamp' for key in group_by}
+        needed |= {column for _, column in aggregates.values() if column}
+        # Counting alone still needs one column for the row count; event_type is the narrowest
+        needed = needed or {'event_type'}
+        with profiler.span('read', category='stage'):
+            data = self.scan(sorted(needed), start, end)
+
+        with profiler.span('transform', category='stage'):
+            mask = np.ones(len(next(iter(data.values()))), dtype=bool)
+            for column, values in where.items():
+                mask &= np.isin(data[column], self.encode_filter(column, values))
+            data = {column: values[mask] for column, values in data.items()}
+            rows = int(mask.sum())
+
+            keys = [data[key] if key in COLUMNS else DERIVED_KEYS[key](data['timestamp']) for key in group_by]
+            if keys:
+                uniques, inverses = zip(*(np.unique(key, return_inverse=True) for key in keys))
+                combined = np.ravel_multi_index(inverses, [len(unique) for unique in uniques]) if rows else \
+                    np.empty(0, dtype=np.int64)
+                groups, inverse = np.unique(combined, return_inverse=True)
+                key_codes = np.unravel_index(groups, [len(unique) for unique in uniques])
+                result = {key: self.decode(key, unique[codes])
+                          for key, unique, codes in zip(group_by, uniques, key_codes)}
+            else:
+                groups, inverse = np.zeros(1 if rows else 0), np.zeros(rows, dtype=np.int64)
+                result = {}
+
+            size = len(groups)
+            for name, (function, column) in aggregates.items():
+                result[name] = self.aggregate(function, data.get(column), inverse, size).tolist()
+        return result
+
+    @staticmethod
+    def aggregate(function, values, inverse, size):
+        if function not in AGGREGATES:
+            raise ValueError(f"Unknown aggregate {function!r}; expected one of {', '.join(AGGREGATES)}")
+        if function == 'count':
+            return np.bincount(inverse, minlength=size)
+        values = np.asarray(values, dtype=np.float64)
+        present = ~np.isnan(values)
+        if function in ('sum', 'mean'):
+            total = np.bincount(inverse[present], weights=values[present], minlength=size)
+            if function == 'sum':
+                return total
+            with np.errstate(invalid='ignore', divide='ignore'):
+                return total / np.bincount(inverse[present], minlength=size)
+        extreme = np.full(size, np.nan)
+        if present.any():
+            order = np.argsort(inverse[present], kind='stable')
+            grouped, sorted_values = inverse[present][order], values[present][order]
+            starts = np.flatnonzero(np.r_[True, grouped[1:] != grouped[:-1]])
+            reduce = np.minimum if function == 'min' else np.maximum
+            extreme[grouped[starts]] = reduce.reduceat(sorted_values, starts)
+        return extreme
+
+def time_based_stats(archive, start=None, end=None, user_id=None):
+    """Events by hour of day and weekday, and completions per day"""
+    where = {'user': user_id} if user_id else {}
+    return {
+        'by_hour': archive.query(start, end, where, ['hour']),
+        'by_weekday': archive.query(start, end, where, ['weekday']),
+        'completions_by_day': archive.query(start, end, dict(where, event_type='complete'), ['day'],
+                                            {'completions': ('count', None), 'average_score': ('mean', 'score')})
+    }
+
+def learning_patterns(archive, user_id, start=None, end=None):
+    """One learner's activity mix, study hours and results, for pattern detection"""
+    where = {'user': user_id}
+    return {
+        'by_event_type': archive.query(start, end, where, ['event_type'],
+                                       {'events': ('count', None), 'minutes': ('sum', 'duration')}),
+        'by_hour': archive.query(start, end, where, ['hour']),
+        'scores_by_lesson': archive.query(start, end, dict(where, event_type=['complete', 'quiz_complete']),
+                                          ['lesson'], {'best_score': ('max', 'score'), 'attempts': ('count', None)})
+    }
+
+def parse_aggregates(specs):
+    """['events=count', 'score=mean:score'] -> {'events': ('count', None), 'score': ('mean', 'score')}"""
+    aggregates = {}
+    for spec in specs:
+        name, _, expression = spec.partition('=')
+        function, _, column = (expression or name).partition(':')
+        aggregates[name] = (function, column or None)
+    return aggregates
+
+def main():
+    """Main function to compact the event archive or query it"""
+
+    parser = argparse.ArgumentParser(description="Compact learning events into a columnar archive and query it")
+    parser.add_argument('--events-dir', help='ingestion directory (default: <build dir>/events)')
+    parser.add_argument('--query', action='store_true', help='query the archive instead of compacting')
+    parser.add_argument('--start', help='first day to read (YYYY-MM-DD)')
+    parser.add_argument('--end', help='last day to read (YYYY-MM-DD)')
+    parser.add_argument('--where', action='append', default=[], metavar='COLUMN=VALUE[,VALUE]',
+                        help='keep rows whose column matches one of the values')
+    parser.add_argument('--group-by', default='', help='comma-separated columns or day/hour/weekday')
+    parser.add_argument('--aggregate', action='append', default=[], metavar='NAME=FUNCTION[:COLUMN]',
+                        help=f"aggregate to compute ({', '.join(AGGREGATES)}); default events=count")
+    add_config_arguments(parser)
+    add_profiling_arguments(parser)
+    args = parser.parse_args()
+    config = load_config(args)
+    events_dir = Path(args.events_dir) if args.events_dir else config.build_dir / 'events'
+
+    if args.query or args.group_by or args.where or args.aggregate:
+        where = {}
+        for clause in args.where:
+            column, _, values = clause.partition('=')
+            where[column] = values.split(',')
+        result = EventArchive(events_dir / 'archive').query(
+            args.start, args.end, where, [key for key in args.group_by.split(',') if key],
+            parse_aggregates(args.aggregate) or None)
+        print(json.dumps(result, indent=2))
+        return
+
+    print("=== INR100 Event Archive ===")
+    print()
+
+    with profiling_session(args, 'event_archive'):
+        added = compact_events(events_dir)
+
+    print()
+    print("=== EVENT ARCHIVE COMPLETE ===")
+    print(f"Rows added: {added}")
+    print(f"Archive directory: {events_dir / 'archive'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,510 @@
+#!/usr/bin/env python3
+"""
+INR100 Learning Event Ingestion Service
+Buffers trackEvent traffic and writes it in batches instead of one row per event
+
+The learning-analytics route inserts one learningEvent row, and refreshes
+real-time metrics, for every event it receives. This service takes those
+events over HTTP (POST /events: one JSON object, a JSON array or JSON lines)
+or UDP (one datagram of JSON lines), queues them in a fixed-size ring buffer
+and lets a single writer thread flush them whenever --flush-events are
+waiting or --flush-ms has passed, whichever comes first:
+
+    segments    append-only JSON-lines files, events/segments/<date>/*.jsonl,
+                sealed (renamed from .jsonl.open) when they reach --segment-mb
+                or the day changes; the columnar archive compacts sealed ones
+    sqlite      one multi-row INSERT per batch into a learning_event table,
+                a local stand-in for the learningEvent table
+
+Backpressure: when the buffer is full, HTTP producers wait up to --block-ms
+and then get 503 with Retry-After; a single request larger than the whole
+buffer gets 413. UDP datagrams are dropped and counted.
+Durability: --fsync batch makes every flush durable before the next one
+(segments are fsynced, SQLite runs synchronous=FULL); --fsync off leaves it
+to the OS. A batch the sink fails to write is rolled back and retried with
+backoff ahead of newer events, while the buffer keeps absorbing (and then
+pushing back on) traffic; only at shutdown is it given up after
+WRITE_RETRIES attempts. Events still in the buffer are lost if the process
+dies, so --flush-ms bounds the loss window. GET /stats reports counters.
+
+    python3 courses/event_ingest.py --http-port 8787 --udp-port 8788 --sink segments
+"""
+
+import argparse
+import datetime
+import json
+import math
+import os
+import signal
+import socket
+import socketserver
+import sqlite3
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from course_config import add_config_arguments, load_config
+
+EVENT_TYPES = {'start', 'pause', 'resume', 'complete', 'quiz_start', 'quiz_complete', 'video_play', 'video_pause'}
+
+BUFFER_CAPACITY = 65_536
+FLUSH_EVENTS = 1_000
+FLUSH_MS = 200
+BLOCK_MS = 50
+SEGMENT_MB = 64
+# Failed batch writes back off from RETRY_MS up to MAX_RETRY_MS between attempts
+RETRY_MS = 100
+MAX_RETRY_MS = 5_000
+# Attempts per batch once the service is shutting down
+WRITE_RETRIES = 5
+# Largest HTTP body accepted
+MAX_REQUEST_BYTES = 8 << 20
+UDP_RECEIVE_BUFFER = 8 << 20
+
+EVENT_SCHEMA = """
+CREATE TABLE IF NOT EXISTS learning_event (
+    user_id TEXT NOT NULL,
+    lesson_id TEXT NOT NULL,
+    event_type TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    duration REAL,
+    score REAL,
+    metadata TEXT
+);
+CREATE INDEX IF NOT EXISTS learning_event_user ON learning_event (user_id, timestamp);
+"""
+
+def utc_now():
+    return datetime.datetime.now(datetime.timezone.utc)
+
+def optional_number(raw, field):
+    """A finite float or None; NaN and Infinity would be written as bare, non-JSON tokens"""
+    value = raw.get(field)
+    if value is None:
+        return None
+    value = float(value)
+    if not math.isfinite(value):
+        raise ValueError(f"{field} must be a finite number")
+    return value
+
+def normalize_event(raw, received):
+    """Validate a trackEvent payload into a flat record; raises ValueError"""
+    if not isinstance(raw, dict):
+        raise ValueError("event must be a JSON object")
+    user_id, lesson_id, event_type = raw.get('userId'), raw.get('lessonId'), raw.get('eventType')
+    if not user_id or not lesson_id:
+        raise ValueError("userId and lessonId are required")
+    if event_type not in EVENT_TYPES:
+        raise ValueError(f"unknown eventType {event_type!r}")
+
+    timestamp = raw.get('timestamp')
+    if isinstance(timestamp, (int, float)) and not isinstance(timestamp, bool):
+        # Epoch milliseconds, as Date.now() sends them
+        moment = datetime.datetime.fromtimestamp(timestamp / 1000, datetime.timezone.utc)
+    elif isinstance(timestamp, str) and timestamp:
+        moment = datetime.datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=datetime.timezone.utc)
+    else:
+        moment = received
+    return {
+        'user_id': str(user_id),
+        'lesson_id': str(lesson_id),
+        'event_type': event_type,
+        'timestamp': moment.astimezone(datetime.timezone.utc).isoformat(timespec='milliseconds'),
+        'duration': optional_number(raw, 'duration'),
+        'score': optional_number(raw, 'score'),
+        'metadata': raw.get('metadata')
+    }
+
+def parse_payload(data):
+    """JSON object, JSON array or JSON lines -> (records, errors)"""
+    received = utc_now()
+    text = data.decode('utf-8').strip()
+    if not text:
+        return [], []
+    try:
+        # One object or array, pretty-printed or not
+        document = json.loads(text)
+        raw_events = document if isinstance(document, list) else [document]
+    except json.JSONDecodeError:
+        raw_events = [json.loads(line) for line in text.splitlines() if line.strip()]
+
+    records, errors = [], []
+    for raw in raw_events:
+        try:
+            records.append(normalize_event(raw, received))
+        except (ValueError, TypeError, OverflowError, OSError) as e:
+            # Out-of-range timestamps and numbers raise OverflowError or OSError
+            errors.append(str(e))
+    return records, errors
+
+class RingBuffer:
+    """Fixed-capacity FIFO shared by many producers and one flushing consumer"""
+
+    def __init__(self, capacity):
+        self.slots = [None] * capacity
+        self.capacity = capacity
+        self.head = 0
+        self.size = 0
+        self.closed = False
+        self.changed = threading.Condition()
+
+    def put_many(self, events, timeout):
+        """Append all events or none; waits up to timeout seconds for room"""
+        count = len(events)
+        if count > self.capacity:
+            return False
+        with self.changed:
+            if not self.changed.wait_for(lambda: self.capacity - self.size >= count or self.closed, timeout):
+                return False
+            if self.closed:
+                return False
+            tail = (self.head + self.size) % self.capacity
+            for offset, event in enumerate(events):
+                self.slots[(tail + offset) % self.capacity] = event
+            self.size += count
+            self.changed.notify_all()
+            return True
+
+    def take(self, limit):
+        """Remove and return up to limit events, oldest first"""
+        with self.changed:
+            count = min(limit, self.size)
+            events = [None] * count
+            for offset in range(count):
+                index = (self.head + offset) % self.capacity
+                events[offset] = self.slots[index]
+                self.slots[index] = None
+            self.head = (self.head + count) % self.capacity
+            self.size -= count
+            if count:
+                self.changed.notify_all()
+            return events
+
+    def wait_for_batch(self, count, timeout):
+        """Block until count events are waiting, the buffer closes or timeout passes"""
+        with self.changed:
+            self.changed.wait_for(lambda: self.size >= count or self.closed, timeout)
+            return self.size
+
+    def close(self):
+        with self.changed:
+            self.closed = True
+            self.changed.notify_all()
+
+class SegmentSink:
+    """Append-only JSON-lines segments, one directory per UTC day"""
+
+    def __init__(self, segments_dir, segment_bytes, fsync):
+        self.segments_dir = segments_dir
+        self.segment_bytes = segment_bytes
+        self.fsync = fsync
+        self.file = None
+        self.path = None
+        self.day = None
+        self.sequence = 0
+        self.recover()
+
+    def recover(self):
+        """Seal segments left open by a crash, dropping any torn final line"""
+        for path in sorted(self.segments_dir.glob('*/*.jsonl.open')):
+            with open(path, 'rb+') as f:
+                data = f.read()
+                f.truncate(data.rfind(b'\n') + 1)
+            os.replace(path, path.with_suffix(''))
+
+    def open_segment(self, day):
+        self.day = day
+        directory = self.segments_dir / day
+        directory.mkdir(parents=True, exist_ok=True)
+        self.sequence += 1
+        stamp = utc_now().strftime('%H%M%S%f')
+        self.path = directory / f"events-{stamp}-{os.getpid()}-{self.sequence:06d}.jsonl.open"
+        self.file = open(self.path, 'ab')
+
+    def seal(self):
+        if self.file is not None:
+            self.file.close()
+            os.replace(self.path, self.path.with_suffix(''))
+            self.file = None
+
+    def write(self, events):
+        day = utc_now().strftime('%Y-%m-%d')
+        if self.file is None or day != self.day or self.file.tell() >= self.segment_bytes:
+            self.seal()
+            self.open_segment(day)
+        start = self.file.tell()
+        try:
+            self.file.write(''.join(json.dumps(event, separators=(',', ':')) + '\n'
+                                    for event in events).encode('utf-8'))
+            self.file.flush()
+            if self.fsync:
+                os.fsync(self.file.fileno())
+        except Exception:
+            # Cut the segment back to its last whole batch so the retry does not duplicate or tear lines
+            self.file.seek(start)
+            self.file.truncate()
+            raise
+
+    def close(self):
+        self.seal()
+
+class SQLiteSink:
+    """Batched multi-row inserts into a local learning_event table"""
+
+    def __init__(self, db_path, fsync):
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        # Only the flushing thread writes; the connection is created before it starts
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(f"PRAGMA synchronous={'FULL' if fsync else 'OFF'}")
+        self.conn.executescript(EVENT_SCHEMA)
+
+    def write(self, events):
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO learning_event (user_id, lesson_id, event_type, timestamp, duration, score, metadata) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(e['user_id'], e['lesson_id'], e['event_type'], e['timestamp'], e['duration'], e['score'],
+                  None if e['metadata'] is None else json.dumps(e['metadata'])) for e in events]
+            )
+
+    def close(self):
+        self.conn.close()
+
+class IngestService:
+    """Ring buffer plus the writer thread that drains it into a sink"""
+
+    def __init__(self, sink, capacity=BUFFER_CAPACITY, flush_events=FLUSH_EVENTS, flush_ms=FLUSH_MS,
+                 block_ms=BLOCK_MS):
+        self.sink = sink
+        self.buffer = RingBuffer(capacity)
+        self.flush_events = flush_events
+        self.flush_interval = flush_ms / 1000
+        self.block_timeout = block_ms / 1000
+        self.counters = {'accepted': 0, 'rejected': 0, 'invalid': 0, 'written': 0, 'batches': 0,
+                         'write_errors': 0, 'lost': 0}
+        self.counters_lock = threading.Lock()
+        # A batch the sink failed to write; only the writer thread touches it
+        self.unwritten = []
+        self.writer = threading.Thread(target=self.run_writer, name='event-writer', daemon=True)
+
+    def count(self, name, amount=1):
+        with self.counters_lock:
+            self.counters[name] += amount
+
+    def start(self):
+        self.writer.start()
+        return self
+
+    def submit(self, events, block=True):
+        """Queue events; False means the buffer is full and nothing was queued"""
+        if not events:
+            return True
+        if self.buffer.put_many(events, self.block_timeout if block else 0):
+            self.count('accepted', len(events))
+            return True
+        self.count('rejected', len(events))
+        return False
+
+    def run_writer(self):
+        failures = 0
+        while True:
+            if failures:
+                time.sleep(min(RETRY_MS * 2 ** (failures - 1), MAX_RETRY_MS) / 1000)
+            else:
+                self.buffer.wait_for_batch(self.flush_events, self.flush_interval)
+            failures = 0 if self.flush() else failures + 1
+            if self.buffer.closed:
+                if failures >= WRITE_RETRIES:
+                    self.discard()
+                    return
+                if self.buffer.size == 0 and not self.unwritten:
+                    return
+
+    def flush(self):
+        """Write buffered events in batches; False when the sink failed and the batch is kept"""
+        while True:
+            events = self.unwritten or self.buffer.take(self.flush_events)
+            if not events:
+                return True
+            try:
+                self.sink.write(events)
+            except Exception as e:
+                print(f"Error writing {len(events)} events: {e}")
+                self.count('write_errors')
+                # Retried before anything newer, so events stay in order
+                self.unwritten = events
+                return False
+            self.unwritten = []
+            self.count('written', len(events))
+            self.count('batches')
+            if len(events) < self.flush_events:
+                return True
+
+    def discard(self):
+        """Give up on everything not yet written; only used at shutdown"""
+        lost = len(self.unwritten) + len(self.buffer.take(self.buffer.capacity))
+        self.unwritten = []
+        self.count('lost', lost)
+        print(f"Dropped {lost} events after {WRITE_RETRIES} failed writes")
+
+    def stats(self):
+        with self.counters_lock:
+            stats = dict(self.counters)
+        stats['buffered'] = self.buffer.size
+        stats['capacity'] = self.buffer.capacity
+        return stats
+
+    def close(self):
+        """Stop accepting events, write everything buffered and close the sink"""
+        self.buffer.close()
+        if self.writer.is_alive():
+            self.writer.join()
+        elif not self.flush():
+            self.discard()
+        self.sink.close()
+
+def make_http_handler(service):
+    class EventHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def reply(self, status, body, headers=()):
+            data = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            for name, value in headers:
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            if self.path.rstrip('/') != '/events':
+                return self.reply(404, {'success': False, 'error': 'Not found'})
+            try:
+                length = int(self.headers.get('Content-Length') or 0)
+            except ValueError:
+                length = -1
+            if length < 0:
+                # The body cannot be delimited, so the connection cannot be reused either
+                self.close_connection = True
+                return self.reply(400, {'success': False, 'error': 'Invalid Content-Length'})
+            if length > MAX_REQUEST_BYTES:
+                return self.reply(413, {'success': False, 'error': 'Request too large'})
+            try:
+                records, errors = parse_payload(self.rfile.read(length))
+            except (ValueError, UnicodeDecodeError) as e:
+                return self.reply(400, {'success': False, 'error': f'Malformed events: {e}'})
+            service.count('invalid', len(errors))
+            if not records:
+                return self.reply(400, {'success': False, 'error': 'No valid events', 'details': errors[:10]})
+            if len(records) > service.buffer.capacity:
+                # Retrying cannot help: the batch never fits, however empty the buffer gets
+                service.count('rejected', len(records))
+                return self.reply(413, {'success': False, 'error': 'More events than the buffer holds',
+                                        'capacity': service.buffer.capacity})
+            if not service.submit(records):
+                return self.reply(503, {'success': False, 'error': 'Event buffer full'}, [('Retry-After', '1')])
+            return self.reply(202, {'success': True, 'accepted': len(records), 'invalid': len(errors)})
+
+        def do_GET(self):
+            if self.path.rstrip('/') != '/stats':
+                return self.reply(404, {'success': False, 'error': 'Not found'})
+            return self.reply(200, service.stats())
+
+        def log_message(self, format, *args):
+            # Per-request access logs would cost more than the events themselves
+            pass
+
+    return EventHandler
+
+def make_udp_handler(service):
+    class DatagramHandler(socketserver.BaseRequestHandler):
+        def handle(self):
+            try:
+                records, errors = parse_payload(self.request[0])
+            except (ValueError, UnicodeDecodeError):
+                service.count('invalid')
+                return
+            service.count('invalid', len(errors))
+            # Never stall the receive loop; a full buffer drops the datagram
+            service.submit(records, block=False)
+
+    return DatagramHandler
+
+class EventUDPServer(socketserver.UDPServer):
+    # One receive thread: handlers only parse and enqueue, which is cheaper than a thread per datagram
+    max_packet_size = 65_507
+
+    def server_bind(self):
+        # A deep kernel queue absorbs bursts while the handler is busy
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, UDP_RECEIVE_BUFFER)
+        super().server_bind()
+
+def open_sink(kind, events_dir, fsync, segment_mb=SEGMENT_MB):
+    if kind == 'sqlite':
+        return SQLiteSink(events_dir / 'events.sqlite', fsync)
+    segments_dir = events_dir / 'segments'
+    segments_dir.mkdir(parents=True, exist_ok=True)
+    return SegmentSink(segments_dir, segment_mb << 20, fsync)
+
+def main():
+    """Main function to run the event ingestion service"""
+
+    parser = argparse.ArgumentParser(description="Buffered learning event ingestion over HTTP and UDP")
+    parser.add_argument('--host', default='127.0.0.1', help='address to listen on')
+    parser.add_argument('--http-port', type=int, default=8787, help='HTTP port (0 disables HTTP)')
+    parser.add_argument('--udp-port', type=int, default=0, help='UDP port (0 disables UDP)')
+    parser.add_argument('--sink', choices=('segments', 'sqlite'), default='segments', help='where batches go')
+    parser.add_argument('--events-dir', help='output directory (default: <build dir>/events)')
+    parser.add_argument('--capacity', type=int, default=BUFFER_CAPACITY, help='ring buffer size in events')
+    parser.add_argument('--flush-events', type=int, default=FLUSH_EVENTS, help='flush once this many are waiting')
+    parser.add_argument('--flush-ms', type=int, default=FLUSH_MS, help='flush at least this often')
+    parser.add_argument('--block-ms', type=int, default=BLOCK_MS, help='how long HTTP producers wait for room')
+    parser.add_argument('--fsync', choices=('batch', 'off'), default='batch', help='make each flush durable')
+    parser.add_argument('--segment-mb', type=int, default=SEGMENT_MB, help='seal segments at this size')
+    add_config_arguments(parser)
+    args = parser.parse_args()
+    config = load_config(args)
+    events_dir = Path(args.events_dir) if args.events_dir else config.build_dir / 'events'
+
+    sink = open_sink(args.sink, events_dir, args.fsync == 'batch', args.segment_mb)
+    service = IngestService(sink, args.capacity, args.flush_events, args.flush_ms, args.block_ms).start()
+
+    servers = []
+    if args.http_port:
+        servers.append(ThreadingHTTPServer((args.host, args.http_port), make_http_handler(service)))
+    if args.udp_port:
+        servers.append(EventUDPServer((args.host, args.udp_port), make_udp_handler(service)))
+    for server in servers:
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    print("=== INR100 Event Ingestion ===")
+    print(f"HTTP: {args.host}:{args.http_port}" if args.http_port else "HTTP: disabled")
+    print(f"UDP: {args.host}:{args.udp_port}" if args.udp_port else "UDP: disabled")
+    print(f"Sink: {args.sink} in {events_dir}")
+
+    stopping = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stopping.set())
+    try:
+        stopping.wait()
+    except KeyboardInterrupt:
+        pass
+
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+    service.close()
+
+    print()
+    print("=== EVENT INGESTION STOPPED ===")
+    stats = service.stats()
+    print(f"Events accepted: {stats['accepted']}, written: {stats['written']} in {stats['batches']} batches, "
+          f"rejected: {stats['rejected']}, lost: {stats['lost']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+INR100 Quiz Extractor
+Turns the inline quiz sections of lessons into structured question records per module
+
+Lessons write quizzes in a few Markdown shapes:
+
+    ## Assessment Questions                 ## 🧠 Interactive Knowledge Assessment
+    1. **Question text?**                   ### Question 1: Title
+       a) option                            **Question text?**
+       - b) option                          A) option
+    **Answers**: 1-b, 2-a                   **Answer:** C) option
+                                            **Explanation:** ...
+
+Each lesson is read once, line by line, by a small state machine (outside a
+quiz section -> in a section -> reading a question's stem -> reading its
+options). Questions need at least two options to be kept; answers, hints
+and explanations are attached when the lesson gives them.
+
+Output goes to quizzes/<level>/<module>.json under the build directory,
+records in the question bank's format. Each file remembers the content hash
+of every lesson it covers, so unchanged lessons are not parsed again.
+"""
+
+import argparse
+import json
+import re
+
+from course_content import (
+    COURSES_DIR, BUILD_DIR, iter_modules, iter_lessons, read_lesson, lesson_title, hash_file, write_if_changed
+)
+from pipeline_profiling import profiler, profile_stage, add_profiling_arguments, profiling_session
+from pipeline_io import map_concurrently
+from course_config import add_config_arguments, load_config
+
+QUIZZES_DIR = BUILD_DIR / 'quizzes'
+
+# Bump when parsing changes so cached lessons are re-extracted
+EXTRACTOR_VERSION = 1
+
+QUIZ_HEADING_RE = re.compile(r'\b(quiz|knowledge (assessment|check)|assessment questions|multiple choice'
+                             r'|practice questions|test your understanding)\b', re.IGNORECASE)
+HEADING_RE = re.compile(r'^(#{1,6})\s+(.*?)\s*#*\s*$')
+QUESTION_HEADING_RE = re.compile(r'^(?:\*\*)?Question\s+(\d+)\b[:.)]?\s*(.*?)(?:\*\*)?$', re.IGNORECASE)
+FENCE_RE = re.compile(r'^\s*(```|~~~)')
+STEM_RE = re.compile(r'^\s*(?:\*\*)?(\d+)[.)]\s+(.+)$')
+OPTION_RE = re.compile(r'^\s*(?:[-*]\s+)?\(?([a-hA-H])[).]\s+(.+)$')
+BOLD_LINE_RE = re.compile(r'^\*\*(.+?)\*\*\s*$')
+ANSWER_RE = re.compile(r'^\**\s*(answers?|correct answer|answer key)\s*\**\s*:\s*\**\s*(.*)$', re.IGNORECASE)
+ANSWER_LIST_RE = re.compile(r'(\d+)\s*[-–:.)]\s*\(?([a-hA-H])\b')
+EXPLANATION_RE = re.compile(r'^\**\s*(?:💡\s*)?(explanation|hint)\s*\**\s*:\s*\**\s*(.*)$', re.IGNORECASE)
+
+OUTSIDE, SECTION, STEM, OPTIONS = 'outside', 'section', 'stem', 'options'
+
+def clean(text):
+    """Drop Markdown emphasis around a stem or option"""
+    return text.strip().strip('*').strip()
+
+def option_index(text, options):
+    """Resolve 'C) text', 'c' or the option text itself to an option index"""
+    text = clean(text)
+    letter = re.match(r'^\(?([a-hA-H])(?:[).]|$|\s)', text)
+    if letter:
+        index = ord(letter.group(1).lower()) - ord('a')
+        if index < len(options):
+            return index
+    lowered = text.lower()
+    for index, option in enumerate(options):
+        if option.lower() == lowered:
+            return index
+    return None
+
+class QuizParser:
+    """Single-pass, line-oriented quiz extractor for one lesson body"""
+
+    def __init__(self):
+        self.state = OUTSIDE
+        self.section_level = 0
+        self.fence = None
+        self.questions = []
+        self.current = None
+        self.last = None
+        self.pending_answers = {}
+        self.section_start = 0
+
+    def feed(self, line):
+        stripped = line.rstrip('\n').rstrip()
+        marker = FENCE_RE.match(stripped)
+        if marker:
+            self.fence = None if self.fence == marker.group(1) else (self.fence or marker.group(1))
+            return
+        if self.fence:
+            return
+
+        heading = HEADING_RE.match(stripped)
+        if heading:
+            self.on_heading(len(heading.group(1)), heading.group(2))
+            return
+        if self.state == OUTSIDE or not stripped:
+            return
+
+        answer = ANSWER_RE.match(stripped)
+        if answer:
+            self.on_answer(answer.group(2))
+            return
+        note = EXPLANATION_RE.match(stripped)
+        if note:
+            target = self.current or self.last
+            if target is not None:
+                target[note.group(1).lower()] = clean(note.group(2))
+            return
+
+        question_heading = QUESTION_HEADING_RE.match(stripped)
+        option = OPTION_RE.match(stripped)
+        stem = STEM_RE.match(stripped)
+        bold = BOLD_LINE_RE.match(stripped)
+        if question_heading:
+            self.start_question(int(question_heading.group(1)), '', clean(question_heading.group(2)))
+        elif option and self.current is not None and self.state in (STEM, OPTIONS):
+            expected = chr(ord('a') + len(self.current['options']))
+            if option.group(1).lower() == expected:
+                self.current['options'].append(clean(option.group(2)))
+                self.state = OPTIONS
+            else:
+                self.finish_question()
+        elif stem:
+            self.start_question(int(stem.group(1)), clean(stem.group(2)))
+        elif self.state == STEM and self.current is not None:
+            # Stems under "### Question N" headings, or stems spanning several lines
+            text = clean(bold.group(1) if bold else stripped)
+            self.current['question'] = f"{self.current['question']} {text}".strip()
+        else:
+            self.finish_question()
+
+    def on_heading(self, level, title):
+        question_heading = QUESTION_HEADING_RE.match(title)
+        if self.state != OUTSIDE and question_heading:
+            self.start_question(int(question_heading.group(1)), '', clean(question_heading.group(2)))
+        elif QUIZ_HEADING_RE.search(title) and (self.state == OUTSIDE or level <= self.section_level):
+            self.finish_section()
+            self.state = SECTION
+            self.section_level = level
+            self.section_start = len(self.questions)
+        elif self.state != OUTSIDE and level <= self.section_level:
+            self.finish_section()
+        elif self.state != OUTSIDE:
+            # A sub-heading such as "### Short Answer Questions" ends the current question only
+            self.finish_question()
+            if QUIZ_HEADING_RE.search(title):
+                self.state = SECTION
+
+    def start_question(self, number, text, title=''):
+        self.finish_question()
+        self.current = {'number': number, 'question': text, 'options': [], 'answer': None}
+        if title:
+            self.current['title'] = title
+        self.state = STEM
+
+    def on_answer(self, text):
+        pairs = ANSWER_LIST_RE.findall(text)
+        if len(pairs) > 1 or (pairs and self.current is None):
+            # "Answers: 1-b, 2-c" key for the whole section
+            for number, letter in pairs:
+                self.pending_answers[int(number)] = letter
+            self.finish_question()
+        else:
+            # Answers may follow a hint or explanation that already closed the question
+            target = self.current or self.last
+            if target is not None and target['options']:
+                target['answer'] = option_index(text, target['options'])
+            self.finish_question()
+
+    def finish_question(self):
+        if self.current is not None and len(self.current['options']) >= 2 and self.current['question']:
+            self.questions.append(self.current)
+            self.last = self.current
+        self.current = None
+        if self.state != OUTSIDE:
+            self.state = SECTION
+
+    def finish_section(self):
+        self.finish_question()
+        for question in self.questions[self.section_start:]:
+            letter = self.pending_answers.get(question['number'])
+            if question['answer'] is None and letter:
+                question['answer'] = option_index(letter, question['options'])
+        self.pending_answers = {}
+        self.section_start = len(self.questions)
+        self.last = None
+        self.state = OUTSIDE
+
+    def close(self):
+        self.finish_section()
+        return self.questions
+
+def parse_quizzes(text):
+    """Extract [{'number', 'question', 'options', 'answer', ...}] from a lesson body"""
+    parser = QuizParser()
+    for line in text.splitlines():
+        parser.feed(line)
+    return parser.close()
+
+def extract_lesson(task):
+    """Parse one lesson into question-bank records; runs in an I/O worker thread"""
+    lesson_file, level, module_name, digest = task
+    with profiler.span('read', file=lesson_file):
+        metadata, body = read_lesson(lesson_file)
+    with profiler.span('parse', file=lesson_file):
+        questions = parse_quizzes(body)
+
+    title = lesson_title(metadata, body, lesson_file)
+    tags = metadata.get('tags') if isinstance(metadata.get('tags'), list) else []
+    records = []
+    for position, question in enumerate(questions, 1):
+        record = {
+            'id': f"{module_name}/{lesson_file.stem}#q{position}",
+            'level': level,
+            'module': module_name,
+            'lesson': lesson_file.stem,
+            'difficulty': metadata.get('difficulty') or 'Beginner',
+            'topic': title,
+            'tags': [str(tag) for tag in tags],
+            'question': question['question'],
+            'options': question['options'],
+            'answer': question['answer']
+        }
+        for key in ('title', 'hint', 'explanation'):
+            if question.get(key):
+                record[key] = question[key]
+        records.append(record)
+    return {'sha256': digest, 'count': len(records)}, records
+
+def load_quiz_file(quiz_file):
+    if quiz_file.exists():
+        with open(quiz_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') == EXTRACTOR_VERSION:
+            return data
+    return {}
+
+@profile_stage('quiz-extract')
+def extract_quizzes(courses_dir=COURSES_DIR, quizzes_dir=QUIZZES_DIR, io_limit=None):
+    """Write per-module quiz records, re-parsing only lessons whose content changed"""
+    total_questions = 0
+    parsed = 0
+
+    for level, module_dir in iter_modules(courses_dir):
+        quiz_file = quizzes_dir / level / f"{module_dir.name}.json"
+        previous = load_quiz_file(quiz_file)
+        previous_lessons = previous.get('lessons', {})
+        previous_items = {}
+        for item in previous.get('items', []):
+            previous_items.setdefault(item['lesson'], []).append(item)
+
+        lessons = iter_lessons(module_dir)
+        digests = map_concurrently(hash_file, lessons, io_limit, return_exceptions=True)
+        tasks = []
+        entries, items = {}, {}
+        for lesson_file, digest in zip(lessons, digests):
+            if isinstance(digest, Exception):
+                print(f"Error reading {lesson_file}: {digest}")
+                continue
+            cached = previous_lessons.get(lesson_file.stem)
+            if cached and cached['sha256'] == digest:
+                entries[lesson_file.stem] = cached
+                items[lesson_file.stem] = previous_items.get(lesson_file.stem, [])
+            else:
+                tasks.append((lesson_file, level, module_dir.name, digest))
+
+        for task, result in zip(tasks, map_concurrently(extract_lesson, tasks, io_limit, return_exceptions=True)):
+            if isinstance(result, Exception):
+                print(f"Error extracting quizzes from {task[0]}: {result}")
+                continue
+            entries[task[0].stem], items[task[0].stem] = result
+            parsed += 1
+
+        module_items = [item for stem in sorted(items) for item in items[stem]]
+        document = {
+            'version': EXTRACTOR_VERSION,
+            'level': level,
+            'module': module_dir.name,
+            'lessons': dict(sorted(entries.items())),
+            'items': module_items
+        }
+        quiz_file.parent.mkdir(parents=True, exist_ok=True)
+        with profiler.span('write', file=quiz_file):
+            write_if_changed(quiz_file, json.dumps(document, ensure_ascii=False, indent=1).encode('utf-8'))
+        total_questions += len(module_items)
+
+    print(f"Quiz extraction: {total_questions} questions, {parsed} lessons parsed")
+    return total_questions
+
+def main():
+    """Main function to extract lesson quizzes"""
+
+    parser = argparse.ArgumentParser(description="Extract inline lesson quizzes into structured question records")
+    add_config_arguments(parser)
+    add_profiling_arguments(parser)
+    args = parser.parse_args()
+    config = load_config(args)
+    quizzes_dir = config.build_dir / QUIZZES_DIR.name
+
+    print("=== INR100 Quiz Extractor ===")
+    print()
+
+    with profiling_session(args, 'extract_quizzes'):
+        questions = extract_quizzes(config.corpus_dir, quizzes_dir)
+
+    print()
+    print("=== QUIZ EXTRACTION COMPLETE ===")
+    print(f"Questions extracted: {questions}")
+    print(f"Output directory: {quizzes_dir}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+INR100 Financial Calculator Engine
+Vectorized SIP, lumpsum, EMI, compound interest, inflation and retirement calculators
+
+Every calculator takes scalars or NumPy arrays and broadcasts them against each
+other, so one call evaluates thousands of parameter sets:
+
+    emi(2_500_000, [8.5, 9.0, 9.5], 240)          # three loans at once
+    sip_future_value(np.arange(500, 50_001, 500)[:, None], 12, np.arange(1, 41))
+
+Rates are annual percentages, tenures are in years unless the name says
+months. Schedules (amortisation tables, SIP growth curves, inflation
+projections) come back as 2-D arrays with one row per parameter set.
+
+The build step publishes per-unit factor grids (every calculator here is
+linear in the amount), which the interactive practical-tools widgets
+interpolate client-side instead of calling the server on every slider move.
+"""
+
+import argparse
+import json
+
+import numpy as np
+
+from course_content import PUBLISH_DIR, write_if_changed
+from pipeline_profiling import profiler, profile_stage, add_profiling_arguments, profiling_session
+from course_config import add_config_arguments, load_config
+
+CALCULATORS_DIR = PUBLISH_DIR / 'calculators'
+
+# Grid axes published for the client-side widgets
+RATE_AXIS = np.round(np.arange(0.0, 30.01, 0.25), 2)           # % per year
+YEAR_AXIS = np.arange(1, 51)                                     # years
+TENURE_AXIS = np.arange(6, 361, 6)                               # loan months
+INFLATION_AXIS = np.round(np.arange(0.0, 15.01, 0.25), 2)       # % per year
+
+# Significant digits kept in published grids; interpolation error dominates beyond this
+GRID_PRECISION = 7
+
+def _rate(annual_rate, periods_per_year=12):
+    """Annual percentage -> per-period decimal rate"""
+    return np.asarray(annual_rate, dtype=np.float64) / 100.0 / periods_per_year
+
+def _annuity_factor(rate, periods):
+    """Return (((1 + r)^n - 1) / r, (1 + r)^n), taking the r -> 0 limit n"""
+    rate, periods = np.broadcast_arrays(rate, np.asarray(periods, dtype=np.float64))
+    exponent = periods * np.log1p(rate)
+    # expm1 keeps small rates accurate; zero rates take the limit instead of dividing
+    safe = np.where(rate == 0, 1.0, rate)
+    return np.where(rate == 0, periods, np.expm1(exponent) / safe), np.exp(exponent)
+
+def lumpsum_future_value(principal, annual_rate, years, periods_per_year=1):
+    """Future value of a one-time investment compounded periods_per_year times a year"""
+    rate = _rate(annual_rate, periods_per_year)
+    periods = np.asarray(years, dtype=np.float64) * periods_per_year
+    return np.asarray(principal, dtype=np.float64) * np.exp(periods * np.log1p(rate))
+
+def compound_interest(principal, annual_rate, years, periods_per_year=12):
+    """Interest earned (future value minus principal)"""
+    principal = np.asarray(principal, dtype=np.float64)
+    return lumpsum_future_value(principal, annual_rate, years, periods_per_year) - principal
+
+def sip_future_value(monthly_amount, annual_rate, years):
+    """Future value of a monthly SIP paid at the start of each month"""
+    rate = _rate(annual_rate)
+    factor, _ = _annuity_factor(rate, np.asarray(years, dtype=np.float64) * 12)
+    return np.asarray(monthly_amount, dtype=np.float64) * factor * (1 + rate)
+
+def sip_required_monthly(target, annual_rate, years):
+    """Monthly SIP needed to reach target"""
+    return np.asarray(target, dtype=np.float64) / sip_future_value(1.0, annual_rate, years)
+
+def emi(principal, annual_rate, months):
+    """Equated monthly instalment for a reducing-balance loan"""
+    rate = _rate(annual_rate)
+    factor, growth = _annuity_factor(rate, months)
+    # P * r * (1+r)^n / ((1+r)^n - 1) == P * growth / factor
+    return np.asarray(principal, dtype=np.float64) * growth / factor
+
+def inflation_adjusted(amount, inflation_rate, years):
+    """Today's purchasing power of an amount received after years of inflation"""
+    return np.asarray(amount, dtype=np.float64) / lumpsum_future_value(1.0, inflation_rate, years)
+
+def future_cost(amount, inflation_rate, years):
+    """What something costing amount today will cost after years of inflation"""
+    return lumpsum_future_value(amount, inflation_rate, years)
+
+def retirement_corpus(monthly_expense, inflation_rate, years_to_retirement, years_in_retirement,
+                      post_retirement_return):
+    """Corpus needed at retirement to fund inflation-growing monthly expenses
+
+    Expenses are paid at the start of each month; the corpus earns
+    post_retirement_return while expenses keep growing with inflation.
+    """
+    first_expense = future_cost(monthly_expense, inflation_rate, years_to_retirement)
+    # Real (inflation-adjusted) monthly return, so a growing annuity becomes a level one
+    real = (1 + _rate(post_retirement_return)) / (1 + _rate(inflation_rate)) - 1
+    months = np.asarray(years_in_retirement, dtype=np.float64) * 12
+    factor, growth = _annuity_factor(real, months)
+    # Present value of an annuity due: (1 - (1+r)^-n) / r * (1+r)
+    return first_expense * factor / growth * (1 + real)
+
+def _batch(*arrays):
+    """Broadcast parameters into flat 1-D columns, one entry per parameter set"""
+    return [array.ravel() for array in np.broadcast_arrays(*(np.asarray(a, dtype=np.float64) for a in arrays))]
+
+def amortization_schedule(principal, annual_rate, months):
+    """Month-by-month EMI tables for every parameter set
+
+    Returns a dict of (sets, max months) arrays: payment, interest, principal,
+    balance. Months past a loan's tenure are zero. Balances use the closed form
+    B_k = P(1+r)^k - EMI((1+r)^k - 1)/r, so no Python loop runs per month.
+    """
+    principal, annual_rate, months = _batch(principal, annual_rate, months)
+    months = np.rint(months).astype(np.int64)
+    rate = _rate(annual_rate)[:, None]
+    payment = emi(principal, annual_rate, months)[:, None]
+    k = np.arange(0, months.max() + 1, dtype=np.float64)[None, :]
+
+    factor, growth = _annuity_factor(rate, k)
+    balance = np.maximum(principal[:, None] * growth - payment * factor, 0.0)
+    interest = balance[:, :-1] * rate
+    active = k[:, 1:] <= months[:, None]
+    repaid = np.where(active, balance[:, :-1] - balance[:, 1:], 0.0)
+    return {
+        'payment': np.where(active, payment, 0.0),
+        'interest': np.where(active, interest, 0.0),
+        'principal': repaid,
+        'balance': np.where(active, balance[:, 1:], 0.0)
+    }
+
+def sip_growth_curve(monthly_amount, annual_rate, years):
+    """Invested amount and portfolio value at the end of each month
+
+    Returns a dict of (sets, max months) arrays: invested, value. Months past
+    a plan's tenure repeat its final values.
+    """
+    monthly_amount, annual_rate, years = _batch(monthly_amount, annual_rate, years)
+    months = np.rint(years * 12).astype(np.int64)
+    k = np.arange(1, months.max() + 1, dtype=np.float64)[None, :]
+    k = np.minimum(k, months[:, None])
+    rate = _rate(annual_rate)[:, None]
+    factor, _ = _annuity_factor(rate, k)
+    return {
+        'invested': monthly_amount[:, None] * k,
+        'value': monthly_amount[:, None] * factor * (1 + rate)
+    }
+
+def inflation_projection(amount, inflation_rate, years):
+    """Future cost and today's-value of an amount for each year 0..years
+
+    Returns a dict of (sets, max years + 1) arrays: nominal, real.
+    """
+    amount, inflation_rate, years = _batch(amount, inflation_rate, years)
+    t = np.arange(0, int(years.max()) + 1, dtype=np.float64)[None, :]
+    t = np.minimum(t, years[:, None])
+    growth = lumpsum_future_value(1.0, inflation_rate[:, None], t)
+    return {'nominal': amount[:, None] * growth, 'real': amount[:, None] / growth}
+
+def calculator_grid(function, axes, **fixed):
+    """Evaluate function over the outer product of axes
+
+    axes maps parameter name -> 1-D values; the result has one dimension per
+    axis in the given order. fixed parameters are passed through unchanged.
+    """
+    names = list(axes)
+    grids = np.ix_(*(np.asarray(axes[name], dtype=np.float64) for name in names))
+    values = function(**dict(zip(names, grids)), **fixed)
+    return np.broadcast_to(values, tuple(len(axes[name]) for name in names))
+
+def grid_document(name, description, axes, values, unit):
+    """JSON-ready grid: axes plus row-major values rounded to GRID_PRECISION digits"""
+    return {
+        'calculator': name,
+        'description': description,
+        'unit': unit,
+        'axes': {axis: np.asarray(points).tolist() for axis, points in axes.items()},
+        'values': [[float(f"{value:.{GRID_PRECISION}g}") for value in row] for row in np.asarray(values)]
+    }
+
+def calculator_grids():
+    """Per-unit factor grids for every interactive calculator"""
+    rate_years = {'annual_rate': RATE_AXIS, 'years': YEAR_AXIS}
+    return [
+        grid_document('sip', 'Future value of 1 rupee invested monthly', rate_years,
+                      calculator_grid(sip_future_value, rate_years, monthly_amount=1.0), 'per monthly rupee'),
+        grid_document('lumpsum', 'Future value of 1 rupee invested once, compounded yearly', rate_years,
+                      calculator_grid(lumpsum_future_value, rate_years, principal=1.0), 'per rupee'),
+        grid_document('compound-interest', 'Future value of 1 rupee compounded monthly', rate_years,
+                      calculator_grid(lumpsum_future_value, rate_years, principal=1.0, periods_per_year=12),
+                      'per rupee'),
+        grid_document('emi', 'Monthly instalment per rupee borrowed',
+                      {'annual_rate': RATE_AXIS, 'months': TENURE_AXIS},
+                      calculator_grid(emi, {'annual_rate': RATE_AXIS, 'months': TENURE_AXIS}, principal=1.0),
+                      'per rupee borrowed'),
+        grid_document('inflation', "Future cost of 1 rupee of today's spending",
+                      {'inflation_rate': INFLATION_AXIS, 'years': YEAR_AXIS},
+                      calculator_grid(future_cost, {'inflation_rate': INFLATION_AXIS, 'years': YEAR_AXIS},
+                                      amount=1.0),
+                      'per rupee today')
+    ]
+
+@profile_stage('calculator-grids')
+def build_calculator_grids(calculators_dir=CALCULATORS_DIR):
+    """Publish one JSON grid per calculator plus an index; returns the number of grids"""
+    calculators_dir.mkdir(parents=True, exist_ok=True)
+    with profiler.span('transform', category='stage'):
+        grids = calculator_grids()
+
+    index = {}
+    written = 0
+    for grid in grids:
+        path = calculators_dir / f"{grid['calculator']}.json"
+        with profiler.span('write', file=path):
+            written += write_if_changed(path, json.dumps(grid, separators=(',', ':')).encode('utf-8'))
+        index[grid['calculator']] = {'file': path.name, 'description': grid['description'],
+                                     'axes': {axis: [points[0], points[-1], len(points)]
+                                              for axis, points in grid['axes'].items()}}
+    write_if_changed(calculators_dir / 'index.json', json.dumps(index, indent=2).encode('utf-8'))
+
+    print(f"Calculator grids: {len(grids)} grids, {written} updated")
+    return len(grids)
+
+def main():
+    """Main function to publish calculator grids"""
+
+    parser = argparse.ArgumentParser(description="Publish precomputed calculator grids for the practical tools")
+    add_config_arguments(parser)
+    add_profiling_arguments(parser)
+    args = parser.parse_args()
+    config = load_config(args)
+    calculators_dir = config.publish_dir / CALCULATORS_DIR.name
+
+    print("=== INR100 Calculator Grids ===")
+    print()
+
+    with profiling_session(args, 'financial_calculators'):
+        grids = build_calculator_grids(calculators_dir)
+
+    print()
+    print("=== CALCULATOR GRIDS COMPLETE ===")
+    print(f"Grids published: {grids}")
+    print(f"Output directory: {calculators_dir}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+INR100 Certificate Generator
+Renders module exam certificates in bulk as deterministic SVG files
+
+Each module exam awards a named certification (assessment-center/README.md).
+The SVG template is compiled once per certificate type: it is split into
+literal chunks and per-user slots, and the type's own fields (certificate
+title, module, level, pass mark) are baked into the literals. Rendering a
+certificate is then a single join of those chunks with the escaped user
+fields.
+
+Awards are rendered in batches across a process pool, so a cohort of
+thousands finishes in seconds offline instead of in the web tier. Every
+certificate is keyed by a verification hash of its contents, an HMAC under
+INR100_CERTIFICATE_KEY, and written to certificates/<hh>/<hash>.svg; the
+same award always produces the same bytes, so reruns rewrite nothing.
+The verification index mapping hashes to awards (user, module, score, date)
+is private: it is written to the build directory as certificate-index.json,
+never next to the public SVGs.
+Without a key anyone could recompute the hash, so the generator refuses to
+issue unless --unsigned is passed (for previews and local builds).
+
+    INR100_CERTIFICATE_KEY=... python3 courses/generate_certificates.py awards.jsonl
+    python3 courses/generate_certificates.py scores.csv --module module-01-money-basics --date 2026-10-19
+
+Awards are JSON lines {"user", "name", "module", "percent", "date"}, or the
+grader's scores CSV with --module (names default to user ids). Awards below
+the module's pass mark are skipped.
+"""
+
+import argparse
+import csv
+import datetime
+import hashlib
+import hmac
+import json
+import os
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+from course_content import BUILD_DIR, PUBLISH_DIR, write_if_changed
+from pipeline_profiling import profiler, profile_stage, add_profiling_arguments, profiling_session
+from question_bank import EXAM_SPECS
+from course_config import add_config_arguments, load_config
+
+CERTIFICATES_DIR = PUBLISH_DIR / 'certificates'
+CERTIFICATE_INDEX_FILE = BUILD_DIR / 'certificate-index.json'
+
+# Certificate awarded by each module exam, as listed in the assessment center
+CERTIFICATES = {
+    'module-01-money-basics': ('foundation-level', 'Money Basics Certification'),
+    'module-02-banking-systems': ('foundation-level', 'Banking & Safety Certification'),
+    'module-03-investing-intro': ('foundation-level', 'Investment Fundamentals Certification'),
+    'module-04-mutual-funds': ('intermediate-level', 'Mutual Fund Specialist Certification'),
+    'module-05-stock-analysis': ('intermediate-level', 'Stock Analysis Professional Certification'),
+    'module-06-portfolio-building': ('intermediate-level', 'Portfolio Management Certification'),
+    'module-07-derivatives': ('advanced-level', 'Derivatives Trading Certification'),
+    'module-08-alternative-investments': ('advanced-level', 'Alternative Investments Certification'),
+    'module-09-professional-trading': ('advanced-level', 'Professional Trading Certification')
+}
+
+CERTIFICATE_KEY = os.environ.get('INR100_CERTIFICATE_KEY', '').encode('utf-8')
+
+# Bump when the hashed fields or the template change, so old hashes stay distinguishable
+CERTIFICATE_VERSION = 1
+
+# Awards rendered per process-pool task
+BATCH_SIZE = 256
+
+SLOT_RE = re.compile(r'\{\{(\w+)\}\}')
+
+CERTIFICATE_TEMPLATE = """<svg xmlns="http://www.w3.org/2000/svg" width="1123" height="794" viewBox="0 0 1123 794">
+  <rect width="1123" height="794" fill="#fffdf7"/>
+  <rect x="28" y="28" width="1067" height="738" fill="none" stroke="#1f4e79" stroke-width="6"/>
+  <rect x="44" y="44" width="1035" height="706" fill="none" stroke="#c9a227" stroke-width="2"/>
+  <text x="561.5" y="130" text-anchor="middle" font-family="Georgia, serif" font-size="30" fill="#1f4e79">INR100 Financial Education Platform</text>
+  <text x="561.5" y="205" text-anchor="middle" font-family="Georgia, serif" font-size="44" font-weight="bold" fill="#1f2933">{{certificate}}</text>
+  <text x="561.5" y="275" text-anchor="middle" font-family="Helvetica, Arial, sans-serif" font-size="20" fill="#52606d">This certifies that</text>
+  <text x="561.5" y="350" text-anchor="middle" font-family="Georgia, serif" font-size="48" font-style="italic" fill="#1f2933">{{name}}</text>
+  <text x="561.5" y="420" text-anchor="middle" font-family="Helvetica, Arial, sans-serif" font-size="20" fill="#52606d">has passed the {{module_title}} assessment ({{level_title}}) with a score of {{score}}</text>
+  <text x="561.5" y="452" text-anchor="middle" font-family="Helvetica, Arial, sans-serif" font-size="16" fill="#7b8794">Passing score {{pass_mark}}</text>
+  <line x1="180" y1="610" x2="430" y2="610" stroke="#1f2933" stroke-width="1"/>
+  <text x="305" y="640" text-anchor="middle" font-family="Helvetica, Arial, sans-serif" font-size="16" fill="#52606d">Issued {{date}}</text>
+  <line x1="693" y1="610" x2="943" y2="610" stroke="#1f2933" stroke-width="1"/>
+  <text x="818" y="640" text-anchor="middle" font-family="Helvetica, Arial, sans-serif" font-size="16" fill="#52606d">INR100 Assessment Center</text>
+  <text x="561.5" y="725" text-anchor="middle" font-family="Courier New, monospace" font-size="13" fill="#7b8794">Verification {{verification}}</text>
+</svg>
+"""
+
+def title_case(slug):
+    """'module-01-money-basics' -> 'Money Basics'"""
+    words = [word for word in slug.split('-') if not word.isdigit() and word not in ('module', 'level')]
+    return ' '.join(word.capitalize() for word in words)
+
+def compile_template(template, constants):
+    """Split a template into (literals, slots) with constant slots already filled
+
+    Rendering is then literals[0] + value(slots[0]) + literals[1] + ...; the
+    literal list is one longer than the slot list.
+    """
+    pieces = SLOT_RE.split(template)
+    literals, slots = [pieces[0]], []
+    for slot, literal in zip(pieces[1::2], pieces[2::2]):
+        if slot in constants:
+            literals[-1] += escape(str(constants[slot]), {'"': '&quot;'}) + literal
+        else:
+            slots.append(slot)
+            literals.append(literal)
+    return literals, slots
+
+@lru_cache(maxsize=None)
+def certificate_template(template, module):
+    """Compiled template for one certificate type; cached per worker process"""
+    level, certificate = CERTIFICATES[module]
+    pass_mark = EXAM_SPECS[module][2]
+    return compile_template(template, {
+        'certificate': certificate,
+        'module_title': title_case(module),
+        'level_title': title_case(level),
+        'pass_mark': f"{pass_mark}%"
+    })
+
+def render(compiled, fields):
+    """Fill a compiled template's slots"""
+    literals, slots = compiled
+    parts = [literals[0]]
+    for slot, literal in zip(slots, literals[1:]):
+        parts.append(escape(str(fields[slot]), {'"': '&quot;'}))
+        parts.append(literal)
+    return ''.join(parts)
+
+def verification_hash(award):
+    """Deterministic hash of everything the certificate asserts"""
+    message = '\n'.join([str(CERTIFICATE_VERSION), award['user'], award['name'], award['module'],
+                         f"{award['percent']:g}", award['date']])
+    return hmac.new(CERTIFICATE_KEY, message.encode('utf-8'), hashlib.sha256).hexdigest()
+
+def certificate_path(certificates_dir, digest):
+    return certificates_dir / digest[:2] / f"{digest}.svg"
+
+def render_batch(task):
+    """Render and write one batch of awards; runs in a worker process
+
+    Returns [(hash, index entry, written)].
+    """
+    template, awards, certificates_dir = task
+    results = []
+    for award in awards:
+        digest = verification_hash(award)
+        svg = render(certificate_template(template, award['module']), {
+            'name': award['name'],
+            'score': f"{award['percent']:g}%",
+            'date': award['date'],
+            'verification': digest
+        })
+        path = certificate_path(certificates_dir, digest)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        written = write_if_changed(path, svg.encode('utf-8'))
+        entry = {
+            'user': award['user'],
+            'module': award['module'],
+            'certificate': CERTIFICATES[award['module']][1],
+            'percent': award['percent'],
+            'date': award['date'],
+            'file': path.relative_to(certificates_dir).as_posix()
+        }
+        results.append((digest, entry, written))
+    return results
+
+def load_awards(path, module=None, date=None):
+    """Read awards from JSON lines or a scores CSV, filling module and date defaults"""
+    path = Path(path)
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if path.suffix == '.csv':
+            rows = list(csv.DictReader(f))
+        else:
+            rows = [json.loads(line) for line in f if line.strip()]
+
+    awards = []
+    for row in rows:
+        awards.append({
+            'user': str(row['user']),
+            'name': str(row.get('name') or row['user']),
+            'module': row.get('module') or module,
+            'percent': float(row['percent']),
+            'date': row.get('date') or date or datetime.date.today().isoformat()
+        })
+    return awards
+
+@profile_stage('certificates')
+def generate_certificates(awards, certificates_dir=CERTIFICATES_DIR, template=CERTIFICATE_TEMPLATE, workers=None,
+                          unsigned=False, index_file=CERTIFICATE_INDEX_FILE):
+    """Render certificates for passing awards and update the verification index
+
+    Raises ValueError without INR100_CERTIFICATE_KEY unless unsigned is set.
+    Returns the number of certificates issued.
+    """
+    if not CERTIFICATE_KEY:
+        if not unsigned:
+            raise ValueError("INR100_CERTIFICATE_KEY is not set; verification hashes would not be signed")
+        print("Warning: INR100_CERTIFICATE_KEY is not set; issuing unsigned certificates")
+    passing = []
+    unknown = Counter()
+    for award in awards:
+        if award['module'] not in CERTIFICATES:
+            unknown[award['module']] += 1
+        elif award['percent'] >= EXAM_SPECS[award['module']][2]:
+            passing.append(award)
+    for module, count in unknown.items():
+        print(f"Skipping {count} awards for {module}: no certificate for this module")
+
+    tasks = [(template, passing[start:start + BATCH_SIZE], certificates_dir)
+             for start in range(0, len(passing), BATCH_SIZE)]
+    workers = workers or os.cpu_count()
+    with profiler.span('render', category='stage'):
+        if workers > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                batches = list(executor.map(render_batch, tasks))
+        else:
+            batches = [render_batch(task) for task in tasks]
+
+    # Earlier versions published the index with the SVGs, exposing every award
+    (certificates_dir / 'index.json').unlink(missing_ok=True)
+    index = {}
+    if index_file.exists():
+        with open(index_file, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+    written = 0
+    for batch in batches:
+        for digest, entry, changed in batch:
+            index[digest] = entry
+            written += changed
+    index_file.parent.mkdir(parents=True, exist_ok=True)
+    with profiler.span('write', file=index_file):
+        write_if_changed(index_file, json.dumps(index, sort_keys=True, indent=1).encode('utf-8'))
+
+    print(f"Certificates: {len(passing)} issued ({written} new), {len(awards) - len(passing)} below pass mark "
+          f"or without a certificate")
+    return len(passing)
+
+def main():
+    """Main function to render certificates for a cohort"""
+
+    parser = argparse.ArgumentParser(description="Render module exam certificates in bulk")
+    parser.add_argument('awards', help='JSON lines awards file, or a scores CSV with --module')
+    parser.add_argument('--module', help='module for awards that do not name one')
+    parser.add_argument('--date', help='issue date (YYYY-MM-DD) for awards without one; defaults to today')
+    parser.add_argument('--template', help='SVG template with {{field}} slots to use instead of the built-in one')
+    parser.add_argument('--workers', type=int, default=None, help='render processes (default: CPU count)')
+    parser.add_argument('--unsigned', action='store_true',
+                        help='issue without INR100_CERTIFICATE_KEY; hashes then prove nothing')
+    add_config_arguments(parser)
+    add_profiling_arguments(parser)
+    args = parser.parse_args()
+    config = load_config(args)
+    certificates_dir = config.publish_dir / CERTIFICATES_DIR.name
+    index_file = config.build_dir / CERTIFICATE_INDEX_FILE.name
+    template = Path(args.template).read_text(encoding='utf-8') if args.template else CERTIFICATE_TEMPLATE
+    if not CERTIFICATE_KEY and not args.unsigned:
+        parser.error("INR100_CERTIFICATE_KEY is not set; pass --unsigned to issue unverifiable certificates")
+
+    print("=== INR100 Certificate Generator ===")
+    print()
+
+    with profiling_session(args, 'generate_certificates'):
+        issued = generate_certificates(load_awards(args.awards, args.module, args.date), certificates_dir,
+                                       template, args.workers, args.unsigned, index_file)
+
+    print()
+    print("=== CERTIFICATES COMPLETE ===")
+    print(f"Certificates issued: {issued}")
+    print(f"Output directory: {certificates_dir}")
+    print(f"Verification index: {index_file}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+INR100 Batch Exam Grader
+Scores a whole cohort's answers at once and maintains per-item statistics
+
+A cohort is a response matrix with one row per user and one column per item:
+the chosen option index, BLANK for a presented but unanswered item, or
+NOT_PRESENTED for an item that was not on that user's paper (exams are
+assembled per user, so papers differ). Rows are processed in chunks with
+NumPy, so memory stays bounded and millions of responses take seconds.
+
+Per item the grader accumulates additive sums, from which it derives:
+    p_value          share of presented users answering correctly (difficulty)
+    discrimination   point-biserial correlation between answering correctly and
+                     the user's score on the rest of their paper
+    options/blank    how often each option (distractor) was chosen or skipped
+
+Sums from successive cohorts are merged into item-stats.json, and the
+question bank is rebuilt so exam assembly stops serving items that the
+statistics flag.
+
+    python3 courses/grade_exams.py submissions.jsonl --scores scores.csv
+
+Submissions are JSON lines: {"user": "...", "answers": {"<item id>": <option index or null>}}.
+"""
+
+import argparse
+import csv
+import json
+import time
+
+import numpy as np
+
+from course_content import write_if_changed
+from pipeline_profiling import profiler, profile_stage, add_profiling_arguments, profiling_session
+from question_bank import QUESTION_BANK_FILE, ITEM_STATS_FILE, load_bank, answer_index, build_question_bank
+from course_config import add_config_arguments, load_config
+from extract_quizzes import QUIZZES_DIR
+
+NOT_PRESENTED = -1
+BLANK = -2
+
+# Users scored per chunk; bounds the (users x items) temporaries
+CHUNK_USERS = 32_768
+
+SUM_FIELDS = ('responses', 'correct', 'blank', 'rest_count', 'rest_correct', 'sum_rest', 'sum_rest_sq',
+              'sum_correct_rest')
+
+def score_cohort(responses, key, n_options, chunk_users=CHUNK_USERS):
+    """Score every user and accumulate per-item sums in one pass over the matrix
+
+    Returns (correct per user, presented per user, sums) where sums maps each
+    name in SUM_FIELDS to a per-item array and 'options' to (items, n_options)
+    choice counts.
+    """
+    responses = np.asarray(responses)
+    key = np.asarray(key)
+    users, items = responses.shape
+    sums = {field: np.zeros(items) for field in SUM_FIELDS}
+    sums['options'] = np.zeros((items, n_options), dtype=np.int64)
+    correct_total = np.zeros(users, dtype=np.int64)
+    presented_total = np.zeros(users, dtype=np.int64)
+    columns = np.arange(items)
+
+    for start in range(0, users, chunk_users):
+        block = responses[start:start + chunk_users]
+        presented = block != NOT_PRESENTED
+        correct = block == key
+        c = correct.sum(axis=1)
+        p = presented.sum(axis=1)
+        correct_total[start:start + len(block)] = c
+        presented_total[start:start + len(block)] = p
+
+        # Rest score: the user's percentage on the other items of their paper
+        has_rest = presented & (p > 1)[:, None]
+        rest = np.where(has_rest, (c[:, None] - correct) / np.maximum(p - 1, 1)[:, None], 0.0)
+        sums['responses'] += presented.sum(axis=0)
+        sums['correct'] += correct.sum(axis=0)
+        sums['rest_count'] += has_rest.sum(axis=0)
+        sums['rest_correct'] += (correct & has_rest).sum(axis=0)
+        sums['sum_rest'] += rest.sum(axis=0)
+        sums['sum_rest_sq'] += (rest * rest).sum(axis=0)
+        sums['sum_correct_rest'] += (rest * correct).sum(axis=0)
+        sums['blank'] += (block == BLANK).sum(axis=0)
+
+        answered = (block >= 0) & (block < n_options)
+        flat = (np.broadcast_to(columns, block.shape)[answered] * n_options + block[answered]).astype(np.int64)
+        sums['options'] += np.bincount(flat, minlength=items * n_options).reshape(items, n_options)
+
+    return correct_total, presented_total, sums
+
+def derive_statistics(sums):
+    """p-values and point-biserial discrimination from accumulated sums (NaN where undefined)"""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        p_value = sums['correct'] / sums['responses']
+        # Discrimination uses users whose paper had other items to compare against
+        n = sums['rest_count']
+        mean_x = sums['rest_correct'] / n
+        mean_r = sums['sum_rest'] / n
+        cov = sums['sum_correct_rest'] / n - mean_x * mean_r
+        var_x = mean_x * (1 - mean_x)
+        var_r = sums['sum_rest_sq'] / n - mean_r ** 2
+        discrimination = cov / np.sqrt(var_x * var_r)
+    return p_value, np.where(np.isfinite(discrimination), discrimination, np.nan)
+
+def parse_choice(choice):
+    """An answer's option index, BLANK for null, or None when it is not an integer"""
+    if choice is None:
+        return BLANK
+    if isinstance(choice, bool):
+        return None
+    try:
+        value = int(choice)
+    except (TypeError, ValueError, OverflowError):
+        return None
+    return value if value == choice or isinstance(choice, str) else None
+
+def cohort_matrix(submissions, bank_items):
+    """Build (responses, key, item ids, users, n_options) from submission records
+
+    Only items that appear in at least one submission get a column. Answers
+    that are not an option index of their item (out of range, non-integer)
+    are graded as BLANK and reported, so one bad record cannot stop a cohort.
+    """
+    positions = {item['id']: index for index, item in enumerate(bank_items)}
+    used = sorted({positions[item_id] for record in submissions for item_id in record['answers']
+                   if item_id in positions})
+    column = {index: c for c, index in enumerate(used)}
+    n_options = max((len(bank_items[index]['options']) for index in used), default=1)
+    dtype = np.int8 if n_options < 127 else np.int16
+
+    rows, columns, choices = [], [], []
+    for row, record in enumerate(submissions):
+        for item_id, choice in record['answers'].items():
+            if item_id in positions:
+                value = parse_choice(choice)
+                rows.append(row)
+                columns.append(column[positions[item_id]])
+                # Unparseable or huge values become -2**62, which the range check below rejects
+                choices.append(value if value is not None and -2 ** 62 < value < 2 ** 62 else -2 ** 62)
+
+    rows = np.array(rows, dtype=np.int64)
+    columns = np.array(columns, dtype=np.int64)
+    choices = np.array(choices, dtype=np.int64)
+    option_counts = np.array([len(bank_items[index]['options']) for index in used], dtype=np.int64)
+    valid = (choices == BLANK) | ((choices >= 0) & (choices < option_counts[columns]))
+    invalid = int((~valid).sum())
+    if invalid:
+        print(f"Grading {invalid} answers as blank: not an option index of their item")
+    responses = np.full((len(submissions), len(used)), NOT_PRESENTED, dtype=dtype)
+    responses[rows, columns] = np.where(valid, choices, BLANK)
+    key = np.array([answer_index(bank_items[index]) for index in used], dtype=dtype)
+    return responses, key, [bank_items[index]['id'] for index in used], [r['user'] for r in submissions], n_options
+
+def merge_item_stats(previous, item_ids, sums):
+    """Add this cohort's sums to the stored ones and recompute derived statistics"""
+    merged = dict(previous)
+    for column, item_id in enumerate(item_ids):
+        entry = dict(previous.get(item_id) or {field: 0 for field in SUM_FIELDS})
+        for field in SUM_FIELDS:
+            entry[field] = float(entry.get(field, 0)) + float(sums[field][column])
+        old_options = entry.get('options', [])
+        new_options = sums['options'][column].tolist()
+        width = max(len(old_options), len(new_options))
+        entry['options'] = [(old_options[i] if i < len(old_options) else 0)
+                            + (new_options[i] if i < len(new_options) else 0) for i in range(width)]
+        merged[item_id] = entry
+
+    ids = list(merged)
+    totals = {field: np.array([merged[item_id][field] for item_id in ids]) for field in SUM_FIELDS}
+    p_value, discrimination = derive_statistics(totals)
+    for item_id, p, d in zip(ids, p_value, discrimination):
+        entry = merged[item_id]
+        entry['responses'] = int(entry['responses'])
+        entry['p_value'] = None if np.isnan(p) else round(float(p), 4)
+        entry['discrimination'] = None if np.isnan(d) else round(float(d), 4)
+        answered = sum(entry['options'])
+        entry['option_frequencies'] = [round(count / answered, 4) if answered else 0 for count in entry['options']]
+    return merged
+
+def load_submissions(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+@profile_stage('grade-exams')
+def grade_submissions(submissions, bank_file=QUESTION_BANK_FILE, stats_file=ITEM_STATS_FILE):
+    """Grade a cohort against the bank and merge its item statistics
+
+    Returns [(user, correct, presented, percent)].
+    """
+    bank = load_bank(bank_file)
+    if bank is None:
+        raise FileNotFoundError(f"No question bank at {bank_file}")
+
+    with profiler.span('parse', category='stage'):
+        responses, key, item_ids, users, n_options = cohort_matrix(submissions, bank['items'])
+    start = time.perf_counter()
+    with profiler.span('transform', category='stage'):
+        correct, presented, sums = score_cohort(responses, key, n_options)
+    elapsed = time.perf_counter() - start
+
+    previous = {}
+    if stats_file.exists():
+        with open(stats_file, 'r', encoding='utf-8') as f:
+            previous = json.load(f).get('items', {})
+    merged = merge_item_stats(previous, item_ids, sums)
+    stats_file.parent.mkdir(parents=True, exist_ok=True)
+    with profiler.span('write', file=stats_file):
+        write_if_changed(stats_file, json.dumps({'version': 1, 'items': merged}, sort_keys=True,
+                                                separators=(',', ':')).encode('utf-8'))
+
+    print(f"Graded {len(users)} users x {len(item_ids)} items "
+          f"({int((responses != NOT_PRESENTED).sum())} responses) in {elapsed * 1000:.0f} ms")
+    with np.errstate(invalid='ignore', divide='ignore'):
+        percent = np.where(presented > 0, 100 * correct / presented, 0.0)
+    return list(zip(users, correct.tolist(), presented.tolist(), np.round(percent, 2).tolist()))
+
+def main():
+    """Main function to grade a cohort of exam submissions"""
+
+    parser = argparse.ArgumentParser(description="Grade exam submissions in bulk and update item statistics")
+    parser.add_argument('submissions', help='JSON lines file of {"user", "answers": {item id: option}}')
+    parser.add_argument('--scores', help='write per-user scores to this CSV file')
+    add_config_arguments(parser)
+    add_profiling_arguments(parser)
+    args = parser.parse_args()
+    config = load_config(args)
+    bank_file = config.build_dir / QUESTION_BANK_FILE.name
+    stats_file = config.build_dir / ITEM_STATS_FILE.name
+
+    print("=== INR100 Exam Grader ===")
+    print()
+
+    with profiling_session(args, 'grade_exams'):
+        scores = grade_submissions(load_submissions(args.submissions), bank_file, stats_file)
+        # Re-flag items so the next exams assembled skip the weak ones
+        build_question_bank(config.corpus_dir / 'assessment-center' / 'questions', bank_file, stats_file,
+                            config.build_dir / QUIZZES_DIR.name)
+
+    if args.scores:
+        with open(args.scores, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['user', 'correct', 'presented', 'percent'])
+            writer.writerows(scores)
+
+    print()
+    print("=== GRADING COMPLETE ===")
+    print(f"Users graded: {len(scores)}")
+    print(f"Item statistics: {stats_file}")
+
+if __name__ == "__main__":
+    main()
@@ -4,16 +4,35 @@ INR100 Advanced Features Implementation Script
 Implements content population, AI recommendations, analytics, mobile optimization, and APIs
 """
 
+import argparse
 import os
 import json
 import random
 from pathlib import Path
 from datetime import datetime, timedelta
 
-def create_sample_multimedia_content():
+from course_content import COURSES_DIR, DEFAULT_CONFIG
+from pipeline_profiling import profiler, profile_stage, add_profiling_arguments, profiling_session
+from course_config import add_config_arguments, load_config, mirror_source
+
+# Root of the Next.js app that receives the generated API routes and components
+APP_DIR = DEFAULT_CONFIG.app_dir
+
+def previous_update(index_file, content_index):
+    """Keep the existing last_updated stamp when nothing else in the index changed"""
+    try:
+        with open(index_file, 'r', encoding='utf-8') as f:
+            existing = json.load(f)
+    except (OSError, ValueError):
+        return content_index["last_updated"]
+    unchanged = all(existing.get(key) == value for key, value in content_index.items()
+                    if key != "last_updated")
+    return existing.get("last_updated", content_index["last_updated"]) if unchanged else content_index["last_updated"]
+
+@profile_stage('multimedia-index')
+def create_sample_multimedia_content(courses_dir=COURSES_DIR):
     """Create sample multimedia content for demonstration"""
     
-    courses_dir = Path('/workspace/INR100-APP/courses')
     
     # Create sample video descriptions
     sample_videos = [
@@ -125,19 +144,20 @@ def create_sample_multimedia_content():
                             }
                             
                             index_file = media_dir / 'content-index.json'
-                            with open(index_file, 'w', encoding='utf-8') as f:
-                                json.dump(content_index, f, indent=2)
+                            content_index["last_updated"] = previous_update(index_file, content_index)
+                            profiler.write_text(index_file, json.dumps(content_index, indent=2))
                             
                             populated_count += 1
     
     print(f"Sample multimedia content created: {populated_count} directories populated")
     return populated_count
 
-def create_ai_recommendation_system():
+@profile_stage('ai-recommendations')
+def create_ai_recommendation_system(app_dir=APP_DIR):
     """Create AI-powered recommendation system"""
     
     # AI Recommendation API structure
-    ai_api_dir = Path('/workspace/INR100-APP/src/app/api/ai-recommendations')
+    ai_api_dir = app_dir / 'src' / 'app' / 'api' / 'ai-recommendations'
     ai_api_dir.mkdir(parents=True, exist_ok=True)
     
     # Enhanced AI Recommendations with advanced features
@@ -554,17 +574,17 @@ export async function POST(request: NextRequest) {
 }'''
     
     # Write enhanced AI recommendations
-    with open(ai_api_dir / 'route.ts', 'w', encoding='utf-8') as f:
-        f.write(ai_content)
+    profiler.write_text(ai_api_dir / 'route.ts', ai_content)
     
     print("AI Recommendation System created")
     return True
 
-def create_learning_analytics_system():
+@profile_stage('learning-analytics')
+def create_learning_analytics_system(app_dir=APP_DIR):
     """Create comprehensive learning analytics platform"""
     
     # Learning Analytics API
-    analytics_api_dir = Path('/workspace/INR100-APP/src/app/api/learning-analytics')
+    analytics_api_dir = app_dir / 'src' / 'app' / 'api' / 'learning-analytics'
     analytics_api_dir.mkdir(parents=True, exist_ok=True)
     
     analytics_content = '''import { NextRequest, NextResponse } from 'next/server';
@@ -1004,17 +1024,17 @@ export async function POST(request: NextRequest) {
 }'''
     
     # Write learning analytics
-    with open(analytics_api_dir / 'route.ts', 'w', encoding='utf-8') as f:
-        f.write(analytics_content)
+    profiler.write_text(analytics_api_dir / 'route.ts', analytics_content)
     
     print("Learning Analytics System created")
     return True
 
-def create_mobile_optimization():
+@profile_stage('mobile-optimization')
+def create_mobile_optimization(app_dir=APP_DIR):
     """Create mobile-optimized learning components"""
     
     # Mobile Learning Dashboard Component
-    mobile_dir = Path('/workspace/INR100-APP/src/components/mobile')
+    mobile_dir = app_dir / 'src' / 'components' / 'mobile'
     mobile_dir.mkdir(parents=True, exist_ok=True)
     
     mobile_component = '''import React, { useState, useEffect } from 'react';
@@ -1446,17 +1466,17 @@ const MobileLearningDashboard: React.FC<MobileLearningDashboardProps> = ({
 export default MobileLearningDashboard;'''
     
     # Write mobile component
-    with open(mobile_dir / 'MobileLearningDashboard.tsx', 'w', encoding='utf-8') as f:
-        f.write(mobile_component)
+    profiler.write_text(mobile_dir / 'MobileLearningDashboard.tsx', mobile_component)
     
     print("Mobile Optimization Components created")
     return True
 
-def create_content_delivery_apis():
+@profile_stage('content-apis')
+def create_content_delivery_apis(app_dir=APP_DIR):
     """Create comprehensive content delivery APIs"""
     
     # Enhanced Content API
-    content_api_dir = Path('/workspace/INR100-APP/src/app/api/content')
+    content_api_dir = app_dir / 'src' / 'app' / 'api' / 'content'
     content_api_dir.mkdir(parents=True, exist_ok=True)
     
     content_api = '''import { NextRequest, NextResponse } from 'next/server';
@@ -2039,8 +2059,7 @@ export async function POST(request: NextRequest) {
 }'''
     
     # Write content delivery API
-    with open(content_api_dir / 'route.ts', 'w', encoding='utf-8') as f:
-        f.write(content_api)
+    profiler.write_text(content_api_dir / 'route.ts', content_api)
     
     print("Content Delivery APIs created")
     return True
@@ -2048,33 +2067,46 @@ export async function POST(request: NextRequest) {
 def main():
     """Main function to implement all advanced features"""
     
+    parser = argparse.ArgumentParser(description="Generate sample media indexes and advanced feature APIs")
+    add_config_arguments(parser)
+    add_profiling_arguments(parser)
+    args = parser.parse_args()
+    config = load_config(args)
+
+    with profiling_session(args, 'implement_advanced_features'):
+        mirror_source(config)
+        run_advanced_features(config.corpus_dir, config.app_dir)
+
+def run_advanced_features(courses_dir=COURSES_DIR, app_dir=APP_DIR):
+    """Run every advanced feature generation step"""
+    
     print("=== INR100 Advanced Features Implementation ===")
     print("Implementing: Content Population, AI Recommendations, Analytics, Mobile Optimization, and APIs")
     print()
     
     # Step 1: Content Population
     print("1. Creating Sample Multimedia Content...")
-    content_populated = create_sample_multimedia_content()
+    content_populated = create_sample_multimedia_content(courses_dir)
     print()
     
     # Step 2: AI-Powered Recommendations
     print("2. Implementing AI Recommendation System...")
-    ai_created = create_ai_recommendation_system()
+    ai_created = create_ai_recommendation_system(app_dir)
     print()
     
     # Step 3: Learning Analytics
     print("3. Creating Learning Analytics Platform...")
-    analytics_created = create_learning_analytics_system()
+    analytics_created = create_learning_analytics_system(app_dir)
     print()
     
     # Step 4: Mobile Optimization
     print("4. Developing Mobile Optimization Components...")
-    mobile_created = create_mobile_optimization()
+    mobile_created = create_mobile_optimization(app_dir)
     print()
     
     # Step 5: Content Delivery APIs
     print("5. Building Content Delivery APIs...")
-    apis_created = create_content_delivery_apis()
+    apis_created = create_content_delivery_apis(app_dir)
     print()
     
     # Summary
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+INR100 Learning Path Planner
+Builds the lesson prerequisite graph and plans the shortest route to a set of skills
+
+The graph has one node per lesson. Within a module each lesson requires the
+one before it (lessons are numbered in teaching order), and a module's first
+lesson requires the last lesson of every module listed under
+**Prerequisites** in the course README ("Module 1 completion recommended",
+"Foundation level completion", ...). Build time stores:
+
+    nodes       lessons in topological order, so a node's index is its rank
+    closure     per node, a bitset of the node and everything it requires
+    skills      word -> lessons whose tags or title contain it
+
+Planning never walks edges. A skill is taught by several lessons; choosing
+one costs the minutes of its closure minus what the learner has done, and
+costs for all candidates come from one bitset-by-minutes product. An A*
+search over the chosen set finds the cheapest combination for multi-skill
+targets (the heuristic is the most expensive skill still missing), and the
+route is the union's bits read in topological order.
+
+    python3 courses/learning_paths.py --plan "options,portfolio" --completed module-01-money-basics/lesson-001-What-is-Money
+"""
+
+import argparse
+import heapq
+import itertools
+import json
+import re
+from collections import defaultdict
+
+import numpy as np
+
+from course_content import COURSES_DIR, BUILD_DIR, iter_modules, iter_lessons, lesson_title, write_if_changed
+from pipeline_profiling import profiler, profile_stage, add_profiling_arguments, profiling_session
+from pipeline_io import map_concurrently
+from build_module_stats import duration_minutes, read_lesson_metadata
+from course_config import add_config_arguments, load_config
+
+PREREQUISITE_GRAPH_FILE = BUILD_DIR / 'prerequisite-graph.json'
+
+# Minutes assumed for lessons without a parseable duration
+DEFAULT_MINUTES = 15
+
+# Search states expanded before falling back to the greedy plan
+MAX_EXPANSIONS = 20_000
+
+LESSON_NUMBER_RE = re.compile(r'lesson-(\d+)(?:[-.](\d+))?')
+MODULE_HEADING_RE = re.compile(r'^###\s+Module\s+(\d+)\b')
+PREREQUISITES_RE = re.compile(r'^\*\*Prerequisites\*\*:\s*(.+)$')
+LEVEL_COMPLETION_RE = re.compile(r'\b(foundation|intermediate|advanced)\s+level\b', re.IGNORECASE)
+WORD_RE = re.compile(r'[a-z0-9]+')
+STOPWORDS = {'a', 'an', 'and', 'for', 'how', 'in', 'is', 'of', 'on', 'the', 'to', 'vs', 'what', 'with', 'your'}
+
+def skill_words(text):
+    return [word for word in WORD_RE.findall(str(text).lower()) if word not in STOPWORDS]
+
+def lesson_order(lesson_file):
+    """Teaching order within a module: 'lesson-011-...' after 'lesson-10-...'"""
+    match = LESSON_NUMBER_RE.match(lesson_file.name)
+    if not match:
+        return (float('inf'), 0, lesson_file.name)
+    return (int(match.group(1)), int(match.group(2) or 0), lesson_file.name)
+
+def module_prerequisites(readme_file, modules):
+    """{module: [required modules]} from the README's per-module Prerequisites lines
+
+    modules maps module name -> level, in course order.
+    """
+    by_number = {int(name.split('-')[1]): name for name in modules if name.split('-')[1].isdigit()}
+    requires = {name: [] for name in modules}
+    if not readme_file.exists():
+        return requires
+
+    current = None
+    for line in readme_file.read_text(encoding='utf-8').splitlines():
+        heading = MODULE_HEADING_RE.match(line)
+        if heading:
+            current = by_number.get(int(heading.group(1)))
+            continue
+        match = PREREQUISITES_RE.match(line.strip())
+        if not match or current is None:
+            continue
+        text = match.group(1)
+        required = []
+        for level in LEVEL_COMPLETION_RE.findall(text):
+            required.extend(name for name, module_level in modules.items()
+                            if module_level == f"{level.lower()}-level" and name != current)
+        if 'module' in text.lower():
+            required.extend(by_number[number] for number in map(int, re.findall(r'\d+', text))
+                            if number in by_number and by_number[number] != current)
+        requires[current] = list(dict.fromkeys(required))
+        current = None
+    return requires
+
+def topological_sort(prerequisites):
+    """Kahn's algorithm keeping the input order among ready nodes; rejects cycles"""
+    remaining = [len(required) for required in prerequisites]
+    dependents = defaultdict(list)
+    for node, required in enumerate(prerequisites):
+        for parent in required:
+            dependents[parent].append(node)
+    ready = [node for node, count in enumerate(remaining) if count == 0]
+    heapq.heapify(ready)
+    order = []
+    while ready:
+        node = heapq.heappop(ready)
+        order.append(node)
+        for child in dependents[node]:
+            remaining[child] -= 1
+            if remaining[child] == 0:
+                heapq.heappush(ready, child)
+    if len(order) != len(prerequisites):
+        raise ValueError("Prerequisite graph has a cycle")
+    return order
+
+@profile_stage('prerequisite-graph')
+def build_prerequisite_graph(courses_dir=COURSES_DIR, graph_file=PREREQUISITE_GRAPH_FILE, io_limit=None):
+    """Write the lesson graph with topological order, closure bitsets and skill index"""
+    modules = {}
+    lessons = []
+    for level, module_dir in iter_modules(courses_dir):
+        modules[module_dir.name] = level
+        lessons.extend((level, module_dir.name, lesson_file)
+                       for lesson_file in sorted(iter_lessons(module_dir), key=lesson_order))
+
+    metadata = map_concurrently(read_lesson_metadata, [lesson[2] for lesson in lessons], io_limit,
+                                return_exceptions=True)
+    requires = module_prerequisites(courses_dir / 'README.md', modules)
+
+    # Edges in course order: previous lesson of the module, or the prerequisite modules' last lessons
+    first, last = {}, {}
+    for index, (_, module_name, _) in enumerate(lessons):
+        first.setdefault(module_name, index)
+        last[module_name] = index
+    prerequisites = []
+    for index, (_, module_name, _) in enumerate(lessons):
+        if first[module_name] != index:
+            prerequisites.append([index - 1])
+        else:
+            prerequisites.append([last[name] for name in requires[module_name] if name in last])
+
+    with profiler.span('transform', category='stage'):
+        order = topological_sort(prerequisites)
+        rank = {node: position for position, node in enumerate(order)}
+        nodes, closure = [], []
+        skills = defaultdict(set)
+        for node in order:
+            level, module_name, lesson_file = lessons[node]
+            lesson_metadata = metadata[node]
+            if isinstance(lesson_metadata, Exception):
+                print(f"Error reading {lesson_file}: {lesson_metadata}")
+                lesson_metadata = {}
+            position = len(nodes)
+            required = sorted(rank[parent] for parent in prerequisites[node])
+            bits = 1 << position
+            for parent in required:
+                bits |= closure[parent]
+            closure.append(bits)
+
+            title = lesson_title(lesson_metadata, '', lesson_file)
+            tags = lesson_metadata.get('tags') if isinstance(lesson_metadata.get('tags'), list) else []
+            for word in skill_words(' '.join([title] + [str(tag) for tag in tags])):
+                skills[word].add(position)
+            nodes.append({
+                'id': f"{module_name}/{lesson_file.stem}",
+                'title': title,
+                'level': level,
+                'module': module_name,
+                'minutes': duration_minutes(lesson_metadata.get('duration')) or DEFAULT_MINUTES,
+                'prerequisites': required
+            })
+
+    graph = {
+        'version': 1,
+        'modules': requires,
+        'nodes': nodes,
+        'closure': [format(bits, 'x') for bits in closure],
+        'skills': {word: sorted(positions) for word, positions in sorted(skills.items())}
+    }
+    graph_file.parent.mkdir(parents=True, exist_ok=True)
+    with profiler.span('write', file=graph_file):
+        write_if_changed(graph_file, json.dumps(graph, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+
+    print(f"Prerequisite graph: {len(nodes)} lessons, {sum(len(node['prerequisites']) for node in nodes)} edges, "
+          f"{len(skills)} skill words")
+    return len(nodes)
+
+class LearningPathPlanner:
+    """Read side of the graph: route planning over closure bitsets"""
+
+    def __init__(self, graph):
+        self.nodes = graph['nodes']
+        self.index = {node['id']: position for position, node in enumerate(self.nodes)}
+        self.skills = graph['skills']
+        self.minutes = np.array([node['minutes'] for node in self.nodes], dtype=np.float64)
+        size = len(self.nodes)
+        width = (size + 7) // 8
+        packed = np.frombuffer(b''.join(int(bits, 16).to_bytes(width, 'little') for bits in graph['closure']),
+                               dtype=np.uint8).reshape(size, width)
+        self.closure = np.unpackbits(packed, axis=1, count=size, bitorder='little').astype(bool)
+
+    @classmethod
+    def load(cls, graph_file=PREREQUISITE_GRAPH_FILE):
+        with open(graph_file, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def candidates(self, skill):
+        """Lessons teaching every word of skill, or None if a word is unknown"""
+        words = skill_words(skill)
+        if not words or any(word not in self.skills for word in words):
+            return None
+        lessons = set(self.skills[words[0]])
+        for word in words[1:]:
+            lessons &= set(self.skills[word])
+        return np.array(sorted(lessons), dtype=np.int64) if lessons else None
+
+    def marginal_costs(self, lessons, done):
+        """Minutes each lesson adds on top of done, counting its whole closure"""
+        return (self.closure[lessons] & ~done) @ self.minutes
+
+    def search(self, targets, done):
+        """A* over chosen-lesson sets; returns {skill: lesson} or None past MAX_EXPANSIONS"""
+        counter = itertools.count()
+        frontier = [(0.0, 0.0, next(counter), done, {})]
+        seen = set()
+        expansions = 0
+        while frontier:
+            _, cost, _, state, picks = heapq.heappop(frontier)
+            key = np.packbits(state).tobytes()
+            if key in seen:
+                continue
+            seen.add(key)
+            unmet = [skill for skill, lessons in targets.items() if not state[lessons].any()]
+            if not unmet:
+                return picks
+            expansions += 1
+            if expansions > MAX_EXPANSIONS:
+                return None
+            # Branch on the skill that is dearest to reach; every plan must cover it somehow
+            costs = {skill: self.marginal_costs(targets[skill], state) for skill in unmet}
+            branch = max(unmet, key=lambda skill: costs[skill].min())
+            for lesson, step in zip(targets[branch], costs[branch]):
+                following = state | self.closure[lesson]
+                remaining = [skill for skill in unmet if skill != branch and not following[targets[skill]].any()]
+                estimate = max((self.marginal_costs(targets[skill], following).min() for skill in remaining),
+                               default=0.0)
+                heapq.heappush(frontier, (cost + step + estimate, cost + step, next(counter), following,
+                                          dict(picks, **{branch: int(lesson)})))
+        return None
+
+    def greedy(self, targets, done):
+        """Cheapest next skill first; used when the exact search gives up"""
+        picks, state = {}, done.copy()
+        for _ in range(len(targets)):
+            unmet = [skill for skill, lessons in targets.items() if not state[lessons].any()]
+            if not unmet:
+                break
+            best = min(((self.marginal_costs(targets[skill], state), skill) for skill in unmet),
+                       key=lambda pair: pair[0].min())
+            costs, skill = best
+            picks[skill] = int(targets[skill][costs.argmin()])
+            state |= self.closure[picks[skill]]
+        return picks
+
+    def plan(self, target_skills, completed=()):
+        """Shortest route (in minutes) to every target skill
+
+        completed lessons count as done together with their prerequisites.
+        Returns lessons in a valid study order with the lesson chosen for
+        each skill; skills no lesson teaches are listed under unknown_skills.
+        """
+        done = np.zeros(len(self.nodes), dtype=bool)
+        for lesson_id in completed:
+            if lesson_id in self.index:
+                done |= self.closure[self.index[lesson_id]]
+
+        targets, unknown = {}, []
+        for skill in target_skills:
+            lessons = self.candidates(skill)
+            if lessons is None:
+                unknown.append(skill)
+            else:
+                targets[skill] = lessons
+
+        picks = self.search(targets, done)
+        if picks is None:
+            picks = self.greedy(targets, done)
+        route = done.copy()
+        for lesson in picks.values():
+            route |= self.closure[lesson]
+        route &= ~done
+        lessons = np.flatnonzero(route)
+        covered = [skill for skill, candidates in targets.items() if done[candidates].any()]
+        # Skills met along the way are credited to the earliest route lesson teaching them
+        taught = {skill: picks.get(skill, next((int(i) for i in candidates if route[i]), None))
+                  for skill, candidates in targets.items() if skill not in covered}
+        return {
+            'lessons': [{'id': self.nodes[i]['id'], 'title': self.nodes[i]['title'],
+                         'minutes': self.nodes[i]['minutes']} for i in lessons],
+            'total_minutes': float(self.minutes[lessons].sum()),
+            'skills': {skill: self.nodes[lesson]['id'] for skill, lesson in taught.items() if lesson is not None},
+            'covered_by_progress': covered,
+            'unknown_skills': unknown
+        }
+
+def main():
+    """Main function to build the prerequisite graph or plan a learning path"""
+
+    parser = argparse.ArgumentParser(description="Build the lesson prerequisite graph and plan learning paths")
+    parser.add_argument('--plan', metavar='SKILLS', help='comma-separated target skills to plan a route to')
+    parser.add_argument('--completed', default='', help='comma-separated lesson ids already completed')
+    add_config_arguments(parser)
+    add_profiling_arguments(parser)
+    args = parser.parse_args()
+    config = load_config(args)
+    graph_file = config.build_dir / PREREQUISITE_GRAPH_FILE.name
+
+    if args.plan:
+        planner = LearningPathPlanner.load(graph_file)
+        completed = [lesson for lesson in args.completed.split(',') if lesson]
+        path = planner.plan([skill.strip() for skill in args.plan.split(',') if skill.strip()], completed)
+        print(json.dumps(path, indent=2, ensure_ascii=False))
+        return
+
+    print("=== INR100 Prerequisite Graph ===")
+    print()
+
+    with profiling_session(args, 'learning_paths'):
+        lessons = build_prerequisite_graph(config.corpus_dir, graph_file)
+
+    print()
+    print("=== PREREQUISITE GRAPH COMPLETE ===")
+    print(f"Lessons in graph: {lessons}")
+    print(f"Graph file: {graph_file}")
+
+if __name__ == "__main__":
+    main()
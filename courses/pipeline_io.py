@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+INR100 Pipeline Async I/O Helpers
+Bounded-concurrency file I/O for stages that touch every lesson
+
+On network filesystems each open/stat/read costs milliseconds of latency, so
+stages keep many operations in flight instead of issuing them one by one.
+Blocking calls run in worker threads through asyncio.to_thread; a semaphore
+caps how many are outstanding (INR100_IO_CONCURRENCY, default 32).
+
+    sizes = map_concurrently(lambda path: path.stat().st_size, lesson_files)
+
+Results come back in input order. CPU-heavy work and anything that must be
+serialised (e.g. SQLite writes) stays in the calling thread.
+"""
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+IO_CONCURRENCY = int(os.environ.get('INR100_IO_CONCURRENCY', 32))
+
+async def _run_all(function, items, limit, return_exceptions):
+    loop = asyncio.get_running_loop()
+    # to_thread uses the loop's default executor; size it to the concurrency limit
+    executor = ThreadPoolExecutor(max_workers=limit, thread_name_prefix='pipeline-io')
+    loop.set_default_executor(executor)
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run_one(item):
+        async with semaphore:
+            return await asyncio.to_thread(function, item)
+
+    try:
+        return await asyncio.gather(*(run_one(item) for item in items),
+                                    return_exceptions=return_exceptions)
+    finally:
+        executor.shutdown(wait=True)
+
+def map_concurrently(function, items, limit=None, return_exceptions=False):
+    """Call function(item) for every item with up to limit calls in flight
+
+    With return_exceptions=True a failing item yields its exception instead
+    of aborting the whole batch, so callers can report per-file errors.
+    """
+    items = list(items)
+    if not items:
+        return []
+    limit = max(1, min(limit or IO_CONCURRENCY, len(items)))
+    return asyncio.run(_run_all(function, items, limit, return_exceptions))
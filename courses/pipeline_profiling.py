@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+INR100 Pipeline Profiling Helpers
+Shared per-stage and per-file span recording for the course build scripts
+
+Every script accepts --profile, which records stage spans and per-file
+read/parse/transform/write spans with bytes in and out, prints a summary,
+and dumps a Chrome trace-event JSON (open in chrome://tracing or Perfetto).
+--cprofile and --tracemalloc additionally wrap the run in those profilers.
+When profiling is off, spans are a shared no-op object.
+"""
+
+import cProfile
+import functools
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+from course_content import BUILD_DIR, write_if_changed
+from course_config import load_config
+
+PROFILES_DIR = BUILD_DIR / 'profiles'
+
+class Span:
+    """One timed unit of work; bytes_in/bytes_out are filled in by the caller"""
+
+    __slots__ = ('name', 'category', 'file', 'bytes_in', 'bytes_out')
+
+    def __init__(self, name, category, file):
+        self.name = name
+        self.category = category
+        self.file = file
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+NULL_SPAN = Span(None, None, None)
+
+class Profiler:
+    """Collects spans from the current run; a no-op until enabled"""
+
+    def __init__(self):
+        self.enabled = False
+        self.events = []
+        self.origin = time.perf_counter()
+
+    def enable(self):
+        self.enabled = True
+        self.events = []
+        self.origin = time.perf_counter()
+
+    @contextmanager
+    def span(self, name, category='io', file=None):
+        """Time a block of work, optionally attributed to one file"""
+        if not self.enabled:
+            yield NULL_SPAN
+            return
+        span = Span(name, category, str(file) if file is not None else None)
+        start = time.perf_counter()
+        try:
+            yield span
+        finally:
+            self.events.append((span, start - self.origin, time.perf_counter() - start,
+                                threading.get_ident()))
+
+    def stage(self, name):
+        """Time a whole pipeline stage"""
+        return self.span(name, category='stage')
+
+    def read_text(self, path):
+        """Read a UTF-8 file inside a 'read' span"""
+        with self.span('read', file=path) as span:
+            with open(path, 'r', encoding='utf-8') as f:
+                content = f.read()
+                if self.enabled:
+                    span.bytes_in = os.fstat(f.fileno()).st_size
+        return content
+
+    def write_text(self, path, content):
+        """Write a UTF-8 file inside a 'write' span, skipping identical content
+
+        Returns True when the file was written.
+        """
+        with self.span('write', file=path) as span:
+            data = content.encode('utf-8')
+            written = write_if_changed(path, data)
+            if written:
+                span.bytes_out = len(data)
+        return written
+
+    def trace_events(self):
+        """Spans as Chrome trace-event 'complete' events"""
+        pid = os.getpid()
+        events = []
+        for span, start, duration, tid in self.events:
+            args = {'bytes_in': span.bytes_in, 'bytes_out': span.bytes_out}
+            if span.file:
+                args['file'] = span.file
+            events.append({
+                'name': span.name,
+                'cat': span.category,
+                'ph': 'X',
+                'ts': round(start * 1e6, 1),
+                'dur': round(duration * 1e6, 1),
+                'pid': pid,
+                'tid': tid,
+                'args': args
+            })
+        return events
+
+    def write_trace(self, path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': self.trace_events(), 'displayTimeUnit': 'ms'}, f)
+
+    def print_summary(self, top_files=10):
+        """Per-span totals, then the files that cost the most time"""
+        totals = defaultdict(lambda: [0, 0.0, 0, 0])
+        per_file = defaultdict(float)
+        for span, _, duration, _ in self.events:
+            total = totals[(span.category, span.name)]
+            total[0] += 1
+            total[1] += duration
+            total[2] += span.bytes_in
+            total[3] += span.bytes_out
+            if span.file and span.category != 'stage':
+                per_file[span.file] += duration
+
+        print("--- Profile summary ---")
+        print(f"{'span':<28}{'count':>8}{'seconds':>10}{'bytes in':>14}{'bytes out':>14}")
+        for (category, name), (count, seconds, bytes_in, bytes_out) in sorted(
+                totals.items(), key=lambda item: (item[0][0] != 'stage', -item[1][1])):
+            print(f"{category + ':' + name:<28}{count:>8}{seconds:>10.3f}{bytes_in:>14}{bytes_out:>14}")
+
+        if per_file:
+            print("Slowest files:")
+            for file, seconds in sorted(per_file.items(), key=lambda item: -item[1])[:top_files]:
+                print(f"  {seconds * 1000:9.2f} ms  {file}")
+
+profiler = Profiler()
+
+def profile_stage(name):
+    """Decorator recording every call of a stage function as a stage span"""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with profiler.stage(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def add_profiling_arguments(parser):
+    """Register --profile and friends on a script's argument parser"""
+    group = parser.add_argument_group('profiling')
+    group.add_argument('--profile', action='store_true',
+                       help='record per-stage/per-file spans and write a Chrome trace')
+    group.add_argument('--profile-output', type=str, default=None,
+                       help=f'trace file path (default: {PROFILES_DIR}/<script>-<time>.trace.json)')
+    group.add_argument('--cprofile', action='store_true', help='also run under cProfile')
+    group.add_argument('--tracemalloc', action='store_true', help='also trace memory allocations')
+    return parser
+
+@contextmanager
+def profiling_session(args, script_name):
+    """Enable the requested profilers around a script's main work"""
+    if not (args.profile or args.cprofile or args.tracemalloc):
+        yield profiler
+        return
+
+    stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+    trace_path = load_config(args).build_dir / 'profiles' / f"{script_name}-{stamp}.trace.json"
+    if args.profile_output:
+        trace_path = Path(args.profile_output)
+
+    if args.profile:
+        profiler.enable()
+    if args.tracemalloc:
+        tracemalloc.start(10)
+    cprof = cProfile.Profile() if args.cprofile else None
+    if cprof:
+        cprof.enable()
+
+    try:
+        with profiler.span(script_name, category='run'):
+            yield profiler
+    finally:
+        if cprof:
+            cprof.disable()
+        print()
+        if args.profile:
+            profiler.print_summary()
+            profiler.write_trace(trace_path)
+            print(f"Chrome trace written to {trace_path}")
+        if cprof:
+            prof_path = trace_path.with_name(trace_path.name.replace('.trace.json', '') + '.prof')
+            prof_path.parent.mkdir(parents=True, exist_ok=True)
+            cprof.dump_stats(prof_path)
+            pstats.Stats(cprof).sort_stats('cumulative').print_stats(15)
+            print(f"cProfile stats written to {prof_path}")
+        if args.tracemalloc:
+            current, peak = tracemalloc.get_traced_memory()
+            print(f"tracemalloc: current {current / 1024:.0f} KiB, peak {peak / 1024:.0f} KiB")
+            for stat in tracemalloc.take_snapshot().statistics('lineno')[:10]:
+                print(f"  {stat}")
+            tracemalloc.stop()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+INR100 Precompressed Content Bundle Publisher
+Renders lessons to JSON and writes .br/.gz siblings for static CDN delivery
+
+Brotli siblings need the brotli package (courses/requirements.txt); without
+it only .gz siblings are written and any existing .br files are removed so
+the server never prefers an outdated one. Files for lessons and modules that
+no longer exist are pruned at the end of every publish.
+"""
+
+import argparse
+import gzip
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from course_content import (
+    COURSES_DIR, PUBLISH_DIR, iter_modules, iter_lessons, split_frontmatter, write_if_changed
+)
+from pipeline_profiling import profiler, profile_stage, add_profiling_arguments, profiling_session
+from course_config import add_config_arguments, load_config
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; .gz siblings are always written
+    brotli = None
+
+BUNDLES_DIR = PUBLISH_DIR / 'bundles'
+
+def render_lesson(lesson_path, level, module_name):
+    """Render a lesson (frontmatter stripped) into its JSON document"""
+    content = profiler.read_text(lesson_path)
+    with profiler.span('parse', file=lesson_path):
+        metadata, body = split_frontmatter(content)
+    return {
+        'id': lesson_path.stem,
+        'level': level,
+        'module': module_name,
+        'metadata': metadata,
+        'body': body
+    }
+
+def encode_document(document):
+    """Serialize a document to compact, byte-stable JSON"""
+    return json.dumps(document, ensure_ascii=False, sort_keys=True,
+                      separators=(',', ':'), default=str).encode('utf-8')
+
+def compress_file(path):
+    """Write .gz and .br siblings of a published file at maximum compression"""
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    written = 0
+    # mtime=0 keeps the gzip header, and therefore the file, byte-identical across runs
+    written += write_if_changed(Path(f"{path}.gz"), gzip.compress(data, compresslevel=9, mtime=0))
+
+    if brotli is not None:
+        written += write_if_changed(Path(f"{path}.br"), brotli.compress(data, quality=11))
+
+    return written
+
+def needs_compression(path, changed):
+    """A published file needs (re)compressing when it changed or a sibling is missing"""
+    if changed:
+        return True
+    siblings = ['.gz'] + (['.br'] if brotli is not None else [])
+    return not all(Path(f"{path}{suffix}").exists() for suffix in siblings)
+
+def write_document(path, document):
+    """Write a JSON document unless identical bytes are already published
+
+    Returns True when the file was written.
+    """
+    with profiler.span('transform', file=path):
+        data = encode_document(document)
+    with profiler.span('write', file=path) as span:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        written = write_if_changed(path, data)
+        if written:
+            span.bytes_out = len(data)
+    return written
+
+def prune_bundles(bundles_dir, published):
+    """Delete files (and their siblings) not published by this run, then empty directories
+
+    Returns the number of files removed.
+    """
+    keep = {str(path) for path in published}
+    keep.update(f"{path}.gz" for path in published)
+    if brotli is not None:
+        keep.update(f"{path}.br" for path in published)
+
+    removed = 0
+    for dirpath, _, filenames in os.walk(bundles_dir, topdown=False):
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            if path not in keep:
+                os.remove(path)
+                removed += 1
+        if dirpath != str(bundles_dir) and not os.listdir(dirpath):
+            os.rmdir(dirpath)
+    return removed
+
+@profile_stage('publish-bundles')
+def publish_bundles(courses_dir=COURSES_DIR, bundles_dir=BUNDLES_DIR, workers=None):
+    """Render all lessons and module bundles, then precompress them in parallel"""
+
+    published = []
+    stale = []
+    catalog = []
+
+    def publish(path, document):
+        published.append(path)
+        if needs_compression(path, write_document(path, document)):
+            stale.append(path)
+
+    for level, module_dir in iter_modules(courses_dir):
+        module_name = module_dir.name
+        lessons = []
+
+        for lesson_file in iter_lessons(module_dir):
+            try:
+                document = render_lesson(lesson_file, level, module_name)
+            except Exception as e:
+                print(f"Error rendering {lesson_file}: {e}")
+                continue
+
+            lessons.append(document)
+            publish(bundles_dir / level / module_name / f"{lesson_file.stem}.json", document)
+
+        # One request fetches a whole module
+        bundle = {'level': level, 'module': module_name, 'lessons': lessons}
+        publish(bundles_dir / level / module_name / 'bundle.json', bundle)
+
+        catalog.append({
+            'level': level,
+            'module': module_name,
+            'bundle': f"{level}/{module_name}/bundle.json",
+            'lessons': [lesson['id'] for lesson in lessons]
+        })
+        print(f"Rendered {module_name}: {len(lessons)} lessons")
+
+    publish(bundles_dir / 'catalog.json', {'modules': catalog})
+
+    if brotli is None:
+        print("brotli module not installed (pip install -r courses/requirements.txt): "
+              "writing .gz siblings only")
+
+    workers = workers or os.cpu_count()
+    with profiler.span('compress', category='stage'), ProcessPoolExecutor(max_workers=workers) as executor:
+        compressed = sum(executor.map(compress_file, stale, chunksize=16))
+
+    with profiler.span('prune', category='stage'):
+        removed = prune_bundles(bundles_dir, published)
+
+    print(f"Published {len(published)} files ({len(stale)} changed), "
+          f"{compressed} precompressed siblings rewritten, {removed} stale files removed")
+    return len(published)
+
+def main():
+    """Main function to publish precompressed lesson bundles"""
+
+    parser = argparse.ArgumentParser(description="Publish precompressed lesson bundles")
+    add_config_arguments(parser)
+    add_profiling_arguments(parser)
+    args = parser.parse_args()
+    config = load_config(args)
+    bundles_dir = config.publish_dir / 'bundles'
+
+    print("=== INR100 Precompressed Bundle Publisher ===")
+    print()
+
+    with profiling_session(args, 'publish_compressed_bundles'):
+        published = publish_bundles(config.corpus_dir, bundles_dir)
+
+    print()
+    print("=== PUBLISHING COMPLETE ===")
+    print(f"Bundle files published: {published}")
+    print(f"Output directory: {bundles_dir}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""
+INR100 Question Bank
+Builds the assessment question bank and assembles stratified, no-repeat exams
+
+Question records are JSON files (a list of items, or {"items": [...]}) under
+assessment-center/questions/ and the quiz extractor's output, each with id,
+module, difficulty, topic, tags, question, options and answer. The bank is
+one JSON file with the items in a stable, append-only order plus pools:
+index lists keyed by
+
+    module/<module>/<difficulty>    exam strata
+    module/<module>   topic/<topic>   tag/<tag>   difficulty/<difficulty>
+
+Exam assembly never scans the bank. A module exam's question count is split
+across difficulty strata, and each stratum is read through a per-user
+pseudo-random permutation (a keyed Feistel network, O(1) per position).
+The user's draw state is a cursor into that permutation, so k questions cost
+O(k) however large the bank grows. Consecutive attempts continue the same
+permutation, so a user sees no repeats within a stratum until every item in
+it has been served. Items added later are served before a new cycle starts.
+An item whose module, difficulty, topic or tags change joins its new pools
+at the end and leaves a tombstone (REMOVED) in its old ones, so pool
+positions never shift. Retired items keep their slot and are skipped, as
+are items whose graded statistics (item-stats.json, written by
+grade_exams.py) show they are too easy, too hard or fail to discriminate.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import secrets
+from collections import Counter
+
+from course_content import COURSES_DIR, BUILD_DIR, write_if_changed
+from pipeline_profiling import profiler, profile_stage, add_profiling_arguments, profiling_session
+from course_config import add_config_arguments, load_config
+from extract_quizzes import QUIZZES_DIR
+
+QUESTIONS_DIR = COURSES_DIR / 'assessment-center' / 'questions'
+QUESTION_BANK_FILE = BUILD_DIR / 'question-bank.json'
+ITEM_STATS_FILE = BUILD_DIR / 'item-stats.json'
+
+DIFFICULTIES = ['Beginner', 'Intermediate', 'Advanced']
+DEFAULT_MIX = {'Beginner': 0.3, 'Intermediate': 0.5, 'Advanced': 0.2}
+
+# Module exams from assessment-center/README.md: (questions, minutes, pass %)
+EXAM_SPECS = {
+    'module-01-money-basics': (50, 45, 80),
+    'module-02-banking-systems': (40, 35, 75),
+    'module-03-investing-intro': (60, 50, 80),
+    'module-04-mutual-funds': (75, 60, 85),
+    'module-05-stock-analysis': (100, 90, 85),
+    'module-06-portfolio-building': (80, 70, 80),
+    'module-07-derivatives': (120, 120, 90),
+    'module-08-alternative-investments': (90, 80, 85),
+    'module-09-professional-trading': (150, 150, 90)
+}
+
+# Pool slot of an item that has left the pool; draws skip it
+REMOVED = -1
+
+REQUIRED_FIELDS = ('module', 'difficulty', 'question', 'options', 'answer')
+
+# Items are withheld from exams once enough responses show they do not measure
+# anything: nearly everyone (or no one) answers them correctly, or strong
+# candidates do no better on them than weak ones
+MIN_STAT_RESPONSES = 200
+P_VALUE_RANGE = (0.05, 0.95)
+MIN_DISCRIMINATION = 0.1
+
+FEISTEL_ROUNDS = 4
+MASK64 = (1 << 64) - 1
+
+def _mix64(value):
+    """splitmix64 finaliser: a fast, well-distributed 64-bit mixing function"""
+    value = (value + 0x9E3779B97F4A7C15) & MASK64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & MASK64
+    return value ^ (value >> 31)
+
+class FeistelPermutation:
+    """Keyed bijection on range(size), evaluated one position at a time
+
+    A balanced Feistel network permutes the smallest even-bit domain that
+    covers size; cycle-walking maps it back into range, re-encrypting values
+    that land outside (fewer than four steps on average).
+    """
+
+    def __init__(self, size, key):
+        self.size = size
+        bits = max(2, (size - 1).bit_length())
+        bits += bits % 2
+        self.half = bits // 2
+        self.mask = (1 << self.half) - 1
+        self.keys = [_mix64(key + round_) for round_ in range(FEISTEL_ROUNDS)]
+
+    def __getitem__(self, position):
+        value = position
+        while True:
+            left, right = value >> self.half, value & self.mask
+            for key in self.keys:
+                left, right = right, left ^ (_mix64(right ^ key) & self.mask)
+            value = (left << self.half) | right
+            if value < self.size:
+                return value
+
+def item_id(record):
+    """Stable id for a record: its own id, or a digest of its module and question text"""
+    if record.get('id'):
+        return str(record['id'])
+    digest = hashlib.sha256(f"{record.get('module')}\n{record.get('question')}".encode('utf-8'))
+    return f"q-{digest.hexdigest()[:12]}"
+
+def answer_index(item):
+    """Index of the correct option: answers may be an index, the option text or a letter"""
+    answer, options = item['answer'], item['options']
+    if isinstance(answer, int) and not isinstance(answer, bool):
+        return answer
+    if answer in options:
+        return options.index(answer)
+    letter = str(answer).strip().rstrip(').').upper()
+    if len(letter) == 1 and 'A' <= letter <= 'Z':
+        return ord(letter) - ord('A')
+    raise ValueError(f"Answer {answer!r} does not match any option")
+
+def is_flagged(stats):
+    """Whether graded statistics show an item should be withheld from exams"""
+    if not stats or stats.get('responses', 0) < MIN_STAT_RESPONSES:
+        return False
+    low, high = P_VALUE_RANGE
+    discrimination = stats.get('discrimination')
+    return (not low <= stats['p_value'] <= high
+            or (discrimination is not None and discrimination < MIN_DISCRIMINATION))
+
+def item_pools(item):
+    """Pool keys an item belongs to"""
+    pools = [f"module/{item['module']}/{item['difficulty']}", f"module/{item['module']}",
+             f"difficulty/{item['difficulty']}"]
+    if item.get('topic'):
+        pools.append(f"topic/{item['topic']}")
+    tags = item.get('tags')
+    if isinstance(tags, list):
+        pools.extend(f"tag/{tag}" for tag in tags)
+    # A tag listed twice must not put the item in its pool twice
+    return list(dict.fromkeys(pools))
+
+def load_question_records(*sources):
+    """Read every record under the source directories, in a stable file order"""
+    records = []
+    for questions_dir in sources:
+        if not questions_dir.exists():
+            continue
+        for path in sorted(questions_dir.rglob('*.json')):
+            with profiler.span('read', file=path):
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            items = data.get('items', []) if isinstance(data, dict) else data
+            skipped = Counter()
+            for record in items:
+                missing = [field for field in REQUIRED_FIELDS if record.get(field) in (None, '', [])]
+                if missing:
+                    skipped[f"missing {', '.join(missing)}"] += 1
+                elif record['difficulty'] not in DIFFICULTIES:
+                    skipped[f"unknown difficulty {record['difficulty']}"] += 1
+                else:
+                    records.append(dict(record, id=item_id(record),
+                                        source=path.relative_to(questions_dir.parent).as_posix()))
+            for reason, count in skipped.items():
+                print(f"Skipping {count} questions in {path}: {reason}")
+    return records
+
+def available(item):
+    return not item['retired'] and not item.get('flagged')
+
+def active_members(items, members):
+    return len({index for index in members if index != REMOVED and available(items[index])})
+
+def load_bank(bank_file):
+    if bank_file.exists():
+        with open(bank_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return None
+
+@profile_stage('question-bank')
+def build_question_bank(questions_dir=QUESTIONS_DIR, bank_file=QUESTION_BANK_FILE, stats_file=ITEM_STATS_FILE,
+                        quizzes_dir=QUIZZES_DIR):
+    """Merge question records into the bank, keeping existing item positions
+
+    Items never move: new items are appended and removed items are retired
+    in place, so users' draw cursors stay valid across rebuilds. Item
+    statistics, when present, are attached and used to flag weak items.
+    """
+    records = {record['id']: record for record in load_question_records(questions_dir, quizzes_dir)}
+    previous = load_bank(bank_file) or {}
+    item_stats = {}
+    if stats_file and stats_file.exists():
+        with open(stats_file, 'r', encoding='utf-8') as f:
+            item_stats = json.load(f).get('items', {})
+
+    items = []
+    positions = {}
+    # Pools only ever grow at the end; a slot is tombstoned rather than removed
+    pools = {key: list(members) for key, members in previous.get('pools', {}).items()}
+    slots = {}
+    for key, members in pools.items():
+        for slot, index in enumerate(members):
+            if index == REMOVED:
+                continue
+            if key in slots.setdefault(index, {}):
+                # Banks built before pool keys were deduplicated can list an item twice
+                members[slot] = REMOVED
+            else:
+                slots[index][key] = slot
+
+    for item in previous.get('items', []):
+        index = positions[item['id']] = len(items)
+        current = records.get(item['id'])
+        if not current:
+            # Retired items keep their memberships and are skipped by availability
+            items.append(dict(item, retired=True))
+            continue
+        items.append(dict(current, retired=False))
+        joined = item_pools(current)
+        had = slots.get(index, {})
+        for key, slot in had.items():
+            if key not in joined:
+                pools[key][slot] = REMOVED
+        for key in joined:
+            if key not in had:
+                pools.setdefault(key, []).append(index)
+
+    for record_id, record in records.items():
+        if record_id in positions:
+            continue
+        positions[record_id] = len(items)
+        items.append(dict(record, retired=False))
+        for key in item_pools(record):
+            pools.setdefault(key, []).append(positions[record_id])
+
+    for item in items:
+        stats = item_stats.get(item['id'])
+        item['stats'] = {key: stats[key] for key in ('responses', 'p_value', 'discrimination')} if stats else None
+        item['flagged'] = is_flagged(stats)
+
+    bank = {
+        'version': 1,
+        # Per-bank salt keeps users' permutations unpredictable from their ids
+        'salt': previous.get('salt') or secrets.token_hex(16),
+        'items': items,
+        'pools': dict(sorted(pools.items())),
+        # Items available to exams per pool, so exam assembly never counts
+        'active': {key: active_members(items, members) for key, members in sorted(pools.items())}
+    }
+    bank_file.parent.mkdir(parents=True, exist_ok=True)
+    with profiler.span('write', file=bank_file):
+        write_if_changed(bank_file, json.dumps(bank, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+
+    active = sum(available(item) for item in items)
+    flagged = sum(item['flagged'] and not item['retired'] for item in items)
+    print(f"Question bank: {active} active items, {flagged} flagged, "
+          f"{sum(item['retired'] for item in items)} retired, {len(pools)} pools")
+    return active
+
+class QuestionBank:
+    """Read side of the bank: pool draws and exam assembly"""
+
+    def __init__(self, bank):
+        self.items = bank['items']
+        self.pools = bank['pools']
+        self.salt = bank['salt']
+        self.active = bank['active']
+
+    @classmethod
+    def load(cls, bank_file=QUESTION_BANK_FILE):
+        bank = load_bank(bank_file)
+        if bank is None:
+            raise FileNotFoundError(f"No question bank at {bank_file}")
+        return cls(bank)
+
+    def active_count(self, pool):
+        return self.active.get(pool, 0)
+
+    def _key(self, user_id, pool, lo, epoch):
+        digest = hashlib.blake2b(f"{self.salt}:{user_id}:{pool}:{lo}:{epoch}".encode('utf-8'), digest_size=8)
+        return int.from_bytes(digest.digest(), 'big')
+
+    def draw(self, user_id, pool, count, state):
+        """Draw count unseen items from a pool for a user; updates state in place
+
+        state maps pool -> [lo, hi, cursor, epoch]: the user's position in the
+        permutation of pool members lo..hi. It is plain JSON for the caller to
+        persist between attempts.
+        """
+        members = self.pools.get(pool, [])
+        if count > self.active_count(pool):
+            raise ValueError(f"Pool {pool} has {self.active_count(pool)} active items, {count} requested")
+
+        lo, hi, cursor, epoch = state.get(pool) or [0, len(members), 0, 0]
+        permutation = FeistelPermutation(hi - lo, self._key(user_id, pool, lo, epoch)) if hi > lo else None
+        picked = []
+        seen = set()
+        # The rest of this cycle, the items added since, then one full fresh cycle
+        budget = (hi - lo - cursor) + (len(members) - hi) + len(members)
+        while len(picked) < count:
+            if budget <= 0:
+                raise ValueError(f"Pool {pool} ran out of distinct active items after a full pass")
+            if cursor >= hi - lo:
+                # Serve items added since this cycle began, then start a fresh cycle
+                lo, hi, cursor = (hi, len(members), 0) if hi < len(members) else (0, len(members), 0)
+                epoch += lo == 0
+                permutation = FeistelPermutation(hi - lo, self._key(user_id, pool, lo, epoch))
+                continue
+            index = members[lo + permutation[cursor]]
+            cursor += 1
+            budget -= 1
+            if index != REMOVED and available(self.items[index]) and index not in seen:
+                seen.add(index)
+                picked.append(index)
+        state[pool] = [lo, hi, cursor, epoch]
+        return picked
+
+    def allocate(self, module, questions, mix=DEFAULT_MIX):
+        """Split a question count across difficulty strata (largest remainder, capped by stock)"""
+        available = {d: self.active_count(f"module/{module}/{d}") for d in DIFFICULTIES}
+        total_available = sum(available.values())
+        if questions > total_available:
+            raise ValueError(f"{module} has {total_available} active questions, exam needs {questions}")
+
+        counts = {d: 0 for d in DIFFICULTIES}
+        remaining = questions
+        weights = {d: mix[d] for d in DIFFICULTIES if available[d] and mix.get(d, 0) > 0}
+        # Repeat while capping strata that run out frees questions for the others
+        while remaining:
+            if not weights:
+                # The mix cannot be met; fill from whatever strata still have stock
+                weights = {d: 1 for d in DIFFICULTIES if counts[d] < available[d]}
+            scale = sum(weights.values())
+            shares = {d: remaining * w / scale for d, w in weights.items()}
+            floors = {d: int(share) for d, share in shares.items()}
+            leftover = remaining - sum(floors.values())
+            for d in sorted(shares, key=lambda d: shares[d] - floors[d], reverse=True)[:leftover]:
+                floors[d] += 1
+            remaining = 0
+            for d, share in floors.items():
+                take = min(share, available[d] - counts[d])
+                counts[d] += take
+                remaining += share - take
+            weights = {d: w for d, w in weights.items() if counts[d] < available[d]}
+        return counts
+
+    def assemble_exam(self, user_id, module, state, questions=None, mix=DEFAULT_MIX, seed=None):
+        """Assemble a stratified exam of unseen questions for one user's attempt"""
+        spec_questions, minutes, pass_mark = EXAM_SPECS.get(module, (questions or 40, None, None))
+        counts = self.allocate(module, questions or spec_questions, mix)
+        picked = []
+        for difficulty, count in counts.items():
+            if count:
+                picked.extend(self.draw(user_id, f"module/{module}/{difficulty}", count, state))
+        # Interleave strata so difficulty does not climb through the paper
+        random.Random(seed).shuffle(picked)
+        return {
+            'module': module,
+            'duration_minutes': minutes,
+            'pass_percent': pass_mark,
+            'difficulty_counts': counts,
+            'questions': [{key: value for key, value in self.items[index].items()
+                           if key not in ('answer', 'retired', 'flagged', 'stats', 'source')}
+                          for index in picked]
+        }
+
+def main():
+    """Main function to build the question bank or assemble an exam"""
+
+    parser = argparse.ArgumentParser(description="Build the question bank and assemble module exams")
+    parser.add_argument('--assemble', metavar='MODULE', help='assemble an exam for this module instead of building')
+    parser.add_argument('--user', default='demo-user', help='user the exam is assembled for')
+    parser.add_argument('--state', help='JSON file holding the user draw state (read and updated)')
+    parser.add_argument('--questions', type=int, help='override the exam question count')
+    add_config_arguments(parser)
+    add_profiling_arguments(parser)
+    args = parser.parse_args()
+    config = load_config(args)
+    questions_dir = config.corpus_dir / 'assessment-center' / 'questions'
+    bank_file = config.build_dir / QUESTION_BANK_FILE.name
+
+    if args.assemble:
+        state = {}
+        if args.state and os.path.exists(args.state):
+            with open(args.state, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        exam = QuestionBank.load(bank_file).assemble_exam(args.user, args.assemble, state, args.questions)
+        if args.state:
+            with open(args.state, 'w', encoding='utf-8') as f:
+                json.dump(state, f)
+        print(json.dumps(exam, indent=2, ensure_ascii=False))
+        return
+
+    print("=== INR100 Question Bank ===")
+    print()
+
+    with profiling_session(args, 'question_bank'):
+        active = build_question_bank(questions_dir, bank_file, config.build_dir / ITEM_STATS_FILE.name,
+                                     config.build_dir / QUIZZES_DIR.name)
+
+    print()
+    print("=== QUESTION BANK COMPLETE ===")
+    print(f"Active questions: {active}")
+    print(f"Bank file: {bank_file}")
+
+if __name__ == "__main__":
+    main()
@@ -4,14 +4,20 @@ INR100 Missing Content Recovery and Creation Script
 Systematically creates missing lessons for mutual funds and advanced content
 """
 
+import argparse
 import os
 from pathlib import Path
 from datetime import datetime
 
-def create_mutual_funds_content():
+from course_content import COURSES_DIR
+from pipeline_profiling import profiler, profile_stage, add_profiling_arguments, profiling_session
+from course_config import add_config_arguments, load_config, mirror_source
+
+@profile_stage('recover-mutual-funds')
+def create_mutual_funds_content(courses_dir=COURSES_DIR):
     """Create comprehensive mutual funds content for intermediate level"""
     
-    mutual_funds_dir = Path('/workspace/INR100-APP/courses/intermediate-level/module-04-mutual-funds')
+    mutual_funds_dir = courses_dir / 'intermediate-level' / 'module-04-mutual-funds'
     mutual_funds_dir.mkdir(parents=True, exist_ok=True)
     
     # Mutual Funds curriculum (30 lessons)
@@ -103,18 +109,18 @@ After completing this lesson, proceed to the next lesson in the mutual funds mod
 *Part of INR100 Intermediate Level - Mutual Funds Module*
 """
             
-            with open(lesson_file, 'w', encoding='utf-8') as f:
-                f.write(content)
+            profiler.write_text(lesson_file, content)
             created_count += 1
             print(f"Created: {lesson_file.name}")
     
     print(f"Mutual Funds lessons created: {created_count}")
     return created_count
 
-def create_derivatives_content():
+@profile_stage('recover-derivatives')
+def create_derivatives_content(courses_dir=COURSES_DIR):
     """Create comprehensive derivatives content for advanced level"""
     
-    derivatives_dir = Path('/workspace/INR100-APP/courses/advanced-level/module-07-derivatives')
+    derivatives_dir = courses_dir / 'advanced-level' / 'module-07-derivatives'
     derivatives_dir.mkdir(parents=True, exist_ok=True)
     
     # Derivatives curriculum (25 lessons)
@@ -215,18 +221,18 @@ This comprehensive lesson covers:
 *Part of INR100 Advanced Level - Derivatives Module*
 """
             
-            with open(lesson_file, 'w', encoding='utf-8') as f:
-                f.write(content)
+            profiler.write_text(lesson_file, content)
             created_count += 1
             print(f"Created: {lesson_file.name}")
     
     print(f"Derivatives lessons created: {created_count}")
     return created_count
 
-def create_alternative_investments_content():
+@profile_stage('recover-alternative-investments')
+def create_alternative_investments_content(courses_dir=COURSES_DIR):
     """Create comprehensive alternative investments content"""
     
-    alt_inv_dir = Path('/workspace/INR100-APP/courses/advanced-level/module-08-alternative-investments')
+    alt_inv_dir = courses_dir / 'advanced-level' / 'module-08-alternative-investments'
     alt_inv_dir.mkdir(parents=True, exist_ok=True)
     
     # Alternative Investments curriculum (20 lessons)
@@ -320,18 +326,18 @@ Upon completion of this lesson, you will:
 *Part of INR100 Advanced Level - Alternative Investments Module*
 """
             
-            with open(lesson_file, 'w', encoding='utf-8') as f:
-                f.write(content)
+            profiler.write_text(lesson_file, content)
             created_count += 1
             print(f"Created: {lesson_file.name}")
     
     print(f"Alternative Investments lessons created: {created_count}")
     return created_count
 
-def create_professional_trading_content():
+@profile_stage('recover-professional-trading')
+def create_professional_trading_content(courses_dir=COURSES_DIR):
     """Create comprehensive professional trading content"""
     
-    prof_trading_dir = Path('/workspace/INR100-APP/courses/advanced-level/module-09-professional-trading')
+    prof_trading_dir = courses_dir / 'advanced-level' / 'module-09-professional-trading'
     prof_trading_dir.mkdir(parents=True, exist_ok=True)
     
     # Professional Trading curriculum (25 lessons)
@@ -440,8 +446,7 @@ This advanced lesson develops your expertise in:
 *Part of INR100 Advanced Level - Professional Trading Module*
 """
             
-            with open(lesson_file, 'w', encoding='utf-8') as f:
-                f.write(content)
+            profiler.write_text(lesson_file, content)
             created_count += 1
             print(f"Created: {lesson_file.name}")
     
@@ -450,28 +455,40 @@ This advanced lesson develops your expertise in:
 
 def main():
     """Main function to create all missing content"""
+    parser = argparse.ArgumentParser(description="Create missing lessons for incomplete modules")
+    add_config_arguments(parser)
+    add_profiling_arguments(parser)
+    args = parser.parse_args()
+    config = load_config(args)
+
+    with profiling_session(args, 'recover_missing_content'):
+        mirror_source(config)
+        run_recovery(config.corpus_dir)
+
+def run_recovery(courses_dir=COURSES_DIR):
+    """Create the missing lessons for every incomplete module"""
     print("=== INR100 Missing Content Recovery ===")
     print("Creating comprehensive content for missing modules...")
     print()
     
     # Create mutual funds content
     print("1. Creating Mutual Funds Content...")
-    mutual_funds_count = create_mutual_funds_content()
+    mutual_funds_count = create_mutual_funds_content(courses_dir)
     print()
     
     # Create derivatives content
     print("2. Creating Derivatives Content...")
-    derivatives_count = create_derivatives_content()
+    derivatives_count = create_derivatives_content(courses_dir)
     print()
     
     # Create alternative investments content
     print("3. Creating Alternative Investments Content...")
-    alt_inv_count = create_alternative_investments_content()
+    alt_inv_count = create_alternative_investments_content(courses_dir)
     print()
     
     # Create professional trading content
     print("4. Creating Professional Trading Content...")
-    prof_trading_count = create_professional_trading_content()
+    prof_trading_count = create_professional_trading_content(courses_dir)
     print()
     
     # Summary
@@ -4,11 +4,16 @@ INR100 Course Module Reorganization Script
 Reorganizes existing modules into the new structured directory layout
 """
 
+import argparse
 import os
 import shutil
 import re
 from pathlib import Path
 
+from course_content import COURSES_DIR
+from pipeline_profiling import profiler, profile_stage, add_profiling_arguments, profiling_session
+from course_config import add_config_arguments, load_config, mirror_source
+
 def get_module_difficulty(readme_path):
     """Determine module difficulty level from README content"""
     try:
@@ -79,9 +84,19 @@ def get_module_category(readme_path):
     except:
         return 'foundation', 'module-01-money-basics'
 
-def reorganize_modules():
+def copy_if_changed(src, dst):
+    """copy2 unless dst is already a copy of src (same size and preserved mtime)"""
+    try:
+        s, d = os.stat(src), os.stat(dst)
+        if s.st_size == d.st_size and s.st_mtime_ns == d.st_mtime_ns:
+            return dst
+    except FileNotFoundError:
+        pass
+    return shutil.copy2(src, dst)
+
+@profile_stage('reorganize')
+def reorganize_modules(courses_dir=COURSES_DIR):
     """Main reorganization function"""
-    courses_dir = Path('/workspace/INR100-APP/courses')
     
     # Find all module directories
     module_dirs = []
@@ -100,8 +115,9 @@ def reorganize_modules():
             continue
             
         # Determine module characteristics
-        difficulty = get_module_difficulty(readme_path)
-        category, target_name = get_module_category(readme_path)
+        with profiler.span('parse', file=readme_path):
+            difficulty = get_module_difficulty(readme_path)
+            category, target_name = get_module_category(readme_path)
         
         print(f"Processing: {module_dir.name}")
         print(f"  - Difficulty: {difficulty}")
@@ -125,13 +141,15 @@ def reorganize_modules():
         
         # Copy module contents to target directory
         try:
-            for file_path in module_dir.iterdir():
-                if file_path.name != 'reorganize_modules.py':  # Don't copy this script
-                    target_file = target_dir / file_path.name
-                    if file_path.is_dir():
-                        shutil.copytree(file_path, target_file, dirs_exist_ok=True)
-                    else:
-                        shutil.copy2(file_path, target_file)
+            with profiler.span('write', file=module_dir):
+                for file_path in module_dir.iterdir():
+                    if file_path.name != 'reorganize_modules.py':  # Don't copy this script
+                        target_file = target_dir / file_path.name
+                        if file_path.is_dir():
+                            shutil.copytree(file_path, target_file, dirs_exist_ok=True,
+                                            copy_function=copy_if_changed)
+                        else:
+                            copy_if_changed(file_path, target_file)
             print(f"  - Successfully moved to: {target_dir}")
         except Exception as e:
             print(f"  - Error moving module: {e}")
@@ -140,5 +158,17 @@ def reorganize_modules():
     
     print("Module reorganization completed!")
 
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Reorganize course modules into level directories")
+    add_config_arguments(parser)
+    add_profiling_arguments(parser)
+    args = parser.parse_args()
+    config = load_config(args)
+
+    with profiling_session(args, 'reorganize_modules'):
+        mirror_source(config)
+        reorganize_modules(config.corpus_dir)
+
 if __name__ == "__main__":
-    reorganize_modules()
+    main()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+INR100 Monte Carlo Retirement and Goal Simulator
+Probability-of-success answers for the retirement and goal-based planning calculators
+
+Paths are simulated yearly. Each year's contribution (positive) or
+withdrawal (negative) is applied at the start of the year, then the balance
+earns a lognormal return whose mean and volatility can differ per year
+(e.g. equity-heavy before retirement, conservative after). All paths of a
+chunk advance together as one NumPy array, so the only Python loop is over
+years.
+
+Randomness comes from a SeedSequence spawned into one stream per fixed
+block of BLOCK_PATHS paths, and chunks are whole runs of blocks. A seed
+therefore reproduces the same paths whatever the chunk size or process
+count. Chunks bound the memory used by draws and temporaries, and with
+workers > 1 chunks run in separate processes. Percentile bands for
+every year come from a single np.percentile call over the wealth matrix.
+
+    python3 courses/retirement_simulator.py --age 30 --retire-at 60 --expense 50000 --json
+"""
+
+import argparse
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from financial_calculators import future_cost
+
+DEFAULT_PATHS = 10_000
+# Paths simulated per chunk; bounds the size of each draw and its temporaries
+CHUNK_PATHS = 16_384
+# Paths per random stream; chunk sizes are rounded up to a multiple of this
+BLOCK_PATHS = 4_096
+PERCENTILES = (10, 25, 50, 75, 90)
+
+def lognormal_parameters(mean_return, volatility):
+    """Per-year (mu, sigma) of log gross returns with the given arithmetic mean and volatility (%)"""
+    mean = 1 + np.asarray(mean_return, dtype=np.float64) / 100
+    variance = (np.asarray(volatility, dtype=np.float64) / 100) ** 2
+    sigma2 = np.log1p(variance / mean ** 2)
+    return np.log(mean) - sigma2 / 2, np.sqrt(sigma2)
+
+def simulate_chunk(task):
+    """Simulate one chunk of paths; returns (wealth (paths, years + 1), depletion year or -1)
+
+    Runs in worker processes, so it takes a single picklable tuple.
+    """
+    blocks, initial, cashflows, mu, sigma = task
+    years = len(cashflows)
+    paths = sum(size for _, size in blocks)
+    wealth = np.empty((paths, years + 1), dtype=np.float64)
+    wealth[:, 0] = initial
+    depleted = np.full(paths, -1, dtype=np.int32)
+    draws = [np.random.Generator(np.random.PCG64(seed)).standard_normal((size, years)) for seed, size in blocks]
+    growth = np.exp(mu + sigma * (draws[0] if len(draws) == 1 else np.concatenate(draws)))
+
+    balance = np.full(paths, float(initial))
+    for year in range(years):
+        balance += cashflows[year]
+        # A path is depleted the first year a withdrawal exceeds its balance
+        short = (balance < 0) & (depleted < 0)
+        depleted[short] = year
+        np.maximum(balance, 0.0, out=balance)
+        balance *= growth[:, year]
+        wealth[:, year + 1] = balance
+    return wealth, depleted
+
+def simulate_wealth(initial, cashflows, mean_return, volatility, paths=DEFAULT_PATHS, seed=None,
+                    chunk_paths=CHUNK_PATHS, workers=1):
+    """Simulate wealth paths for yearly cashflows under per-year return assumptions
+
+    mean_return and volatility (% per year) broadcast against cashflows.
+    Returns (wealth (paths, years + 1), depletion year per path, -1 if never).
+    """
+    cashflows = np.asarray(cashflows, dtype=np.float64)
+    mu, sigma = lognormal_parameters(np.broadcast_to(mean_return, cashflows.shape),
+                                     np.broadcast_to(volatility, cashflows.shape))
+    sizes = [min(BLOCK_PATHS, paths - start) for start in range(0, paths, BLOCK_PATHS)]
+    blocks = list(zip(np.random.SeedSequence(seed).spawn(len(sizes)), sizes))
+    per_chunk = max(1, -(-chunk_paths // BLOCK_PATHS))
+    tasks = [(blocks[start:start + per_chunk], float(initial), cashflows, mu, sigma)
+             for start in range(0, len(blocks), per_chunk)]
+
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(simulate_chunk, tasks))
+    else:
+        results = [simulate_chunk(task) for task in tasks]
+
+    if len(results) == 1:
+        return results[0]
+    return np.concatenate([wealth for wealth, _ in results]), np.concatenate([depleted for _, depleted in results])
+
+def percentile_bands(wealth, deflator=None):
+    """{'p10': [...], ...} per year, optionally in today's money"""
+    if deflator is not None:
+        wealth = wealth / deflator
+    bands = np.percentile(wealth, PERCENTILES, axis=0)
+    return {f"p{p}": np.round(band).tolist() for p, band in zip(PERCENTILES, bands)}
+
+def simulate_retirement(current_savings, monthly_contribution, years_to_retirement, years_in_retirement,
+                        monthly_expense, expected_return=12.0, volatility=18.0, retirement_return=8.0,
+                        retirement_volatility=8.0, inflation=6.0, contribution_step_up=0.0,
+                        paths=DEFAULT_PATHS, seed=None, chunk_paths=CHUNK_PATHS, workers=1):
+    """Probability that savings last through retirement, with yearly wealth bands
+
+    monthly_expense is in today's money and grows with inflation; contributions
+    grow by contribution_step_up % a year until retirement.
+    """
+    accumulation = np.arange(years_to_retirement)
+    retirement = np.arange(years_to_retirement, years_to_retirement + years_in_retirement)
+    contributions = 12 * monthly_contribution * (1 + contribution_step_up / 100) ** accumulation
+    withdrawals = 12 * future_cost(monthly_expense, inflation, retirement)
+    cashflows = np.concatenate([contributions, -withdrawals])
+    mean_return = np.where(np.arange(len(cashflows)) < years_to_retirement, expected_return, retirement_return)
+    vol = np.where(np.arange(len(cashflows)) < years_to_retirement, volatility, retirement_volatility)
+
+    wealth, depleted = simulate_wealth(current_savings, cashflows, mean_return, vol, paths, seed,
+                                       chunk_paths, workers)
+    years = len(cashflows)
+    # Share of paths still funded after each retirement year
+    depletion_counts = np.bincount(depleted[depleted >= 0], minlength=years)
+    survival = 1 - np.cumsum(depletion_counts) / paths
+    deflator = future_cost(1.0, inflation, np.arange(years + 1))
+    corpus = wealth[:, years_to_retirement]
+
+    return {
+        'paths': paths,
+        'success_probability': round(float(np.mean(depleted < 0)), 4),
+        'corpus_at_retirement': {f"p{p}": round(float(v)) for p, v in
+                                 zip(PERCENTILES, np.percentile(corpus, PERCENTILES))},
+        'funded_probability_by_year': np.round(survival[years_to_retirement:], 4).tolist(),
+        'wealth_bands': percentile_bands(wealth),
+        'real_wealth_bands': percentile_bands(wealth, deflator)
+    }
+
+def simulate_goal(target_amount, years, current_savings=0.0, monthly_contribution=0.0, expected_return=12.0,
+                  volatility=18.0, inflation=6.0, contribution_step_up=0.0, paths=DEFAULT_PATHS, seed=None,
+                  chunk_paths=CHUNK_PATHS, workers=1):
+    """Probability of reaching a goal costing target_amount in today's money after years"""
+    contributions = 12 * monthly_contribution * (1 + contribution_step_up / 100) ** np.arange(years)
+    wealth, _ = simulate_wealth(current_savings, contributions, expected_return, volatility, paths, seed,
+                                chunk_paths, workers)
+    target = float(future_cost(target_amount, inflation, years))
+    final = wealth[:, -1]
+    return {
+        'paths': paths,
+        'target_future_value': round(target),
+        'success_probability': round(float(np.mean(final >= target)), 4),
+        'final_wealth': {f"p{p}": round(float(v)) for p, v in zip(PERCENTILES, np.percentile(final, PERCENTILES))},
+        'wealth_bands': percentile_bands(wealth)
+    }
+
+def main():
+    """Main function to run a retirement simulation from the command line"""
+
+    parser = argparse.ArgumentParser(description="Monte Carlo retirement simulation")
+    parser.add_argument('--age', type=int, default=30, help='current age')
+    parser.add_argument('--retire-at', type=int, default=60, help='retirement age')
+    parser.add_argument('--plan-to', type=int, default=85, help='age savings must last until')
+    parser.add_argument('--savings', type=float, default=0.0, help='current savings (Rs)')
+    parser.add_argument('--sip', type=float, default=20000.0, help='monthly contribution (Rs)')
+    parser.add_argument('--step-up', type=float, default=0.0, help='yearly contribution increase (%%)')
+    parser.add_argument('--expense', type=float, default=50000.0, help="monthly expense in today's money (Rs)")
+    parser.add_argument('--return', dest='expected_return', type=float, default=12.0, help='pre-retirement return (%%)')
+    parser.add_argument('--volatility', type=float, default=18.0, help='pre-retirement volatility (%%)')
+    parser.add_argument('--inflation', type=float, default=6.0, help='inflation (%%)')
+    parser.add_argument('--paths', type=int, default=DEFAULT_PATHS, help='number of simulated paths')
+    parser.add_argument('--seed', type=int, default=None, help='seed for reproducible paths')
+    parser.add_argument('--workers', type=int, default=1, help='processes to shard chunks across')
+    parser.add_argument('--json', action='store_true', help='print the full result as JSON')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    result = simulate_retirement(args.savings, args.sip, args.retire_at - args.age, args.plan_to - args.retire_at,
+                                 args.expense, args.expected_return, args.volatility, inflation=args.inflation,
+                                 contribution_step_up=args.step_up, paths=args.paths, seed=args.seed,
+                                 workers=args.workers)
+    elapsed = time.perf_counter() - start
+
+    if args.json:
+        print(json.dumps(result))
+        return
+
+    print("=== INR100 Retirement Simulation ===")
+    print(f"Paths simulated: {result['paths']:,} in {elapsed * 1000:.0f} ms")
+    print(f"Probability savings last to age {args.plan_to}: {result['success_probability']:.1%}")
+    for band, value in result['corpus_at_retirement'].items():
+        print(f"  Corpus at {args.retire_at} ({band}): Rs {value:,}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+INR100 Course Pipeline Runner
+Runs every course build stage as a dependency graph with cached, fingerprinted stages
+
+Each stage declares the stages it depends on, the corpus files it reads (glob
+patterns under the courses directory), the scripts whose code it runs, and the
+artefacts it produces. A stage is skipped when the fingerprint of its inputs
+matches the one recorded after its last successful run and its outputs still
+exist. Stages whose dependencies are satisfied run concurrently.
+
+With --output-root the source corpus is mirrored into the output root first
+and every stage works on that copy; the cache state lives with the output.
+
+    python3 courses/run_pipeline.py                 # build everything that changed
+    python3 courses/run_pipeline.py search-index    # one target and its upstream stages
+    python3 courses/run_pipeline.py --list          # show the graph and what is stale
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import stat
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from pathlib import Path
+
+from course_config import CourseConfig, add_config_arguments, load_config, mirror_source
+from pipeline_profiling import profiler, add_profiling_arguments, profiling_session
+
+STATE_FILE = 'pipeline-state.json'
+SCRIPTS_DIR = Path(__file__).resolve().parent
+
+LESSONS = '*-level/module-*/lesson-*.md'
+MODULE_FILES = '*-level/module-*/*'
+MEDIA_FILES = '*-level/module-*/*/*'
+
+# Stage artefacts as (config attribute, path parts), resolved per build
+BUNDLES = ('publish_dir', 'bundles')
+PACKS = ('publish_dir', 'packs')
+SEARCH_INDEX = ('build_dir', 'search-index.sqlite')
+AUTOCOMPLETE = ('publish_dir', 'autocomplete.json')
+SECTIONS = ('publish_dir', 'sections')
+RENDER_CACHE = ('build_dir', 'render-cache')
+STATS = ('publish_dir', 'stats')
+CALCULATORS = ('publish_dir', 'calculators')
+QUESTION_BANK = ('build_dir', 'question-bank.json')
+QUIZZES = ('build_dir', 'quizzes')
+ITEM_STATS = ('build_dir', 'item-stats.json')
+PREREQUISITE_GRAPH = ('build_dir', 'prerequisite-graph.json')
+CONTENT_HISTORY = ('build_dir', 'content-history.json')
+
+class Stage:
+    """One node of the pipeline graph"""
+
+    def __init__(self, name, run, deps=(), inputs=(), code=(), outputs=()):
+        self.name = name
+        self.run = run
+        self.deps = list(deps)
+        self.inputs = list(inputs)
+        self.code = ['course_content.py', 'course_config.py'] + list(code)
+        self.outputs = list(outputs)
+
+def _call(module, function, *outputs):
+    """Import a stage module lazily so --list stays fast
+
+    outputs are config attribute paths passed after the corpus directory,
+    e.g. ('publish_dir', 'bundles') -> config.publish_dir / 'bundles'.
+    """
+    def run(config):
+        args = [_resolve(config, output) for output in outputs]
+        return getattr(__import__(module), function)(config.corpus_dir, *args)
+    return run
+
+def _resolve(config, output):
+    attribute, *parts = output
+    return getattr(config, attribute).joinpath(*parts)
+
+def _run_recovery(config):
+    import recover_missing_content as recovery
+    courses_dir = config.corpus_dir
+    return (recovery.create_mutual_funds_content(courses_dir)
+            + recovery.create_derivatives_content(courses_dir)
+            + recovery.create_alternative_investments_content(courses_dir)
+            + recovery.create_professional_trading_content(courses_dir))
+
+def _run_advanced_apis(config):
+    import implement_advanced_features as features
+    return all([features.create_ai_recommendation_system(config.app_dir),
+                features.create_learning_analytics_system(config.app_dir),
+                features.create_mobile_optimization(config.app_dir),
+                features.create_content_delivery_apis(config.app_dir)])
+
+def _run_calculator_grids(config):
+    import financial_calculators as calculators
+    return calculators.build_calculator_grids(_resolve(config, CALCULATORS))
+
+def _run_question_bank(config):
+    import question_bank
+    return question_bank.build_question_bank(config.corpus_dir / 'assessment-center' / 'questions',
+                                             _resolve(config, QUESTION_BANK), _resolve(config, ITEM_STATS),
+                                             _resolve(config, QUIZZES))
+
+def build_stages():
+    """The pipeline graph, in the order the scripts were historically run"""
+    return [
+        Stage('reorganize', _call('reorganize_modules', 'reorganize_modules'),
+              inputs=['*/README.md', '*/lesson-*.md'], code=['reorganize_modules.py']),
+        Stage('dedup', _call('deduplicate_lessons', 'deduplicate_lessons'),
+              deps=['reorganize'], inputs=['**/lesson-*.md'], code=['deduplicate_lessons.py']),
+        Stage('recover', _run_recovery,
+              deps=['dedup'], inputs=[LESSONS], code=['recover_missing_content.py']),
+        Stage('metadata', _call('enhance_metadata_structure', 'create_enhanced_metadata', CONTENT_HISTORY),
+              deps=['recover'], inputs=[LESSONS], code=['enhance_metadata_structure.py']),
+        Stage('validate-frontmatter', _call('validate_frontmatter', 'check_frontmatter'),
+              deps=['metadata'], inputs=[LESSONS],
+              code=['validate_frontmatter.py', 'frontmatter-baseline.json']),
+        Stage('multimedia-structure', _call('enhance_metadata_structure', 'create_multimedia_structure'),
+              deps=['reorganize'], inputs=['*-level/module-*'], code=['enhance_metadata_structure.py']),
+        Stage('multimedia-index', _call('implement_advanced_features', 'create_sample_multimedia_content'),
+              deps=['multimedia-structure', 'metadata'], inputs=[MODULE_FILES],
+              code=['implement_advanced_features.py']),
+        Stage('advanced-apis', _run_advanced_apis,
+              code=['implement_advanced_features.py']),
+        Stage('publish-bundles', _call('publish_compressed_bundles', 'publish_bundles', BUNDLES),
+              deps=['metadata'], inputs=[LESSONS], code=['publish_compressed_bundles.py'],
+              outputs=[BUNDLES + ('catalog.json',)]),
+        Stage('offline-packs', _call('build_offline_packs', 'build_offline_packs', PACKS),
+              deps=['metadata', 'multimedia-index'], inputs=[LESSONS, MEDIA_FILES],
+              code=['build_offline_packs.py'], outputs=[PACKS]),
+        Stage('search-index', _call('build_search_index', 'build_search_index', SEARCH_INDEX),
+              deps=['metadata'], inputs=[LESSONS], code=['build_search_index.py'],
+              outputs=[SEARCH_INDEX]),
+        Stage('autocomplete', _call('build_autocomplete_index', 'build_autocomplete_index', AUTOCOMPLETE),
+              deps=['metadata'], inputs=[LESSONS],
+              code=['build_autocomplete_index.py', 'publish_compressed_bundles.py'],
+              outputs=[AUTOCOMPLETE]),
+        Stage('section-index', _call('build_section_index', 'build_section_index', SECTIONS),
+              deps=['metadata'], inputs=[LESSONS], code=['build_section_index.py'],
+              outputs=[SECTIONS]),
+        Stage('render-cache', _call('build_render_cache', 'build_render_cache', RENDER_CACHE),
+              deps=['metadata'], inputs=[LESSONS],
+              code=['build_render_cache.py', 'build_section_index.py'], outputs=[RENDER_CACHE]),
+        Stage('module-stats', _call('build_module_stats', 'build_module_stats', STATS),
+              deps=['metadata', 'multimedia-index'], inputs=[LESSONS, MEDIA_FILES],
+              code=['build_module_stats.py'], outputs=[STATS + ('summary.json',)]),
+        Stage('calculator-grids', _run_calculator_grids,
+              code=['financial_calculators.py'], outputs=[CALCULATORS + ('index.json',)]),
+        Stage('quiz-extract', _call('extract_quizzes', 'extract_quizzes', QUIZZES),
+              deps=['metadata'], inputs=[LESSONS], code=['extract_quizzes.py'], outputs=[QUIZZES]),
+        Stage('question-bank', _run_question_bank,
+              deps=['quiz-extract'], inputs=['assessment-center/questions/**/*.json', LESSONS],
+              code=['question_bank.py', 'extract_quizzes.py'], outputs=[QUESTION_BANK]),
+        Stage('prerequisite-graph', _call('learning_paths', 'build_prerequisite_graph', PREREQUISITE_GRAPH),
+              deps=['metadata'], inputs=[LESSONS, 'README.md'],
+              code=['learning_paths.py', 'build_module_stats.py'], outputs=[PREREQUISITE_GRAPH])
+    ]
+
+def topological_order(stages):
+    """Return stage names dependencies-first, rejecting unknown deps and cycles"""
+    by_name = {stage.name: stage for stage in stages}
+    order, visiting, done = [], set(), set()
+
+    def visit(name, path):
+        if name in done:
+            return
+        if name not in by_name:
+            raise ValueError(f"Unknown stage '{name}' (required by {path[-1] if path else 'command line'})")
+        if name in visiting:
+            raise ValueError(f"Dependency cycle: {' -> '.join(path + [name])}")
+        visiting.add(name)
+        for dep in by_name[name].deps:
+            visit(dep, path + [name])
+        visiting.discard(name)
+        done.add(name)
+        order.append(name)
+
+    for stage in stages:
+        visit(stage.name, [])
+    return order
+
+def select_stages(stages, targets):
+    """Targets plus everything upstream of them; all stages when no targets"""
+    by_name = {stage.name: stage for stage in stages}
+    if not targets:
+        return set(by_name)
+    selected = set()
+    pending = list(targets)
+    while pending:
+        name = pending.pop()
+        if name not in by_name:
+            raise ValueError(f"Unknown stage '{name}'")
+        if name not in selected:
+            selected.add(name)
+            pending.extend(by_name[name].deps)
+    return selected
+
+class FileHasher:
+    """Content hashes keyed by (size, mtime), so only touched files are re-read
+
+    Hashing content rather than mtimes means a stage that rewrites a file with
+    identical bytes does not invalidate everything downstream of it.
+    """
+
+    def __init__(self, cache=None):
+        self.cache = {} if cache is None else cache
+        self.lock = threading.Lock()
+
+    def digest(self, path, key):
+        st = path.stat()
+        if stat.S_ISDIR(st.st_mode):
+            # A directory's identity is its listing
+            names = '\n'.join(sorted(os.listdir(path)))
+            return hashlib.sha256(names.encode('utf-8')).hexdigest()
+        with self.lock:
+            cached = self.cache.get(key)
+        if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+            return cached[2]
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        value = digest.hexdigest()
+        with self.lock:
+            self.cache[key] = [st.st_size, st.st_mtime_ns, value]
+        return value
+
+def fingerprint(stage, courses_dir, hasher):
+    """Hash over the content of every input file and code file of a stage"""
+    digest = hashlib.sha256()
+    entries = set()
+    for pattern in stage.inputs:
+        for path in courses_dir.glob(pattern):
+            entries.add(('corpus', path.relative_to(courses_dir).as_posix(), path))
+    for name in stage.code:
+        entries.add(('code', name, SCRIPTS_DIR / name))
+
+    for kind, rel, path in sorted(entries, key=lambda entry: entry[:2]):
+        try:
+            value = hasher.digest(path, f"{kind}:{rel}")
+        except FileNotFoundError:
+            value = 'missing'
+        digest.update(f"{kind}\0{rel}\0{value}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+def load_state(state_file):
+    if state_file.exists():
+        with open(state_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {}
+
+def save_state(state_file, state):
+    state_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp = state_file.with_suffix('.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp, state_file)
+
+def is_stale(stage, config, state, hasher):
+    """Why a stage must run, or None when its cached result is still valid"""
+    record = state.get('stages', {}).get(stage.name)
+    if not record:
+        return 'never run'
+    missing = [str(path) for path in (_resolve(config, output) for output in stage.outputs)
+               if not path.exists()]
+    if missing:
+        return f"missing output {missing[0]}"
+    if record.get('fingerprint') != fingerprint(stage, config.corpus_dir, hasher):
+        return 'inputs changed'
+    return None
+
+def run_pipeline(config=None, targets=(), force=False, jobs=None):
+    """Run the selected stages in dependency order, concurrently where possible"""
+    config = config or CourseConfig.from_env()
+    courses_dir = config.corpus_dir
+    state_file = config.build_dir / STATE_FILE
+    stages = build_stages()
+    order = topological_order(stages)
+    by_name = {stage.name: stage for stage in stages}
+    selected = select_stages(stages, targets)
+    state = load_state(state_file)
+    state.setdefault('stages', {})
+    hasher = FileHasher(state.setdefault('files', {}))
+
+    copied = mirror_source(config)
+    if copied:
+        print(f"Mirrored {copied} changed source files into {courses_dir}")
+
+    pending = [name for name in order if name in selected]
+    finished, failed, ran = set(), set(), []
+
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as executor:
+        running = {}
+
+        def launch_ready():
+            for name in list(pending):
+                deps = by_name[name].deps
+                if any(dep in failed for dep in deps):
+                    pending.remove(name)
+                    failed.add(name)
+                    print(f"[{name}] skipped: upstream stage failed")
+                elif all(dep in finished or dep not in selected for dep in deps):
+                    pending.remove(name)
+                    # Staleness is decided once upstream stages have finished writing
+                    reason = 'forced' if force else is_stale(by_name[name], config, state, hasher)
+                    if reason is None:
+                        finished.add(name)
+                        print(f"[{name}] up to date")
+                        continue
+                    print(f"[{name}] running ({reason})")
+                    running[executor.submit(run_stage, by_name[name], config)] = name
+
+        launch_ready()
+        while running or pending:
+            if not running:
+                launch_ready()
+                if not running:
+                    break
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    future.result()
+                except Exception as e:
+                    failed.add(name)
+                    print(f"[{name}] failed: {e}")
+                    continue
+                # Fingerprint after the run: stages that rewrite their own inputs stay cached
+                state['stages'][name] = {'fingerprint': fingerprint(by_name[name], courses_dir, hasher)}
+                save_state(state_file, state)
+                finished.add(name)
+                ran.append(name)
+                print(f"[{name}] done")
+            launch_ready()
+
+    # Downstream stages rewrite files their upstream stages read (metadata adds
+    # frontmatter to the lessons dedup and recover saw), so fingerprints taken
+    # mid-run would be stale by the end. Refresh every stage that finished
+    # against the final tree so one clean run converges.
+    for name in order:
+        if name in finished:
+            state['stages'][name] = {'fingerprint': fingerprint(by_name[name], courses_dir, hasher)}
+    save_state(state_file, state)
+
+    return ran, sorted(failed)
+
+def run_stage(stage, config):
+    with profiler.stage(f"pipeline:{stage.name}"):
+        return stage.run(config)
+
+def list_stages(config=None):
+    """Print the graph in run order with each stage's cache status"""
+    config = config or CourseConfig.from_env()
+    stages = build_stages()
+    by_name = {stage.name: stage for stage in stages}
+    state = load_state(config.build_dir / STATE_FILE)
+    hasher = FileHasher(state.get('files'))
+    for name in topological_order(stages):
+        stage = by_name[name]
+        reason = is_stale(stage, config, state, hasher) or 'up to date'
+        deps = ', '.join(stage.deps) or '-'
+        print(f"{name:<22} after: {deps:<32} {reason}")
+
+def main():
+    """Main function to run the course pipeline"""
+
+    parser = argparse.ArgumentParser(description="Run the INR100 course build pipeline")
+    parser.add_argument('targets', nargs='*', help='stages to build (default: all)')
+    parser.add_argument('--force', action='store_true', help='ignore cached fingerprints')
+    parser.add_argument('--jobs', '-j', type=int, default=None, help='stages to run at once')
+    parser.add_argument('--list', action='store_true', help='show stages and their cache status')
+    add_config_arguments(parser)
+    add_profiling_arguments(parser)
+    args = parser.parse_args()
+    config = load_config(args)
+
+    if args.list:
+        list_stages(config)
+        return
+
+    print("=== INR100 Course Pipeline ===")
+    print()
+
+    with profiling_session(args, 'run_pipeline'):
+        ran, failed = run_pipeline(config, targets=args.targets, force=args.force, jobs=args.jobs)
+
+    print()
+    print("=== PIPELINE COMPLETE ===")
+    print(f"Stages run: {', '.join(ran) or 'none'}")
+    if failed:
+        print(f"Stages failed: {', '.join(failed)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
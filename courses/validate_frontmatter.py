@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+INR100 Lesson Frontmatter Validator
+Checks every lesson's frontmatter against a schema and reports all violations in one pass
+
+The schema is a JSON-Schema subset (type, required, properties, enum,
+pattern, minLength/maxLength, minimum/maximum, items, minItems, uniqueItems).
+compile_validator() turns it into straight-line Python source once, so
+checking a lesson is a handful of isinstance and regex calls with no schema
+interpretation at run time. Corpus-level rules (ids unique per module,
+frontmatter agreeing with the lesson's path) run after the per-lesson checks.
+
+Exits non-zero when any lesson violates the schema, so it can gate commits.
+Known violations in the shipped corpus are recorded in
+frontmatter-baseline.json; the pipeline stage only fails on violations that
+are not in the baseline, so fixing the corpus can happen incrementally
+while regressions are still caught. --update-baseline rewrites it.
+"""
+
+import argparse
+import itertools
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+import yaml
+
+from course_content import COURSES_DIR, LEVELS, YAML_LOADER, iter_modules, iter_lessons, read_frontmatter_block
+from pipeline_profiling import profiler, profile_stage, add_profiling_arguments, profiling_session
+from course_config import add_config_arguments, load_config
+
+BASELINE_FILE = Path(__file__).resolve().parent / 'frontmatter-baseline.json'
+
+LESSON_ID = r'^[A-Z0-9]{2}-\d+(\.\d+)?$'
+
+LESSON_SCHEMA = {
+    'type': 'object',
+    'required': ['lesson_id', 'title', 'duration', 'difficulty', 'xp_reward', 'learning_objectives',
+                 'tags', 'last_updated', 'content_level', 'module', 'lesson_number'],
+    'properties': {
+        'lesson_id': {'type': 'string', 'pattern': LESSON_ID},
+        'title': {'type': 'string', 'minLength': 3, 'maxLength': 160,
+                  # Filename slugs used to leak into titles as "13 Currency Swaps"
+                  'pattern': r'^(?!\d+\s)', 'patternMessage': 'starts with a lesson number'},
+        'duration': {'type': 'string', 'pattern': r'^\d+ minutes?$'},
+        'difficulty': {'enum': ['Beginner', 'Intermediate', 'Advanced']},
+        'xp_reward': {'type': 'integer', 'minimum': 0, 'maximum': 1000},
+        'prerequisites': {'type': 'array', 'items': {'type': 'string', 'minLength': 1}},
+        'learning_objectives': {'type': 'array', 'minItems': 1, 'items': {'type': 'string', 'minLength': 1}},
+        'tags': {'type': 'array', 'minItems': 1, 'uniqueItems': True,
+                 'items': {'type': 'string', 'minLength': 1}},
+        'related_lessons': {'type': 'array', 'items': {'type': 'string', 'pattern': LESSON_ID}},
+        'last_updated': {'type': 'string', 'pattern': r'^\d{4}-\d{2}-\d{2}$'},
+        'content_level': {'enum': LEVELS},
+        'module': {'type': 'string', 'pattern': r'^module-\d{2}-[a-z0-9-]+$'},
+        'lesson_number': {'type': 'string', 'pattern': r'^\d+(\.\d+)?$'}
+    }
+}
+
+TYPE_CHECKS = {
+    'string': "isinstance({0}, str)",
+    'integer': "(isinstance({0}, int) and not isinstance({0}, bool))",
+    'number': "(isinstance({0}, (int, float)) and not isinstance({0}, bool))",
+    'boolean': "isinstance({0}, bool)",
+    'array': "isinstance({0}, list)",
+    'object': "isinstance({0}, dict)"
+}
+
+def compile_validator(schema, name='validate'):
+    """Generate and compile a validator returning [(field path, message)] for one document"""
+    lines = [f"def {name}(data):", "    errors = []"]
+    constants = {}
+    names = itertools.count()
+
+    def constant(value):
+        key = f"_c{next(names)}"
+        constants[key] = value
+        return key
+
+    def emit(node, var, path, depth):
+        pad = '    ' * depth
+
+        def add(line):
+            lines.append(pad + line)
+
+        def error(message_expr):
+            return f"errors.append(({path}, {message_expr}))"
+
+        def bound(keyword, test, message):
+            # test/message are templates filled with the variable and the keyword's value
+            if keyword in node:
+                add(f"if {test.format(var, node[keyword])}:")
+                add(f"    {error(repr(message.format(node[keyword])))}")
+
+        if 'enum' in node:
+            allowed = constant(frozenset(node['enum']))
+            add(f"if not isinstance({var}, (str, int, float, bool)) or {var} not in {allowed}:")
+            add(f"    {error(repr('must be one of ' + ', '.join(map(str, node['enum']))))}")
+
+        kind = node.get('type')
+        if kind is None:
+            return
+        add(f"if not {TYPE_CHECKS[kind].format(var)}:")
+        add(f"    {error(repr(f'expected {kind}, got ') + f' + type({var}).__name__')}")
+        add("else:")
+        start = len(lines)
+        pad += '    '
+        depth += 1
+
+        if kind == 'string':
+            bound('minLength', "len({0}) < {1!r}", "shorter than {0} characters")
+            bound('maxLength', "len({0}) > {1!r}", "longer than {0} characters")
+            if 'pattern' in node:
+                regex = constant(re.compile(node['pattern']))
+                message = node.get('patternMessage', f"does not match {node['pattern']}")
+                add(f"if not {regex}.search({var}):")
+                add(f"    {error(repr(message))}")
+        elif kind in ('integer', 'number'):
+            bound('minimum', "{0} < {1!r}", "less than {0}")
+            bound('maximum', "{0} > {1!r}", "greater than {0}")
+        elif kind == 'array':
+            bound('minItems', "len({0}) < {1!r}", "needs at least {0} items")
+            bound('maxItems', "len({0}) > {1!r}", "allows at most {0} items")
+            if node.get('uniqueItems'):
+                add(f"if len(set(map(repr, {var}))) != len({var}):")
+                add(f"    {error(repr('contains duplicate items'))}")
+            if 'items' in node:
+                index = f"_i{next(names)}"
+                item = f"_v{next(names)}"
+                add(f"for {index}, {item} in enumerate({var}):")
+                emit(node['items'], item, f"{path} + '[' + str({index}) + ']'", depth + 1)
+        elif kind == 'object':
+            for key in node.get('required', []):
+                add(f"if {key!r} not in {var}:")
+                add(f"    errors.append(({path} + {('.' + key)!r}, 'is required'))")
+            for key, child in node.get('properties', {}).items():
+                value = f"_v{next(names)}"
+                add(f"{value} = {var}.get({key!r})")
+                add(f"if {value} is not None:")
+                emit(child, value, f"{path} + {('.' + key)!r}", depth + 1)
+            if node.get('additionalProperties') is False:
+                allowed = constant(frozenset(node.get('properties', {})))
+                key = f"_k{next(names)}"
+                add(f"for {key} in {var}:")
+                add(f"    if {key} not in {allowed}:")
+                add(f"        errors.append(({path} + '.' + str({key}), 'is not allowed'))")
+
+        if len(lines) == start:
+            add("pass")
+
+    emit(schema, 'data', "''", 1)
+    lines.append("    return errors")
+    source = '\n'.join(lines) + '\n'
+    namespace = dict(constants)
+    exec(compile(source, f"<schema validator {name}>", 'exec'), namespace)
+    validator = namespace[name]
+    validator.source = source
+    return validator
+
+validate_lesson_metadata = compile_validator(LESSON_SCHEMA, 'validate_lesson_metadata')
+
+def lesson_number(lesson_file):
+    """Numeric lesson number from a lesson filename ('lesson-07-...' -> 7)"""
+    match = re.match(r'lesson-(\d+)', lesson_file.name)
+    return int(match.group(1)) if match else None
+
+@profile_stage('validate-frontmatter')
+def validate_frontmatter(courses_dir=COURSES_DIR):
+    """Validate every lesson and return [(lesson path, field, message)] for all violations"""
+    violations = []
+    checked = 0
+    start = time.perf_counter()
+
+    for level, module_dir in iter_modules(courses_dir):
+        seen_ids = {}
+        for lesson_file in iter_lessons(module_dir):
+            rel_path = lesson_file.relative_to(courses_dir).as_posix()
+            checked += 1
+
+            with profiler.span('read', file=lesson_file):
+                with open(lesson_file, 'rb') as f:
+                    header, _ = read_frontmatter_block(f)
+            if not header:
+                violations.append((rel_path, '', 'has no frontmatter'))
+                continue
+            with profiler.span('parse', file=lesson_file):
+                try:
+                    metadata = yaml.load(header[4:-4].decode('utf-8'), Loader=YAML_LOADER)
+                except (yaml.YAMLError, UnicodeDecodeError) as e:
+                    violations.append((rel_path, '', f"frontmatter is not valid YAML: {e}"))
+                    continue
+
+            with profiler.span('validate', file=lesson_file):
+                if not isinstance(metadata, dict):
+                    violations.append((rel_path, '', 'frontmatter is not a mapping'))
+                    continue
+                violations.extend((rel_path, field, message)
+                                  for field, message in validate_lesson_metadata(metadata))
+
+                # Rules that need the lesson's location or its siblings
+                if metadata.get('content_level') not in (None, level):
+                    violations.append((rel_path, '.content_level', f"does not match directory {level}"))
+                if metadata.get('module') not in (None, module_dir.name):
+                    violations.append((rel_path, '.module', f"does not match directory {module_dir.name}"))
+                number = str(metadata.get('lesson_number', ''))
+                if re.fullmatch(r'\d+(\.\d+)?', number) and int(float(number)) != lesson_number(lesson_file):
+                    violations.append((rel_path, '.lesson_number', f"{number} does not match the filename"))
+                lesson_id = metadata.get('lesson_id')
+                if isinstance(lesson_id, str):
+                    if lesson_id in seen_ids:
+                        violations.append((rel_path, '.lesson_id', f"{lesson_id} duplicates {seen_ids[lesson_id]}"))
+                    else:
+                        seen_ids[lesson_id] = lesson_file.name
+
+    elapsed = time.perf_counter() - start
+    print(f"Frontmatter validation: {checked} lessons, {len(violations)} violations "
+          f"in {elapsed * 1000:.0f} ms")
+    return violations
+
+def load_baseline(baseline_file=BASELINE_FILE):
+    """Known violations as a set of (lesson path, field, message)"""
+    if not baseline_file.exists():
+        return set()
+    with open(baseline_file, 'r', encoding='utf-8') as f:
+        return {tuple(entry) for entry in json.load(f)}
+
+def save_baseline(violations, baseline_file=BASELINE_FILE):
+    with open(baseline_file, 'w', encoding='utf-8') as f:
+        json.dump(sorted(set(violations)), f, indent=1)
+        f.write('\n')
+
+def check_frontmatter(courses_dir=COURSES_DIR, baseline_file=BASELINE_FILE):
+    """Pipeline entry point: raise when the corpus has violations outside the baseline"""
+    violations = validate_frontmatter(courses_dir)
+    baseline = load_baseline(baseline_file)
+    new = [violation for violation in violations if violation not in baseline]
+    for rel_path, field, message in new[:50]:
+        print(f"  {rel_path}: {field.lstrip('.') or 'frontmatter'} {message}")
+    if len(violations) > len(new):
+        print(f"  {len(violations) - len(new)} known violations in {baseline_file.name}")
+    if new:
+        raise ValueError(f"{len(new)} new frontmatter violations")
+    return 0
+
+def main():
+    """Main function to validate lesson frontmatter"""
+
+    parser = argparse.ArgumentParser(description="Validate lesson frontmatter against the lesson schema")
+    parser.add_argument('--show-validator', action='store_true', help='print the generated validator source')
+    parser.add_argument('--baseline', action='store_true',
+                        help=f'only fail on violations missing from {BASELINE_FILE.name}')
+    parser.add_argument('--update-baseline', action='store_true',
+                        help=f'record the current violations in {BASELINE_FILE.name}')
+    add_config_arguments(parser)
+    add_profiling_arguments(parser)
+    args = parser.parse_args()
+    config = load_config(args)
+
+    if args.show_validator:
+        print(validate_lesson_metadata.source)
+        return
+
+    with profiling_session(args, 'validate_frontmatter'):
+        violations = validate_frontmatter(config.corpus_dir)
+
+    if args.update_baseline:
+        save_baseline(violations)
+        print(f"Recorded {len(violations)} violations in {BASELINE_FILE}")
+        return
+    if args.baseline:
+        baseline = load_baseline()
+        violations = [violation for violation in violations if violation not in baseline]
+
+    for rel_path, field, message in violations:
+        print(f"{rel_path}: {field.lstrip('.') or 'frontmatter'} {message}")
+    if violations:
+        sys.exit(1)
+    print("✅ No frontmatter violations outside the baseline" if args.baseline else "✅ All lesson frontmatter is valid")
+
+if __name__ == "__main__":
+    main()
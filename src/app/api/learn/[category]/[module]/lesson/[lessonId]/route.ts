@@ -1,7 +1,19 @@
 import { NextRequest, NextResponse } from 'next/server';
+import crypto from 'crypto';
 import fs from 'fs';
 import path from 'path';
 
+// Root of the course build: the repository, or the pipeline's output root
+const BUILD_ROOT = process.env.INR100_BUILD_ROOT || process.cwd();
+
+// Lessons are served from the corpus the build rendered, so their bytes hash to
+// the keys courses/build_render_cache.py wrote (out-of-tree builds rewrite a copy)
+const COURSES_DIR = path.join(BUILD_ROOT, 'courses');
+
+// Pre-rendered lesson HTML keyed by the sha256 of the lesson file; the version
+// segment must match RENDERER_VERSION in courses/build_render_cache.py
+const RENDER_CACHE_DIR = path.join(BUILD_ROOT, 'build', 'courses', 'render-cache', 'v3');
+
 export async function GET(
   request: NextRequest,
   { params }: { params: { category: string; module: string; lessonId: string } }
@@ -9,9 +21,16 @@ export async function GET(
   try {
     const { category, module, lessonId } = params;
     
+    // Get lesson metadata from the course service
+    const CourseContentService = await import('@/lib/courseContentService');
+    const courseService = CourseContentService.default.getInstance();
+    
+    // Get module with actual lesson data
+    const moduleData = courseService.getModuleWithLessons(category, module);
+    
     // Construct the path to the lesson file
     const modulePath = moduleData?.path || module;
-    const lessonPath = path.join(process.cwd(), 'courses', modulePath, `${lessonId}.md`);
+    const lessonPath = path.join(COURSES_DIR, modulePath, `${lessonId}.md`);
     
     // Check if file exists
     if (!fs.existsSync(lessonPath)) {
@@ -22,17 +41,12 @@ export async function GET(
     }
 
     // Read the lesson file
-    const lessonContent = fs.readFileSync(lessonPath, 'utf-8');
+    const lessonBytes = fs.readFileSync(lessonPath);
+    const lessonContent = lessonBytes.toString('utf-8');
     
     // Parse the markdown content
     const parsedLesson = parseMarkdownContent(lessonContent, lessonId);
     
-    // Get lesson metadata from the course service
-    const CourseContentService = await import('@/lib/courseContentService');
-    const courseService = CourseContentService.default.getInstance();
-    
-    // Get module with actual lesson data
-    const moduleData = courseService.getModuleWithLessons(category, module);
     let lessonMetadata = null;
     
     if (moduleData && moduleData.lessonsDetail) {
@@ -52,7 +66,7 @@ export async function GET(
       description: lessonMetadata?.description || 'Lesson content',
       content: {
         type: 'markdown',
-        html: convertMarkdownToHtml(lessonContent)
+        html: readRenderedHtml(lessonBytes) ?? convertMarkdownToHtml(lessonContent)
       },
       estimatedDuration: lessonMetadata?.estimatedDuration || 5,
       xpReward: lessonMetadata?.xpReward || 50,
@@ -137,7 +151,22 @@ function parseMarkdownContent(content: string, lessonId: string) {
   };
 }
 
-// Helper function to convert markdown to HTML (simplified)
+// Serve the pre-rendered, sanitized HTML for this exact lesson content if the build cached it
+function readRenderedHtml(lessonBytes: Buffer): string | null {
+  const hash = crypto.createHash('sha256').update(lessonBytes).digest('hex');
+  const entryPath = path.join(RENDER_CACHE_DIR, hash.slice(0, 2), `${hash}.html`);
+  try {
+    const html = fs.readFileSync(entryPath, 'utf-8');
+    // Mark the entry as recently used for the cache's LRU eviction
+    const now = new Date();
+    fs.promises.utimes(entryPath, now, now).catch(() => {});
+    return html;
+  } catch {
+    return null;
+  }
+}
+
+// Helper function to convert markdown to HTML (simplified), used on render cache misses
 function convertMarkdownToHtml(markdown: string): string {
   let html = markdown;
   